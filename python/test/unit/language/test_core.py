@@ -7357,3 +7357,209 @@ def test_float_tuple():
         x, y = float('-inf'), float('inf')  # noqa: F841
 
     _namedtuple_float_tuple_kernel[(1, )]()
+
+
+@pytest.mark.interpreter
+@pytest.mark.parametrize("batch_size", [1, 3, 64])
+def test_interpreter_batched_grid(batch_size, device, monkeypatch):
+    if not is_interpreter():
+        pytest.skip("batched execution is specific to the interpreter")
+    monkeypatch.setenv("TRITON_INTERPRET_BATCH_SIZE", str(batch_size))
+
+    @triton.jit
+    def row_sum_kernel(X, Y, N: tl.constexpr, BLOCK: tl.constexpr):
+        pid_m = tl.program_id(0)
+        pid_n = tl.program_id(1)
+        offs = pid_n * BLOCK + tl.arange(0, BLOCK)
+        x = tl.load(X + pid_m * N + offs)
+        tl.store(Y + pid_m * tl.num_programs(1) + pid_n, tl.sum(x * 2, axis=0))
+
+    @triton.jit
+    def divergent_kernel(X, Y):
+        pid = tl.program_id(0)
+        acc = 0
+        # The trip count depends on the program id, so the interpreter must fall back to one program at a time
+        for i in range(pid):
+            acc += tl.load(X + i)
+        if pid % 2 == 0:
+            acc = -acc
+        tl.store(Y + pid, acc)
+
+    @triton.jit
+    def count_kernel(Y, BLOCK: tl.constexpr):
+        # All programs update the same locations, which must be counted once per program
+        tl.atomic_add(Y + tl.arange(0, BLOCK), 1)
+
+    M, N, BLOCK = 7, 64, 16
+    x = torch.randn((M, N), dtype=torch.float32, device=device)
+    y = torch.empty((M, N // BLOCK), dtype=torch.float32, device=device)
+    row_sum_kernel[(M, N // BLOCK)](x, y, N, BLOCK)
+    y_ref = (x * 2).reshape(M, N // BLOCK, BLOCK).sum(-1)
+    torch.testing.assert_close(y, y_ref)
+
+    x = torch.arange(10, dtype=torch.int32, device=device)
+    y = torch.zeros(10, dtype=torch.int32, device=device)
+    divergent_kernel[(10, )](x, y)
+    y_ref = torch.tensor([(i * (i - 1) // 2) * (-1 if i % 2 == 0 else 1) for i in range(10)], dtype=torch.int32)
+    torch.testing.assert_close(y.cpu(), y_ref)
+
+    y = torch.zeros(BLOCK, dtype=torch.int32, device=device)
+    count_kernel[(M, )](y, BLOCK)
+    torch.testing.assert_close(y.cpu(), torch.full((BLOCK, ), M, dtype=torch.int32))
+
+
+@pytest.mark.interpreter
+@pytest.mark.parametrize("num_workers, batch_size", [(2, 1), (4, 1), (4, 8)])
+def test_interpreter_parallel_grid(num_workers, batch_size, device, monkeypatch):
+    if not is_interpreter():
+        pytest.skip("parallel execution is specific to the interpreter")
+    monkeypatch.setenv("TRITON_INTERPRET_NUM_WORKERS", str(num_workers))
+    monkeypatch.setenv("TRITON_INTERPRET_BATCH_SIZE", str(batch_size))
+
+    @triton.jit
+    def count_kernel(X, Y, Z, BLOCK: tl.constexpr):
+        pid = tl.program_id(0)
+        offs = tl.arange(0, BLOCK)
+        tl.store(X + pid * BLOCK + offs, pid)
+        # Every worker updates the same locations, so the counts are only right if atomics are process-safe
+        tl.atomic_add(Y + offs, 1)
+        tl.atomic_add(Z + offs, 1.0)
+
+    @triton.jit
+    def divergent_kernel(X, Y):
+        pid = tl.program_id(0)
+        acc = 0
+        for i in range(pid):
+            acc += tl.load(X + i)
+        tl.atomic_add(Y, acc)
+
+    grid, BLOCK = 37, 4
+    x = torch.zeros((grid, BLOCK), dtype=torch.int32, device=device)
+    y = torch.zeros(BLOCK, dtype=torch.int32, device=device)
+    z = torch.zeros(BLOCK, dtype=torch.float16, device=device)
+    count_kernel[(grid, )](x, y, z, BLOCK)
+    torch.testing.assert_close(x.cpu(), torch.arange(grid, dtype=torch.int32)[:, None].expand(grid, BLOCK))
+    torch.testing.assert_close(y.cpu(), torch.full((BLOCK, ), grid, dtype=torch.int32))
+    torch.testing.assert_close(z.cpu(), torch.full((BLOCK, ), grid, dtype=torch.float16))
+
+    # Side effects of the workers' diverged batches are discarded before the serial replay
+    x = torch.ones(10, dtype=torch.int32, device=device)
+    y = torch.zeros(1, dtype=torch.int32, device=device)
+    divergent_kernel[(10, )](x, y)
+    assert y.item() == sum(range(10))
+
+
+@triton.jit
+def _linear_recurrence_combine(a1, b1, a2, b2):
+    return a1 * a2, b1 * a2 + b2
+
+
+@triton.jit
+def _branchy_max_combine(a, b):
+    if a > b:
+        return a
+    return b
+
+
+@pytest.mark.interpreter
+@pytest.mark.parametrize("axis", [0, 1])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_interpreter_vectorized_combine(axis, reverse, device):
+    if not is_interpreter():
+        pytest.skip("vectorized combine functions are specific to the interpreter")
+
+    @triton.jit
+    def kernel(A, B, X, Y, Z, M: tl.constexpr, N: tl.constexpr, AXIS: tl.constexpr, REVERSE: tl.constexpr):
+        offs = tl.arange(0, M)[:, None] * N + tl.arange(0, N)[None, :]
+        out_offs = tl.arange(0, M if AXIS == 1 else N)
+        a = tl.load(A + offs)
+        b = tl.load(B + offs)
+        _, x = tl.associative_scan((a, b), AXIS, _linear_recurrence_combine, reverse=REVERSE)
+        tl.store(X + offs, x)
+        _, y = tl.max(b, axis=AXIS, return_indices=True, return_indices_tie_break_left=False)
+        tl.store(Y + out_offs, y)
+        # Branching on the operands cannot be vectorized and falls back to combining one element at a time
+        tl.store(Z + out_offs, tl.reduce(b, AXIS, _branchy_max_combine))
+
+    M, N = 8, 16
+    a = torch.rand((M, N), dtype=torch.float64, device=device)
+    b = torch.randint(0, 1000, (M, N), device=device).to(torch.float64)
+    x = torch.empty_like(a)
+    y = torch.empty(M if axis == 1 else N, dtype=torch.int32, device=device)
+    z = torch.empty(M if axis == 1 else N, dtype=torch.float64, device=device)
+    kernel[(1, )](a, b, x, y, z, M, N, axis, reverse)
+
+    a_ref, b_ref = a.cpu().movedim(axis, 0), b.cpu().movedim(axis, 0)
+    steps = range(a_ref.shape[0] - 1, -1, -1) if reverse else range(a_ref.shape[0])
+    x_ref = torch.empty_like(a_ref)
+    acc = torch.zeros_like(b_ref[0])
+    for i in steps:
+        acc = acc * a_ref[i] + b_ref[i]
+        x_ref[i] = acc
+    torch.testing.assert_close(x.cpu(), x_ref.movedim(0, axis))
+    torch.testing.assert_close(b.cpu().gather(axis, y.cpu().long().unsqueeze(axis)).squeeze(axis), b.cpu().amax(axis))
+    torch.testing.assert_close(z.cpu(), b.cpu().amax(axis))
+
+
+@pytest.mark.interpreter
+def test_interpreter_copies_back_written_args(device, monkeypatch):
+    if not is_interpreter():
+        pytest.skip("argument copies are specific to the interpreter")
+    monkeypatch.delenv("TRITON_INTERPRET_NUM_WORKERS", raising=False)
+
+    @triton.jit
+    def kernel(X, Y, Z, W, BLOCK: tl.constexpr):
+        offs = tl.arange(0, BLOCK)
+        x = tl.load(X + offs)
+        tl.store(Y + offs, x, mask=offs < BLOCK)
+        tl.atomic_add(Z + offs, x)
+        # The store is fully masked out, so W is never written
+        tl.store(W + offs, x, mask=offs < 0)
+
+    copied = []
+    copy_ = torch.UntypedStorage.copy_
+
+    def spy(self, *args, **kwargs):
+        copied.append(self.data_ptr())
+        return copy_(self, *args, **kwargs)
+
+    monkeypatch.setattr(torch.UntypedStorage, "copy_", spy)
+    BLOCK = 16
+    x = torch.arange(BLOCK, dtype=torch.float32, device=device)
+    y, z, w = torch.zeros_like(x), torch.zeros_like(x), torch.zeros_like(x)
+    kernel[(1, )](x, y, z, w, BLOCK)
+    torch.testing.assert_close(y, x)
+    torch.testing.assert_close(z, x)
+    # Host tensors are modified in place and are never copied back
+    args = {t.untyped_storage().data_ptr() for t in (x, y, z, w)}
+    written = {y.untyped_storage().data_ptr(), z.untyped_storage().data_ptr()}
+    assert set(copied) & args == (set() if device == "cpu" else written)
+
+
+@pytest.mark.interpreter
+def test_interpreter_rewrite_cache(device, fresh_triton_cache, monkeypatch):
+    if not is_interpreter():
+        pytest.skip("rewriting kernels is specific to the interpreter")
+    from triton.runtime.interpreter import FunctionRewriter, InterpretedFunction
+
+    @triton.jit
+    def kernel(X, Y, BLOCK: tl.constexpr):
+        offs = tl.arange(0, BLOCK)
+        tl.store(Y + offs, tl.load(X + offs) + 1)
+
+    x = torch.arange(16, dtype=torch.float32, device=device)
+    y = torch.empty_like(x)
+    kernel[(1, )](x, y, 16)
+    torch.testing.assert_close(y, x + 1)
+    assert any(name.endswith(".interpreter.marshal") for _, _, files in os.walk(fresh_triton_cache) for name in files)
+
+    # A new process would only find the rewritten kernel on disk
+    InterpretedFunction.rewritten_fn.pop(kernel.fn)
+
+    def transform_ast(self, src):
+        raise AssertionError("the rewritten kernel should have been loaded from the cache")
+
+    monkeypatch.setattr(FunctionRewriter, "_transform_ast", transform_ast)
+    y = torch.empty_like(x)
+    kernel[(1, )](x, y, 16)
+    torch.testing.assert_close(y, x + 1)
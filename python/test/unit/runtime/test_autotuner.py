@@ -1,8 +1,13 @@
+import itertools
+import math
+import os
+
 import torch
 
 import triton
 import triton.language as tl
 import pytest
+import threading
 
 
 def do_bench(kernel_call, quantiles, use_cuda_graph=False):
@@ -186,3 +191,329 @@ def test_exceed_tmem(device):
     assert exception_out_of_resource is not None and str(
         exception_out_of_resource
     ) == "out of resource: tensor memory, Required: 640, Hardware limit: 512. Reducing block sizes or `num_stages` may help."
+
+
+def test_precompile(device, fresh_triton_cache, monkeypatch):
+    # configs are compiled concurrently before they are benchmarked
+    import triton.compiler
+    compiled = []
+    compile_async = triton.compiler.compile_async
+
+    def _compile_async(jobs, *args, **kwargs):
+        compiled.extend(constexprs for _, _, constexprs, _, _ in jobs)
+        return compile_async(jobs, *args, **kwargs)
+
+    monkeypatch.setattr(triton.compiler, "compile_async", _compile_async)
+
+    N = 1024
+    src = torch.randn(N, device=device)
+    dst = torch.empty(N, device=device)
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': block_size}) for block_size in [32, 64, 128]]
+
+    @triton.autotune(configs=configs, key=['N'], do_bench=do_bench)
+    @triton.heuristics({'EVEN_N': lambda args: args['N'] % args['BLOCK_SIZE'] == 0})
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr, EVEN_N: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    # benchmarking launches the precompiled kernels
+    jit_fn = _kernel.fn.fn
+    monkeypatch.setattr(jit_fn, "compile", lambda *args, **kwargs: pytest.fail("recompiled a precompiled config"))
+
+    grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE']), )
+    _kernel[grid](dst, src, N)
+    torch.testing.assert_close(src, dst)
+    assert sorted(constexprs[(3, )] for constexprs in compiled) == [32, 64, 128]
+    assert list(_kernel.configs_timings) == configs
+
+
+# compile workers import the kernels they are sent, so this one can't be local
+@triton.autotune(configs=[triton.Config(kwargs={'BLOCK_SIZE': block_size}) for block_size in [32, 64, 128]], key=['N'],
+                 do_bench=do_bench, tune_in_background=True)
+@triton.jit
+def _copy_kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+    offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+    tl.store(dst + offsets, tl.load(src + offsets, mask=offsets < N), mask=offsets < N)
+
+
+def test_precompile_in_background(device, fresh_triton_cache, monkeypatch):
+    # background tunings compile their configs in the spawned workers too
+    import triton.compiler
+    threads = []
+    compile_async = triton.compiler.compile_async
+
+    def _compile_async(jobs, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return compile_async(jobs, *args, **kwargs)
+
+    monkeypatch.setattr(triton.compiler, "compile_async", _compile_async)
+    src = torch.randn(2048, device=device)
+    dst = torch.empty(2048, device=device)
+    grid = lambda META: (triton.cdiv(2048, META['BLOCK_SIZE']), )
+    for N in [1024, 2048]:
+        _copy_kernel[grid](dst, src, N)
+    for future in list(_copy_kernel.background_tunings.values()):
+        future.result()
+    assert [name.startswith("triton-autotune") for name in threads] == [False, True]
+    assert sorted(key[0] for key in _copy_kernel.cache) == [1024, 2048]
+    executor = triton.compiler.compiler._compile_pools[os.getpid()][None]
+    assert executor._mp_context.get_start_method() == "spawn"
+
+
+def test_successive_halving():
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': 2**i}) for i in range(8)]
+    reps = []
+
+    def bench(configs, rep=None):
+        reps.extend([rep] * len(configs))
+        # the fastest config is BLOCK_SIZE=16
+        return {config: [abs(config.kwargs['BLOCK_SIZE'] - 16) + 1.0] * 3 for config in configs}
+
+    best_config, timings = triton.runtime.SuccessiveHalving(min_rep=5, max_rep=100).search(configs, bench)
+    assert best_config.kwargs == {'BLOCK_SIZE': 16}
+    assert list(timings) == configs
+    # the slowest half of the configs is discarded after each round
+    assert reps == [5] * 8 + [10] * 4 + [20] * 2
+
+
+def test_model_guided_search():
+    configs = [
+        triton.Config(kwargs={'BLOCK_M': m, 'BLOCK_N': n, 'BLOCK_K': k}, num_warps=w, num_stages=s) for m, n, k, w, s in
+        itertools.product([16, 32, 64, 128, 256], [16, 32, 64, 128, 256], [16, 32, 64], [2, 4, 8], [2, 3, 4])
+    ]
+    benchmarked = []
+
+    def timing(config):
+        # a synthetic timing, fastest for BLOCK_M=128, BLOCK_N=64, BLOCK_K=32, num_warps=4, num_stages=3
+        kwargs = config.all_kwargs()
+        optimum = {'BLOCK_M': 128, 'BLOCK_N': 64, 'BLOCK_K': 32, 'num_warps': 4, 'num_stages': 3}
+        return 1.0 + sum(math.log2(kwargs[name] / value)**2 for name, value in optimum.items())
+
+    def bench(configs, rep=None):
+        benchmarked.extend(configs)
+        return {config: [timing(config)] * 3 for config in configs}
+
+    best_config, timings = triton.runtime.ModelGuidedSearch(budget=40).search(configs, bench)
+    assert len(benchmarked) == len(set(benchmarked)) == len(timings) == 40
+    # the best config found is among the best 1% of the space
+    assert sorted(map(timing, configs)).index(timing(best_config)) < len(configs) // 100
+    assert timings[best_config] == [timing(best_config)] * 3
+
+    # small spaces are searched exhaustively
+    best_config, timings = triton.runtime.ModelGuidedSearch(budget=40).search(configs[:10], bench)
+    assert len(timings) == 10
+
+
+def test_search_strategy(device):
+    N = 1024
+    src = torch.randn(N, device=device)
+    dst = torch.empty(N, device=device)
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': block_size}) for block_size in [32, 64, 128, 256]]
+    reps = []
+
+    def do_bench_rep(kernel_call, quantiles, warmup=25, rep=100):
+        reps.append(rep)
+        return do_bench(kernel_call, quantiles)
+
+    @triton.autotune(configs=configs, key=['N'], do_bench=do_bench_rep,
+                     search_strategy=triton.runtime.SuccessiveHalving(min_rep=1, max_rep=2))
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE']), )
+    _kernel[grid](dst, src, N)
+    torch.testing.assert_close(src, dst)
+    assert reps == [1] * 4 + [2] * 2
+    assert list(_kernel.configs_timings) == configs
+
+
+def test_search_strategy_without_rep(device):
+    N = 1024
+    src = torch.randn(N, device=device)
+    dst = torch.empty(N, device=device)
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': block_size}) for block_size in [32, 64, 128, 256]]
+    calls = []
+
+    def do_bench_fixed(kernel_call, quantiles):
+        calls.append(kernel_call)
+        return do_bench(kernel_call, quantiles)
+
+    # halving rounds can't be shortened, so every config is benchmarked once instead
+    with pytest.warns(UserWarning, match="`rep` parameter"):
+
+        @triton.autotune(configs=configs, key=['N'], do_bench=do_bench_fixed,
+                         search_strategy=triton.runtime.SuccessiveHalving(min_rep=1, max_rep=2))
+        @triton.jit
+        def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+            offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+            x = tl.load(src + offsets, mask=offsets < N)
+            tl.store(dst + offsets, x, mask=offsets < N)
+
+    grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE']), )
+    _kernel[grid](dst, src, N)
+    torch.testing.assert_close(src, dst)
+    assert len(calls) == len(configs)
+    assert list(_kernel.configs_timings) == configs
+
+
+def test_key_bucketing(device):
+    src = torch.randn(4096, device=device)
+    dst = torch.empty(4096, device=device)
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': 32}), triton.Config(kwargs={'BLOCK_SIZE': 128})]
+
+    @triton.autotune(configs=configs, key=['N'], do_bench=do_bench, key_bucketing="pow2")
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    for N in [1000, 1024, 1025, 2048]:
+        grid = lambda META: (triton.cdiv(N, META['BLOCK_SIZE']), )
+        _kernel[grid](dst, src, N)
+        torch.testing.assert_close(src[:N], dst[:N])
+    assert sorted(key[0] for key in _kernel.cache) == [1024, 2048]
+
+
+def test_tune_in_background(device):
+    src = torch.randn(4096, device=device)
+    dst = torch.empty(4096, device=device)
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': 32}), triton.Config(kwargs={'BLOCK_SIZE': 128})]
+
+    fail = False
+    # benchmarks wait until released
+    released = threading.Event()
+    released.set()
+
+    def do_bench_or_fail(kernel_call, quantiles):
+        if fail:
+            raise RuntimeError("benchmark failed")
+        released.wait(10)
+        return do_bench(kernel_call, quantiles)
+
+    # the kernel writes `dst`, which background benchmarks get a copy of
+    @triton.autotune(configs=configs, key=['N'], do_bench=do_bench_or_fail, tune_in_background=True)
+    @triton.jit
+    def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+        offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+        x = tl.load(src + offsets, mask=offsets < N)
+        tl.store(dst + offsets, x, mask=offsets < N)
+
+    def wait_for_background_tunings():
+        for future in list(_kernel.background_tunings.values()):
+            try:
+                future.result()
+            except RuntimeError:
+                pass
+        # the futures are removed once done
+        triton.runtime.autotuner._get_background_tuner().submit(lambda: None).result()
+
+    grid = lambda META: (triton.cdiv(4096, META['BLOCK_SIZE']), )
+    # the first key is tuned in the foreground
+    _kernel[grid](dst, src, 1024)
+    assert [key[0] for key in _kernel.cache] == [1024] and not _kernel.background_tunings
+    # the next ones run with the config of the closest tuned key while they are tuned
+    for N, closest in [(3000, 1024), (4096, 3000)]:
+        _kernel[grid](dst, src, N)
+        torch.testing.assert_close(src[:N], dst[:N])
+        tuned = {key[0]: config for key, config in _kernel.cache.items()}
+        assert _kernel.best_config == tuned[closest]
+        wait_for_background_tunings()
+    assert sorted(key[0] for key in _kernel.cache) == [1024, 3000, 4096]
+    assert not _kernel.background_tunings
+
+    # the caller's tensors aren't written by the benchmarks, even after the caller modified them
+    released.clear()
+    _kernel[grid](dst, src, 4000)
+    dst.add_(1)
+    getattr(torch, device).synchronize()
+    released.set()
+    wait_for_background_tunings()
+    assert 4000 in (key[0] for key in _kernel.cache)
+    torch.testing.assert_close(dst[:4000], src[:4000] + 1)
+
+    # failed tunings are reported, and tuned again on the next launch
+    fail = True
+    with pytest.warns(UserWarning, match="in the background failed"):
+        _kernel[grid](dst, src, 2000)
+        wait_for_background_tunings()
+    assert not _kernel.background_tunings and len(_kernel.cache) == 4
+    fail = False
+    _kernel[grid](dst, src, 2000)
+    wait_for_background_tunings()
+    assert sorted(key[0] for key in _kernel.cache) == [1024, 2000, 3000, 4000, 4096]
+
+
+def test_autotune_db_merge(tmp_path):
+    from triton.runtime import autotune_db
+
+    kernel = "kernels.matmul"
+    fast, slow = triton.Config(kwargs={'BLOCK_SIZE': 64}), triton.Config(kwargs={'BLOCK_SIZE': 32}, num_warps=8)
+    autotune_db.record(tmp_path / "a", kernel, "cuda:80", (1024, "torch.float16"), fast, [1.0, 0.9, 1.1])
+    autotune_db.record(tmp_path / "a", kernel, "cuda:90", (1024, "torch.float16"), slow, [2.0, 1.9, 2.1])
+    autotune_db.record(tmp_path / "b", kernel, "cuda:80", (1024, "torch.float16"), slow, [2.0, 1.9, 2.1])
+    autotune_db.record(tmp_path / "b", kernel, "cuda:80", (2048, "torch.float16"), slow, [3.0, 2.9, 3.1])
+
+    # the fastest config of each architecture and key is kept
+    assert autotune_db.merge(tmp_path / "merged", [tmp_path / "a", tmp_path / "b"]) == 3
+    configs = autotune_db.load(kernel, "cuda:80", [tmp_path / "merged"])
+    assert configs == {(1024, "torch.float16"): fast, (2048, "torch.float16"): slow}
+    assert autotune_db.load(kernel, "cuda:90", [tmp_path / "merged"]) == {(1024, "torch.float16"): slow}
+    # earlier databases take precedence when loading
+    assert autotune_db.load(kernel, "cuda:80", [tmp_path / "b", tmp_path / "a"])[(1024, "torch.float16")] == slow
+
+
+def test_autotune_db_concurrent_record(tmp_path):
+    # ranks that record into the same database don't lose each other's entries
+    from concurrent.futures import ThreadPoolExecutor
+    from triton.runtime import autotune_db
+
+    config = triton.Config(kwargs={'BLOCK_SIZE': 64})
+
+    def record(n):
+        autotune_db.record(tmp_path, "kernels.matmul", "cuda:80", (n, ), config, 1.0)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(record, range(64)))
+    assert sorted(autotune_db.load("kernels.matmul", "cuda:80", [tmp_path])) == [(n, ) for n in range(64)]
+
+
+def test_autotune_db(device, tmp_path, monkeypatch):
+    src = torch.randn(1024, device=device)
+    dst = torch.empty(1024, device=device)
+    configs = [triton.Config(kwargs={'BLOCK_SIZE': 32}), triton.Config(kwargs={'BLOCK_SIZE': 128})]
+
+    def make_kernel(do_bench):
+
+        @triton.autotune(configs=configs, key=['N'], do_bench=do_bench)
+        @triton.jit
+        def _kernel(dst, src, N, BLOCK_SIZE: tl.constexpr):
+            offsets = tl.program_id(0) * BLOCK_SIZE + tl.arange(0, BLOCK_SIZE)
+            x = tl.load(src + offsets, mask=offsets < N)
+            tl.store(dst + offsets, x, mask=offsets < N)
+
+        return _kernel
+
+    grid = lambda META: (triton.cdiv(1024, META['BLOCK_SIZE']), )
+    # a tuning run exports its results
+    monkeypatch.setenv("TRITON_AUTOTUNE_DB_EXPORT", str(tmp_path / "db"))
+    kernel = make_kernel(do_bench)
+    kernel[grid](dst, src, 1024)
+    tuned = kernel.best_config
+    monkeypatch.delenv("TRITON_AUTOTUNE_DB_EXPORT")
+
+    # which are used without benchmarking by another one
+    def fail_bench(kernel_call, quantiles):
+        raise AssertionError("the config should be loaded from the database")
+
+    monkeypatch.setenv("TRITON_AUTOTUNE_DB", str(tmp_path / "db"))
+    kernel = make_kernel(fail_bench)
+    dst.zero_()
+    kernel[grid](dst, src, 1024)
+    torch.testing.assert_close(src, dst)
+    assert kernel.best_config == tuned
@@ -1,14 +1,24 @@
+import base64
+import hashlib
+import http.client
+import http.server
 import importlib.util
 import itertools
+import json
 import os
 import shutil
+import sysconfig
 import pathlib
+import threading
+import time
+import uuid
 
 import pytest
 import torch
 
 import triton
 import triton.language as tl
+from triton.runtime.cache import PooledRemoteCacheBackend
 from triton.runtime.jit import JITFunction
 from triton._internal_testing import is_hip
 
@@ -517,6 +527,77 @@ def test_preload(device, fresh_triton_cache) -> None:
         kernel_sub.preload(specialization_data)
 
 
+def test_bundle(device, fresh_triton_cache, tmp_path) -> None:
+    from triton.tools.bundle import export_bundle, load_bundle
+
+    a = torch.ones(32, device=device)
+    o = torch.empty_like(a)
+    add_fn.device_caches.clear()
+    compiled = add_fn[(1, )](a, a, o, 32)
+    bundle = tmp_path / "kernels.zip"
+    assert export_bundle(bundle, [add_fn]) == 1
+
+    # start over from an empty cache
+    shutil.rmtree(fresh_triton_cache)
+    add_fn.device_caches.clear()
+
+    kernels = load_bundle(bundle)
+    assert [k.hash for k in kernels] == [compiled.hash]
+    device = getattr(torch, device).current_device()
+    assert len(add_fn.device_caches[device][0]) == 1
+
+    # the preloaded kernel is launched without compiling
+    counter = 0
+
+    def inc_counter(*args, **kwargs):
+        nonlocal counter
+        counter += 1
+
+    JITFunction.cache_hook = inc_counter
+    add_fn[(1, )](a, a, o, 32)
+    JITFunction.cache_hook = None
+    assert counter == 0
+    assert torch.equal(o, a + a)
+
+
+@pytest.mark.parametrize("cache_manager", ["FileCacheManager", "PackedCacheManager"])
+def test_bundle_cache_dir(cache_manager, fresh_triton_cache, tmp_path, monkeypatch) -> None:
+    import zipfile
+    from triton.runtime.cache import get_cache_manager
+    from triton.tools.bundle import export_bundle, load_bundle, read_index
+
+    monkeypatch.setenv("TRITON_CACHE_MANAGER", f"triton.runtime.cache:{cache_manager}")
+    # restored once done
+    monkeypatch.setattr(triton.runtime.cache, "__cache_cls", getattr(triton.runtime.cache, "__cache_cls"))
+    monkeypatch.setattr(triton.runtime.cache, "__cache_cls_nme", "DEFAULT")
+    monkeypatch.setattr(triton.runtime.cache, "_pack_stores", {})
+    monkeypatch.setenv("TRITON_CACHE_COMPRESSION", "zlib")
+    ptx = "\n".join(f"    add.s32 %r{i}, %r{i}, 1;" for i in range(1000))
+    key = hashlib.sha256(b"kernel").hexdigest()
+    cache = get_cache_manager(key)
+    cache.put_group("kernel.json",
+                    {name: cache.put(data, name)
+                     for name, data in [("kernel.ptx", ptx), ("kernel.json", "{}")]})
+
+    # every layout of the cache directory is bundled, with the files uncompressed
+    bundle = tmp_path / "kernels.zip"
+    assert export_bundle(bundle, [], cache_dir=fresh_triton_cache) == 1
+    assert read_index(bundle)["kernels"] == [{
+        "hash": key, "group": "kernel.json", "files": ["kernel.json", "kernel.ptx"]
+    }]
+    with zipfile.ZipFile(bundle) as f:
+        assert f.read(f"{key}/kernel.ptx") == ptx.encode()
+    shutil.rmtree(fresh_triton_cache)
+    triton.runtime.cache._pack_stores.clear()
+    load_bundle(bundle)
+    assert get_cache_manager(key).read_file("kernel.ptx") == ptx.encode()
+
+    # the cache directories of other cache managers can't be read
+    monkeypatch.setenv("TRITON_CACHE_MANAGER", "my_package.cache:MyCacheManager")
+    with pytest.raises(RuntimeError, match="Can't bundle the cache directory"):
+        export_bundle(bundle, [], cache_dir=fresh_triton_cache)
+
+
 def test_hooks(device, fresh_triton_cache) -> None:
 
     @triton.jit
@@ -627,3 +708,420 @@ def test_function_arguments(device):
     kernel[(1, )](y[4], func1, tuple())
     assert len(kernel.device_caches[0][0]) == 4
     assert y.tolist() == [1, 2, 3, 7, 1]
+
+
+def test_prune_cache(fresh_triton_cache, monkeypatch) -> None:
+    from triton.runtime.cache import get_cache_entries, get_cache_manager, prune_cache
+
+    now = time.time()
+    caches = []
+    for i in range(4):
+        cache = get_cache_manager(hashlib.sha256(str(i).encode()).hexdigest())
+        cache.put(b"x" * 1000, f"kernel_{i}.cubin")
+        # kernel_0 was used last, a day ago, kernel_3 four days ago
+        os.utime(cache.cache_dir, (now - 86400 * (i + 1), ) * 2)
+        caches.append(cache)
+
+    entries = {entry.names[0]: entry for entry in get_cache_entries()}
+    assert entries.keys() == {f"kernel_{i}" for i in range(4)}
+    assert all(entry.size == 1000 for entry in entries.values())
+
+    # looking an entry up marks it as used
+    assert caches[3].get_file("kernel_3.cubin") is not None
+    evicted = prune_cache(max_size=3000)
+    assert sorted(entry.names[0] for entry in evicted) == ["kernel_2"]
+    evicted = prune_cache(max_age=86400 * 1.5)
+    assert sorted(entry.names[0] for entry in evicted) == ["kernel_1"]
+    assert sorted(entry.names[0] for entry in get_cache_entries()) == ["kernel_0", "kernel_3"]
+    assert os.path.exists(os.path.join(caches[0].cache_dir, "kernel_0.cubin"))
+    assert caches[2].get_file("kernel_2.cubin") is None
+
+    # entries left behind by a process that died while evicting them are removed
+    os.makedirs(os.path.join(fresh_triton_cache, f".evicted.{uuid.uuid4()}", "kernel_4"))
+    prune_cache(max_age=86400 * 1.5)
+    assert not any(name.startswith(".evicted.") for name in os.listdir(fresh_triton_cache))
+
+    # writes prune the cache once a budget is set
+    monkeypatch.setenv("TRITON_CACHE_MAX_SIZE", "1000")
+    monkeypatch.setattr(triton.runtime.cache, "_last_prune", 0.0)
+    caches[2].put(b"x" * 1000, "kernel_2.cubin")
+    assert sorted(entry.names[0] for entry in get_cache_entries()) == ["kernel_2", "kernel_3"]
+
+
+def _put_packed(i):
+    from triton.runtime.cache import PackedCacheManager
+    cache = PackedCacheManager(f"key_{i % 4}")
+    cache.put(str(i) * 1000, f"kernel_{i}.ptx")
+    return cache.read_file(f"kernel_{i}.ptx")
+
+
+def test_packed_cache(fresh_triton_cache) -> None:
+    from concurrent.futures import ProcessPoolExecutor
+    from triton.runtime.cache import PackedCacheManager
+
+    cache = PackedCacheManager("key")
+    assert cache.get_group("kernel.json") is None
+    group = {name: cache.put(data, name) for name, data in [("kernel.cubin", b"\0" * 10), ("kernel.json", "{}")]}
+    cache.put_group("kernel.json", group)
+    group = PackedCacheManager("key").get_group("kernel.json")
+    # files are only read when used
+    assert {name: file.read() for name, file in group.items()} == {"kernel.cubin": b"\0" * 10, "kernel.json": b"{}"}
+    assert PackedCacheManager("other_key").get_group("kernel.json") is None
+    # everything lives in the pack and its index
+    assert sorted(os.listdir(fresh_triton_cache)) == ["cache.index", "cache.pack"]
+    # files can still be looked up by path, e.g., to import launchers, without a directory per key
+    with open(cache.get_file("kernel.cubin"), "rb") as f:
+        assert f.read() == b"\0" * 10
+    assert sorted(os.listdir(fresh_triton_cache)) == [".packed_files", "cache.index", "cache.pack"]
+
+    # concurrent writers
+    with ProcessPoolExecutor(4) as executor:
+        assert list(executor.map(_put_packed, range(16))) == [str(i).encode() * 1000 for i in range(16)]
+    for i in range(16):
+        assert PackedCacheManager(f"key_{i % 4}").read_file(f"kernel_{i}.ptx") == str(i).encode() * 1000
+
+
+def test_compiled_kernel_lazy_asm(fresh_triton_cache) -> None:
+    from triton.compiler import CompiledKernel
+    from triton.runtime.cache import get_cache_manager
+
+    target = triton.runtime.driver.active.get_current_target()
+    binary_ext = triton.compiler.make_backend(target).binary_ext
+    metadata = {
+        "name": "kernel", "target": target, "cluster_dims": (1, 1, 1), "num_warps": 4, "num_ctas": 1, "shared": 0
+    }
+    cache = get_cache_manager(hashlib.sha256(b"kernel").hexdigest())
+    group = {
+        f"kernel.{binary_ext}": cache.put(b"binary", f"kernel.{binary_ext}"),
+        "kernel.ttir": cache.put("ttir", "kernel.ttir"),
+        "kernel.json": cache.put(json.dumps(metadata, default=vars), "kernel.json"),
+    }
+    cache.put_group("kernel.json", group)
+
+    kernels = [CompiledKernel(None, cache.get_group("kernel.json"), "hash") for _ in range(2)]
+    assert type(kernels[0].metadata) is type(kernels[1].metadata)
+    assert kernels[0].kernel == b"binary"
+    # the IR is only read on first access
+    cache.put("updated ttir", "kernel.ttir")
+    assert "ttir" in kernels[0].asm
+    assert kernels[0].asm["ttir"] == "updated ttir"
+    assert sorted(kernels[1].asm.keys()) == sorted([binary_ext, "ttir"])
+    # copies read the IR that wasn't read yet, too
+    kernel = CompiledKernel(None, cache.get_group("kernel.json"), "hash")
+    assert kernel.asm.copy()["ttir"] == "updated ttir"
+    # the IR of evicted entries can't be read
+    kernel = CompiledKernel(None, cache.get_group("kernel.json"), "hash")
+    shutil.rmtree(cache.cache_dir)
+    with pytest.raises(RuntimeError, match="ttir of this kernel was evicted"):
+        kernel.asm["ttir"]
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_cache_compression(codec, fresh_triton_cache, monkeypatch) -> None:
+    from triton.runtime.cache import PackedCacheManager, get_cache_manager
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+
+    ptx = "\n".join(f"    add.s32 %r{i}, %r{i}, 1;" for i in range(1000))
+    # entries written before compression was enabled can still be read
+    uncompressed = get_cache_manager(hashlib.sha256(b"0").hexdigest())
+    uncompressed.put(ptx, "kernel.ptx")
+
+    monkeypatch.setenv("TRITON_CACHE_COMPRESSION", codec)
+    assert uncompressed.read_file("kernel.ptx") == ptx.encode()
+    for cache in [get_cache_manager(hashlib.sha256(b"1").hexdigest()), PackedCacheManager("key")]:
+        cache.put(ptx, "kernel.ptx")
+        assert cache.read_file("kernel.ptx") == ptx.encode()
+        assert os.path.getsize(cache.get_file("kernel.ptx")) < len(ptx) // 4
+    # launchers are imported from their path, so they are never compressed
+    launcher = b"\x7fELF" + bytes(4096)
+    path = get_cache_manager(hashlib.sha256(b"2").hexdigest()).put(launcher, "launcher.so")
+    assert pathlib.Path(path).read_bytes() == launcher
+
+
+@pytest.mark.parametrize("codec", ["zlib", "zstd"])
+def test_cache_compression_launch(codec, device, fresh_triton_cache, monkeypatch) -> None:
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    monkeypatch.setenv("TRITON_CACHE_COMPRESSION", codec)
+
+    @triton.jit
+    def add_one(X):
+        tl.store(X, tl.load(X) + 1)
+
+    x = torch.zeros(1, dtype=torch.int32, device=device)
+    add_one[(1, )](x)
+    # cache hit: the kernel and its launcher are read back from the compressed cache
+    add_one.device_caches.clear()
+    add_one[(1, )](x)
+    assert x.item() == 2
+
+
+def test_packed_cache_launch(device, fresh_triton_cache, monkeypatch) -> None:
+    from triton.runtime.cache import PackedCacheManager
+    monkeypatch.setattr(triton.runtime.cache, "__cache_cls", PackedCacheManager)
+
+    @triton.jit
+    def add_one(X):
+        tl.store(X, tl.load(X) + 1)
+
+    # the launcher is built, stored in the pack and imported from the path it is materialized at
+    x = torch.zeros(1, dtype=torch.int32, device=device)
+    add_one[(1, )](x)
+    add_one.device_caches.clear()
+    add_one[(1, )](x)
+    assert x.item() == 2
+
+
+def test_cache_dedup(fresh_triton_cache, monkeypatch) -> None:
+    from triton.runtime.cache import deduplicate_cache, get_cache_entries, get_cache_manager, prune_cache
+
+    cubin = os.urandom(4096)
+    # entries written before deduplication was enabled are deduplicated on demand
+    old = [get_cache_manager(hashlib.sha256(str(i).encode()).hexdigest()) for i in range(2)]
+    for cache in old:
+        cache.put(cubin, "kernel.cubin")
+    assert deduplicate_cache(dry_run=True) == (1, len(cubin))
+    assert deduplicate_cache() == (1, len(cubin))
+    assert deduplicate_cache() == (0, 0)
+    assert os.path.samefile(old[0].get_file("kernel.cubin"), old[1].get_file("kernel.cubin"))
+
+    monkeypatch.setenv("TRITON_CACHE_DEDUP", "1")
+    new = get_cache_manager(hashlib.sha256(b"2").hexdigest())
+    new.put(cubin, "kernel.cubin")
+    new.put(b"metadata", "kernel.json")
+    assert os.path.samefile(new.get_file("kernel.cubin"), old[0].get_file("kernel.cubin"))
+    assert new.read_file("kernel.cubin") == cubin
+    # shared files are accounted once, split between the entries linking to them
+    assert len(cubin) < sum(entry.size for entry in get_cache_entries()) <= len(cubin) + len(b"metadata")
+
+    # the shared file is removed with the last entry linking to it
+    for i, cache in enumerate(old + [new]):
+        os.utime(cache.cache_dir, (time.time() - 86400 + i, ) * 2)
+    prune_cache(max_size=len(cubin) // 2)
+    assert [entry.path for entry in get_cache_entries()] == [new.cache_dir]
+    assert new.read_file("kernel.cubin") == cubin
+    assert len(list(pathlib.Path(fresh_triton_cache).glob(".blobs/*/*"))) == 1
+    os.utime(new.cache_dir, (time.time() - 86400, ) * 2)
+    prune_cache(max_size=0)
+    assert list(pathlib.Path(fresh_triton_cache).glob(".blobs/*/*")) == []
+
+
+class _FakeRemoteCacheHandler(http.server.BaseHTTPRequestHandler):
+    # `POST /get` and `POST /touch` take a JSON list of keys, `PUT /<key>` stores the body
+
+    def do_POST(self):
+        keys = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, keys))
+        found = {k: base64.b64encode(self.server.store[k]).decode() for k in keys if k in self.server.store}
+        self._reply(json.dumps(found if self.path == "/get" else {}).encode())
+
+    def do_PUT(self):
+        self.server.store[self.path[1:]] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(("/put", [self.path[1:]]))
+        self._reply(b"")
+
+    def _reply(self, body):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Connection:
+
+    def __init__(self, host, port):
+        self._connection = http.client.HTTPConnection(host, port)
+        self._lock = threading.Lock()
+
+    def request(self, method, path, body):
+        with self._lock:
+            self._connection.request(method, path, body)
+            return self._connection.getresponse().read()
+
+
+class HTTPRemoteCacheBackend(PooledRemoteCacheBackend):
+
+    def connection_args(self):
+        return "localhost", int(os.environ["TRITON_TEST_REMOTE_CACHE_PORT"])
+
+    def connect(self, host, port):
+        return _Connection(host, port)
+
+    def get(self, filenames):
+        found = json.loads(self.connection.request("POST", "/get", json.dumps([f"{self._key}/{f}" for f in filenames])))
+        return {f: base64.b64decode(found[f"{self._key}/{f}"]) for f in filenames if f"{self._key}/{f}" in found}
+
+    def put(self, filename, data):
+        self.connection.request("PUT", f"/{self._key}/{filename}", data)
+
+    def touch(self, filenames):
+        self.connection.request("POST", "/touch", json.dumps([f"{self._key}/{f}" for f in filenames]))
+
+
+@pytest.fixture
+def fake_remote_cache(fresh_triton_cache, monkeypatch):
+    server = http.server.ThreadingHTTPServer(("localhost", 0), _FakeRemoteCacheHandler)
+    server.store, server.requests = {}, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("TRITON_REMOTE_CACHE_BACKEND", f"{__name__}:HTTPRemoteCacheBackend")
+    monkeypatch.setenv("TRITON_TEST_REMOTE_CACHE_PORT", str(server.server_address[1]))
+    try:
+        yield server
+    finally:
+        server.shutdown()
+
+
+def test_remote_cache(fake_remote_cache, fresh_triton_cache, monkeypatch) -> None:
+    from triton.runtime import stats
+    from triton.runtime.cache import RemoteCacheManager, _touch_executors
+
+    files = {"kernel.cubin": b"binary", "kernel.ptx": b"ptx", "kernel.json": b"{}"}
+    cache = RemoteCacheManager("key")
+    cache.put_group("kernel.json", {name: cache.put(data, name) for name, data in files.items()})
+    # backends of the same class share their connection
+    assert RemoteCacheManager("other_key")._backend.connection is cache._backend.connection
+
+    # the group and its files are fetched with a single request
+    shutil.rmtree(fresh_triton_cache)
+    os.makedirs(fresh_triton_cache)
+    fake_remote_cache.requests.clear()
+    cache = RemoteCacheManager("key")
+    cache.prefetch_group("kernel.json", ["kernel.ttir", "kernel.ptx", "kernel.cubin", "kernel.json"])
+    group = cache.get_group("kernel.json")
+    assert {name: pathlib.Path(path).read_bytes() for name, path in group.items()} == files
+    assert [path for path, _ in fake_remote_cache.requests] == ["/get"]
+
+    # by default, the backend is always checked
+    fake_remote_cache.requests.clear()
+    assert RemoteCacheManager("key").get_group("kernel.json") == group
+    assert [path for path, _ in fake_remote_cache.requests] == ["/get", "/get"]
+
+    # in local first mode, the backend is only told about the access, in the background
+    monkeypatch.setenv("TRITON_REMOTE_CACHE_LOCAL_FIRST", "1")
+    fake_remote_cache.requests.clear()
+    stats.reset()
+    stats.enable()
+    try:
+        cache = RemoteCacheManager("key")
+        cache.prefetch_group("kernel.json", ["kernel.ttir", "kernel.ptx", "kernel.cubin", "kernel.json"])
+        assert cache.get_group("kernel.json") == group
+        counters = stats.snapshot()["counters"]
+    finally:
+        stats.disable()
+        stats.reset()
+    # wait for the background touches
+    _touch_executors[os.getpid()].submit(lambda: None).result()
+    assert fake_remote_cache.requests == [("/touch", ["key/__grp__kernel.json"] + [f"key/{f}" for f in sorted(files)])]
+    assert counters["cache_hits"] == {"tier=disk": 1}
+
+
+def test_filesystem_remote_cache(tmp_path, monkeypatch) -> None:
+    from triton.runtime.cache import RemoteCacheManager
+
+    monkeypatch.setenv("TRITON_REMOTE_CACHE_BACKEND", "triton.runtime.cache:FileSystemRemoteCacheBackend")
+    monkeypatch.setenv("TRITON_SHARED_CACHE_DIR", str(tmp_path / "shared"))
+    files = {"kernel.cubin": b"binary", "kernel.json": b"{}"}
+
+    # a node compiles the kernel...
+    monkeypatch.setenv("TRITON_CACHE_DIR", str(tmp_path / "node_0"))
+    cache = RemoteCacheManager("KEY")
+    cache.put_group("kernel.json", {name: cache.put(data, name) for name, data in files.items()})
+    assert sorted(os.listdir(tmp_path / "shared" / "KE" /
+                             "KEY")) == ["__grp__kernel.json", "kernel.cubin", "kernel.json"]
+
+    # ...and the others find it in the shared directory
+    monkeypatch.setenv("TRITON_CACHE_DIR", str(tmp_path / "node_1"))
+    group = RemoteCacheManager("KEY").get_group("kernel.json")
+    assert {name: pathlib.Path(path).read_bytes() for name, path in group.items()} == files
+    assert all(path.startswith(str(tmp_path / "node_1")) for path in group.values())
+    assert RemoteCacheManager("OTHER_KEY").get_group("kernel.json") is None
+
+
+def test_triton_key_persisted(fresh_triton_cache, monkeypatch) -> None:
+    from triton.compiler import compiler
+
+    num_computed = 0
+    compute_triton_key = compiler._compute_triton_key
+
+    def counting_compute_triton_key():
+        nonlocal num_computed
+        num_computed += 1
+        return compute_triton_key()
+
+    monkeypatch.setattr(compiler, "_compute_triton_key", counting_compute_triton_key)
+    keys = []
+    try:
+        # as if computed by separate processes
+        for _ in range(2):
+            compiler.triton_key.cache_clear()
+            keys.append(compiler.triton_key())
+    finally:
+        compiler.triton_key.cache_clear()
+    assert keys[0] == keys[1] == compute_triton_key()
+    assert num_computed == 1
+
+
+def test_triton_key_linked_backend(fresh_triton_cache, tmp_path, monkeypatch) -> None:
+    from triton.compiler import compiler
+
+    # development installs link the backends into the package
+    ext = sysconfig.get_config_var("EXT_SUFFIX").split(".")[-1]
+    (tmp_path / "triton" / "_C").mkdir(parents=True)
+    (tmp_path / "triton" / "_C" / f"libtriton.{ext}").write_bytes(b"")
+    (tmp_path / "triton" / "backends").mkdir()
+    (tmp_path / "third_party" / "nvidia" / "backend").mkdir(parents=True)
+    backend_compiler = tmp_path / "third_party" / "nvidia" / "backend" / "compiler.py"
+    backend_compiler.write_text("")
+    os.symlink(backend_compiler.parent, tmp_path / "triton" / "backends" / "nvidia")
+    files = compiler._triton_key_files(str(tmp_path / "triton"))
+    assert str(tmp_path / "triton" / "backends" / "nvidia" / "compiler.py") in files
+
+    num_computed = 0
+
+    def counting_compute_triton_key():
+        nonlocal num_computed
+        num_computed += 1
+        return str(num_computed)
+
+    triton_key_files = compiler._triton_key_files
+    monkeypatch.setattr(compiler, "_triton_key_files", lambda: triton_key_files(str(tmp_path / "triton")))
+    monkeypatch.setattr(compiler, "_compute_triton_key", counting_compute_triton_key)
+    keys = []
+    try:
+        for source in ["", "# edited"]:
+            backend_compiler.write_text(source)
+            compiler.triton_key.cache_clear()
+            keys.append(compiler.triton_key())
+    finally:
+        compiler.triton_key.cache_clear()
+    # editing the linked backend changes the key
+    assert keys == ["1", "2"]
+
+
+def test_warmup_manifest(device, fresh_triton_cache, tmp_path) -> None:
+    from triton.tools.warmup import ManifestRecorder, read_manifest, replay_manifest
+
+    manifest = tmp_path / "manifest.jsonl"
+    a = torch.ones(32, device=device)
+    o = torch.empty_like(a)
+    add_fn.device_caches.clear()
+    recorder = ManifestRecorder(manifest).install()
+    try:
+        for _ in range(2):
+            compiled = add_fn[(1, )](a, a, o, 32)
+            add_fn.device_caches.clear()
+    finally:
+        recorder.uninstall()
+    entries = read_manifest(manifest)
+    assert [(entry["module"], entry["qualname"]) for entry in entries] == [(__name__, "add_fn")]
+
+    # replaying populates an empty cache
+    shutil.rmtree(fresh_triton_cache)
+    assert replay_manifest(manifest, max_workers=2) == (1, [])
+    from triton.runtime.cache import get_cache_manager
+    assert get_cache_manager(compiled.hash).get_group(f"{compiled.name}.json") is not None
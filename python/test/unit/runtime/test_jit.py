@@ -1,4 +1,5 @@
 import itertools
+import time
 import pytest
 import torch
 
@@ -40,3 +41,39 @@ def test_pre_call_hooks(device):
     out = torch.zeros_like(x)
     with pytest.raises(Exception):
         add_kernel[(4, )](x, y, out, 4, 4)
+
+
+def test_async_compile(device, fresh_triton_cache):
+    fallback_calls = []
+
+    # called with the grid and launch options, too
+    def fallback(X, N, grid, **options):
+        fallback_calls.append((N, grid, options))
+        X.fill_(N)
+
+    @triton.jit(async_compile=True, fallback=fallback)
+    def kernel(X, N):
+        tl.store(X, N)
+
+    def wait_for_kernels(num_kernels):
+        deadline = time.time() + 300
+        while len(kernel.device_caches[torch_device][0]) < num_kernels:
+            assert time.time() < deadline, "timed out waiting for the background compilation"
+            time.sleep(0.1)
+
+    torch_device = getattr(torch, device).current_device()
+    x = torch.zeros(1, dtype=torch.int32, device=device)
+    # nothing is compiled yet: the Python fallback is used
+    kernel[(1, )](x, 5, num_warps=1)
+    assert fallback_calls == [(5, (1, ), {"num_warps": 1})] and x.item() == 5
+    wait_for_kernels(1)
+    kernel[(1, )](x, 7, num_warps=1)
+    assert len(fallback_calls) == 1 and x.item() == 7
+
+    # `N` is now divisible by 16: the kernel compiled without that assumption
+    # runs until the specialized one is compiled
+    kernel[(1, )](x, 32, num_warps=1)
+    assert len(fallback_calls) == 1 and x.item() == 32
+    wait_for_kernels(2)
+    kernel[(1, )](x, 48, num_warps=1)
+    assert x.item() == 48
@@ -0,0 +1,104 @@
+import pytest
+import torch
+
+import triton
+import triton.language as tl
+from triton.runtime.driver import driver
+from triton.tools.launch_overhead import StubDriver, run_benchmarks
+
+
+class MockLauncher:
+
+    def __init__(self):
+        self.num_launches = 0
+
+    def __call__(self, *args):
+        self.num_launches += 1
+
+
+class MockKernel:
+    """Stands in for a `CompiledKernel` so that no toolchain is needed."""
+
+    def __init__(self, launcher):
+        self.run = launcher
+        self.function = None
+        self.packed_metadata = ()
+
+    def launch_metadata(self, grid, stream, *args):
+        return None
+
+
+@pytest.fixture
+def mock_driver(monkeypatch):
+    launcher = MockLauncher()
+    monkeypatch.setattr(triton.compiler, "compile", lambda src, target, options: MockKernel(launcher))
+    driver.set_active(StubDriver())
+    try:
+        yield launcher
+    finally:
+        driver.reset_active()
+
+
+def test_constexpr_key_types(mock_driver):
+
+    @triton.jit
+    def kernel(X, C: tl.constexpr):
+        pass
+
+    x = torch.empty(16)
+    for c in [1, True, 1.0, 1, True]:
+        kernel[(1, )](x, c)
+    assert len(kernel.device_caches[0][0]) == 3
+    assert mock_driver.num_launches == 5
+
+    # values that compare equal (or never do) are keyed by their string
+    for c in [0.0, -0.0, (1, ), (True, ), float("nan"), float("nan")]:
+        kernel[(1, )](x, c)
+    assert len(kernel.device_caches[0][0]) == 8
+    binder = kernel.device_caches[0][3]
+    assert len(binder.__globals__["_keys"]) == 2
+
+
+def test_repeated_launches(mock_driver):
+
+    @triton.jit
+    def kernel(X, Y, Z, N, BLOCK: tl.constexpr):
+        pass
+
+    x, y, z = torch.empty(1024), torch.empty(1024), torch.empty(1024)
+    grid = (8, )
+    kernel[grid](x, y, z, 1024, BLOCK=128)
+
+    num_launches = 10000
+    for _ in range(num_launches):
+        kernel[grid](x, y, z, 1024, BLOCK=128)
+
+    assert mock_driver.num_launches == num_launches + 1
+    assert len(kernel.device_caches[0][0]) == 1
+
+
+def test_launch_overhead_suite(fresh_triton_cache):
+    results = run_benchmarks(iters=10, repeat=1)
+    assert "args_50" in results and "autotune" in results
+    assert all(ns > 0 for ns in results.values())
+
+
+def test_memory_cache_stats(mock_driver):
+    from triton.runtime import stats
+
+    @triton.jit
+    def kernel(X):
+        pass
+
+    x = torch.empty(16)
+    stats.reset()
+    stats.enable()
+    try:
+        for _ in range(3):
+            kernel[(1, )](x)
+        counters = stats.snapshot()["counters"]
+    finally:
+        stats.disable()
+        stats.reset()
+    assert counters["cache_misses"] == {"tier=memory": 1}
+    assert counters["cache_hits"] == {"tier=memory": 2}
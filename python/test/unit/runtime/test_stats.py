@@ -0,0 +1,62 @@
+import hashlib
+
+import pytest
+
+from triton.runtime import stats
+from triton.runtime.cache import get_cache_manager
+
+
+@pytest.fixture
+def enabled_stats():
+    stats.reset()
+    stats.enable()
+    try:
+        yield stats
+    finally:
+        stats.disable()
+        stats.reset()
+
+
+def test_disabled():
+    stats.reset()
+    stats.increment("cache_hits", tier="memory")
+    stats.observe("compile_stage_seconds", 1.0, stage="ttir")
+    assert stats.snapshot() == {"counters": {}, "histograms": {}}
+
+
+def test_export(enabled_stats):
+    stats.increment("cache_hits", tier="memory")
+    stats.increment("cache_hits", 2, tier="memory")
+    stats.increment("compilations")
+    for seconds in [0.002, 0.02, 100.0]:
+        stats.observe("compile_stage_seconds", seconds, stage="ttir")
+
+    snapshot = stats.snapshot()
+    assert snapshot["counters"] == {"cache_hits": {"tier=memory": 3}, "compilations": {"": 1}}
+    histogram = snapshot["histograms"]["compile_stage_seconds"]["stage=ttir"]
+    assert histogram["count"] == 3 and histogram["sum"] == pytest.approx(100.022)
+    assert histogram["buckets"][0.001] == 0 and histogram["buckets"][0.005] == 1
+    assert histogram["buckets"][0.05] == 2 and histogram["buckets"][60.0] == 2
+
+    text = stats.to_prometheus()
+    assert "# TYPE triton_cache_hits_total counter\n" in text
+    assert 'triton_cache_hits_total{tier="memory"} 3\n' in text
+    assert "triton_compilations_total 1\n" in text
+    assert "# TYPE triton_compile_stage_seconds histogram\n" in text
+    assert 'triton_compile_stage_seconds_bucket{stage="ttir",le="0.005"} 1\n' in text
+    assert 'triton_compile_stage_seconds_bucket{stage="ttir",le="+Inf"} 3\n' in text
+    assert 'triton_compile_stage_seconds_count{stage="ttir"} 3\n' in text
+
+
+def test_disk_cache(enabled_stats, fresh_triton_cache):
+    cache = get_cache_manager(hashlib.sha256(b"kernel").hexdigest())
+    assert cache.get_group("kernel.json") is None
+    cache.put_group("kernel.json", {"kernel.json": cache.put("{}", "kernel.json")})
+    assert cache.get_group("kernel.json") is not None
+    assert cache.read_file("kernel.json") == b"{}"
+
+    counters = stats.snapshot()["counters"]
+    assert counters["cache_hits"] == {"tier=disk": 1}
+    assert counters["cache_misses"] == {"tier=disk": 1}
+    assert counters["cache_bytes_read"] == {"tier=disk": 2}
+    assert counters["cache_bytes_written"]["tier=disk"] > 2
@@ -1,6 +1,9 @@
 import multiprocessing
+import os
 import shutil
 
+import pytest
+
 import triton
 import triton.language as tl
 from triton.compiler import ASTSource
@@ -100,3 +103,63 @@ def test_compile_in_forked_subproc_with_forced_gc(fresh_triton_cache) -> None:
     if old_gc_state:
         gc.enable()
     assert proc.exitcode == 0
+
+
+def test_compile_async(fresh_triton_cache) -> None:
+
+    @triton.jit
+    def kernel_add(a, b, o, N: tl.constexpr):
+        idx = tl.arange(0, N)
+        tl.store(o + idx, tl.load(a + idx) + tl.load(b + idx))
+
+    signature = {'a': "*fp32", 'b': "*fp32", 'o': "*fp32", 'N': 'constexpr'}
+    jobs = [(kernel_add, signature, {'N': n}, {'num_warps': w}) for n in [16, 32] for w in [1, 4]]
+    futures = triton.compiler.compile_async(jobs, target=target, max_workers=2)
+    kernels = [future.result() for future in futures]
+    assert len({kernel.hash for kernel in kernels}) == len(jobs)
+    assert [kernel.metadata.num_warps for kernel in kernels] == [1, 4, 1, 4]
+    # the kernels are in the cache
+    for (fn, signature, constexprs, options), kernel in zip(jobs, kernels):
+        src = ASTSource(fn=fn, signature=signature, constexprs=constexprs)
+        assert triton.compile(src=src, target=target, options=options).hash == kernel.hash
+
+
+def test_compile_async_error(fresh_triton_cache) -> None:
+
+    @triton.jit
+    def kernel_error(a):
+        tl.static_assert(False)
+
+    [future] = triton.compiler.compile_async([(kernel_error, {'a': "*fp32"}, None, None)], target=target)
+    with pytest.raises(triton.CompilationError):
+        future.result()
+
+
+# compile workers import the kernels they are sent, so these can't be local
+@triton.jit
+def kernel_mul(a, b, o, N: tl.constexpr):
+    idx = tl.arange(0, N)
+    tl.store(o + idx, tl.load(a + idx) * tl.load(b + idx))
+
+
+def test_compile_async_reuses_workers(fresh_triton_cache, monkeypatch) -> None:
+    from triton.runtime import stats
+
+    signature = {'a': "*fp32", 'b': "*fp32", 'o': "*fp32", 'N': 'constexpr'}
+    # kernels compiled by the workers are loaded from the cache rather than compiled again in this process
+    monkeypatch.setenv("TRITON_ALWAYS_COMPILE", "1")
+    stats.reset()
+    stats.enable()
+    executors = []
+    try:
+        for n in [16, 32]:
+            [future] = triton.compiler.compile_async([(kernel_mul, signature, {'N': n}, {})], target=target)
+            assert future.result().src.constants == {(3, ): n}
+            executors.append(triton.compiler.compiler._compile_pools[os.getpid()][None])
+        assert "compilations" not in stats.snapshot()["counters"]
+    finally:
+        stats.disable()
+        stats.reset()
+    # the workers are spawned, not forked from this process, once for both calls
+    assert executors[0] is executors[1]
+    assert executors[0]._mp_context.get_start_method() == "spawn"
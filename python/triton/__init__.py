@@ -26,6 +26,13 @@ from . import language
 from . import testing
 from . import tools
 
+import os as _os
+
+# record the kernels this process compiles, see `triton.tools.warmup`
+if _os.environ.get("TRITON_WARMUP_MANIFEST", ""):
+    from .tools.warmup import ManifestRecorder
+    ManifestRecorder(_os.environ["TRITON_WARMUP_MANIFEST"]).install()
+
 __all__ = [
     "autotune",
     "cdiv",
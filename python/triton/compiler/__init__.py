@@ -1,4 +1,7 @@
-from .compiler import CompiledKernel, ASTSource, IRSource, compile, make_backend, LazyDict
+from .compiler import CompiledKernel, ASTSource, IRSource, compile, compile_async, make_backend, LazyDict
 from .errors import CompilationError
 
-__all__ = ["compile", "make_backend", "ASTSource", "IRSource", "CompiledKernel", "CompilationError", "LazyDict"]
+__all__ = [
+    "compile", "compile_async", "make_backend", "ASTSource", "IRSource", "CompiledKernel", "CompilationError",
+    "LazyDict"
+]
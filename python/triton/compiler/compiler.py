@@ -6,8 +6,9 @@ from ..backends import backends
 from ..backends.compiler import GPUTarget
 from .. import __version__
 from ..runtime.autotuner import OutOfResources
-from ..runtime.cache import get_cache_manager, get_dump_manager, get_override_manager
+from ..runtime.cache import PackedFile, decompress, get_cache_manager, get_dump_manager, get_override_manager
 from ..runtime.driver import driver
+from ..runtime import stats
 from ..tools.disasm import get_sass
 # TODO: this shouldn't be here
 from .code_generator import ast_to_ttir
@@ -15,8 +16,13 @@ from . import config
 from pathlib import Path
 import re
 import functools
+import io
 import os
+import pickle
 import sysconfig
+import threading
+import time
+from typing import Dict, Optional
 
 # - ^\s*tt\.func\s+ : match the start of the string, any leading whitespace, the keyword func,
 #    and any following whitespace
@@ -70,13 +76,17 @@ class ASTSource:
             for k in self.signature.keys():
                 if not isinstance(k, str):
                     raise TypeError("Signature keys must be string")
+        self._hash = None
 
     def hash(self):
+        if self._hash is not None:
+            return self._hash
         sorted_sig = [v for k, v in sorted(self.signature.items())]
         get_key = lambda x: x.cache_key if hasattr(x, 'cache_key') else str(x)
         constants_key = '-'.join([get_key(v) for k, v in sorted(self.constants.items())])
         key = f"{self.fn.cache_key}-{str(self.attrs)}-{sorted_sig}-{constants_key}"
-        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+        self._hash = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self._hash
 
     def make_ir(self, options, codegen_fns, module_map, context):
         return ast_to_ttir(self.fn, self, context=context, options=options, codegen_fns=codegen_fns,
@@ -127,8 +137,44 @@ class IRSource:
         return dict()
 
 
+def _triton_key_files(triton_path=None):
+    # every file whose contents `_compute_triton_key` hashes (and a few more)
+    TRITON_PATH = triton_path or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ext = sysconfig.get_config_var("EXT_SUFFIX").split(".")[-1]
+    files = [__file__, os.path.join(TRITON_PATH, "_C", f"libtriton.{ext}")]
+    for subdir in ["compiler", "backends", "language"]:
+        # like `pkgutil.walk_packages`, follows the links that development installs make to the backends
+        for root, dirs, filenames in os.walk(os.path.join(TRITON_PATH, subdir), followlinks=True):
+            dirs.sort()
+            files += [os.path.join(root, f) for f in sorted(filenames) if f.endswith(".py")]
+    return files
+
+
 @functools.lru_cache()
 def triton_key():
+    """
+    Returns a key identifying this version of the compiler, derived from the
+    contents of its sources and of libtriton. As hashing them is slow, the key
+    is stored in the cache directory, keyed by the paths, sizes, modification
+    times and inodes of these files, for other processes to reuse.
+    """
+    from ..runtime.cache import FileCacheManager
+    file_stats = []
+    for path in _triton_key_files():
+        st = os.stat(path)
+        file_stats.append(f"{path}:{st.st_size}:{st.st_mtime_ns}:{st.st_ino}")
+    files_key = hashlib.sha256(f"{__version__}-{'-'.join(file_stats)}".encode("utf-8")).hexdigest()
+    # the key only applies to this machine, so it never goes to a remote cache
+    cache = FileCacheManager(files_key)
+    key = cache.read_file("triton_key.txt")
+    if key is not None:
+        return key.decode("utf-8")
+    key = _compute_triton_key()
+    cache.put(key, "triton_key.txt")
+    return key
+
+
+def _compute_triton_key():
     import pkgutil
     TRITON_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     contents = []
@@ -228,7 +274,7 @@ def compile(src, target=None, options=None):
     options = backend.parse_options(dict(options or dict(), **extra_options))
     # create cache manager
     env_vars = get_cache_invalidating_env_vars()
-    key = f"{triton_key()}-{src.hash()}-{backend.hash()}-{options.hash()}-{str(sorted(env_vars.items()))}"
+    key = f"{triton_key()}-{src.hash()}-{_backend_hash(backend)}-{_options_hash(options)}-{str(sorted(env_vars.items()))}"
     hash = hashlib.sha256(key.encode("utf-8")).hexdigest()
     fn_cache_manager = get_cache_manager(hash)
     # For dumping/overriding only hash the source as we want it to be independent of triton
@@ -244,12 +290,20 @@ def compile(src, target=None, options=None):
     # the file name to 150 characters to be safe.
     file_name = src.name[:150]
     metadata_filename = f"{file_name}.json"
+    stages = dict()
+    backend.add_stages(stages, options)
+    # lets remote caches fetch the group and the files of every stage at once
+    fn_cache_manager.prefetch_group(metadata_filename, [f"{file_name}.{ext}" for ext in stages] + [metadata_filename])
     metadata_group = fn_cache_manager.get_group(metadata_filename) or {}
     metadata_path = metadata_group.get(metadata_filename)
     always_compile = os.environ.get("TRITON_ALWAYS_COMPILE", "0") == "1"
     if not always_compile and metadata_path is not None:
         # cache hit!
-        return CompiledKernel(src, metadata_group, hash)
+        try:
+            return CompiledKernel(src, metadata_group, hash)
+        except FileNotFoundError:
+            # the group refers to files that were since removed
+            metadata_group = {}
     # initialize metadata
     metadata = {
         "hash": hash,
@@ -259,8 +313,6 @@ def compile(src, target=None, options=None):
     }
     metadata["triton_version"] = __version__
     # run compilation pipeline  and populate metadata
-    stages = dict()
-    backend.add_stages(stages, options)
     first_stage = list(stages.keys()).index(src.ext)
     # when the source is an IR file, don't apply the passes related to this stage. This makes it easier to write IR level tests.
     if ir_source:
@@ -281,8 +333,11 @@ def compile(src, target=None, options=None):
         filter_traceback(e)
         raise
     use_ir_loc = os.environ.get("USE_IR_LOC", None)
+    stats.increment("compilations")
     for ext, compile_ir in list(stages.items())[first_stage:]:
+        start = time.perf_counter()
         next_module = compile_ir(module, metadata)
+        stats.observe("compile_stage_seconds", time.perf_counter() - start, stage=ext)
         ir_filename = f"{file_name}.{ext}"
         if (fn_override_manager is not None and (full_name := fn_override_manager.get_file(ir_filename)) is not None):
             print(f"\nOverriding kernel with file {full_name}")
@@ -317,6 +372,184 @@ def compile(src, target=None, options=None):
     return CompiledKernel(src, metadata_group, hash)
 
 
+class _StaleCompileJob(Exception):
+    """A job refers to a JIT function that its worker process can't find."""
+
+
+class _CompileJobPickler(pickle.Pickler):
+    # JIT functions can't be pickled; they are sent by name, and imported again by the worker
+    def persistent_id(self, obj):
+        from ..runtime.jit import JITFunction
+        if isinstance(obj, JITFunction):
+            if "<locals>" in obj.fn.__qualname__ or obj.fn.__module__ == "__main__":
+                raise pickle.PicklingError(f"{obj.fn.__qualname__} can't be looked up by name")
+            return obj.fn.__module__, obj.fn.__qualname__, obj.cache_key
+        return None
+
+
+class _CompileJobUnpickler(pickle.Unpickler):
+
+    def persistent_load(self, pid):
+        import importlib
+        from ..runtime.jit import JITFunction
+        module, qualname, cache_key = pid
+        try:
+            fn = importlib.import_module(module)
+            for name in qualname.split("."):
+                fn = getattr(fn, name)
+            # e.g., autotuned kernels
+            while not isinstance(fn, JITFunction):
+                fn = fn.fn
+        except Exception as e:
+            raise _StaleCompileJob() from e
+        # updated in the sending process since its module was imported
+        if fn.cache_key != cache_key:
+            raise _StaleCompileJob()
+        return fn
+
+
+def _async_compile_job(job):
+    src, target, options = _CompileJobUnpickler(io.BytesIO(job)).load()
+    return compile(src, target=target, options=options).hash
+
+
+def _load_compiled(src, hash):
+    # the kernel compiled by a worker, read back from the cache even if TRITON_ALWAYS_COMPILE is set
+    metadata_filename = f"{src.name[:150]}.json"
+    metadata_group = get_cache_manager(hash).get_group(metadata_filename) or {}
+    if metadata_filename not in metadata_group:
+        return None
+    try:
+        return CompiledKernel(src, metadata_group, hash)
+    except FileNotFoundError:
+        return None
+
+
+# pid -> max_workers -> executor
+_compile_pools: Dict[int, Dict[Optional[int], object]] = {}
+_compile_pools_lock = threading.Lock()
+_local_compile_executors = {}
+
+
+def _get_compile_pool(max_workers):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with _compile_pools_lock:
+        pools = _compile_pools.setdefault(os.getpid(), {})
+        if max_workers not in pools:
+            # Workers are spawned rather than forked: this process may have initialized the device and run threads
+            # (background tunings and compilations, the thread pool of the MLIR context) holding locks that a forked
+            # child would find taken forever.
+            pools[max_workers] = ProcessPoolExecutor(max_workers or os.cpu_count() or 1,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+        return pools[max_workers]
+
+
+def _get_local_compile_executor():
+    # compiles the jobs that can't be sent to workers, and reports errors
+    from concurrent.futures import ThreadPoolExecutor
+    with _compile_pools_lock:
+        if os.getpid() not in _local_compile_executors:
+            _local_compile_executors[os.getpid()] = ThreadPoolExecutor(1, thread_name_prefix="triton-compile")
+        return _local_compile_executors[os.getpid()]
+
+
+def compile_async(jobs, target=None, max_workers=None):
+    """
+    Compiles kernels concurrently in a pool of worker processes.
+
+    Each job is a tuple `(fn, signature, constexprs, options)`, optionally
+    followed by `attrs`, where `fn` is a JIT function (or a wrapper of one)
+    and the other entries are as for `ASTSource` and `compile`. Returns a
+    `concurrent.futures.Future` of the `CompiledKernel` of each job.
+
+    The pool of `max_workers` processes (by default, one per CPU) is
+    spawned on first use and kept for later calls. Jobs refer to their JIT
+    functions by module and qualified name, which workers import; as with
+    any pool of spawned processes, workers import the main module too, so
+    scripts should guard their entry point with `if __name__ == "__main__"`.
+    Workers only populate the cache; the kernels are then loaded from the
+    cache in this process. JIT functions that can't be imported by name
+    (e.g., local ones, or those of the main module) are compiled in this
+    process, as are the jobs that fail in a worker, so that their futures
+    raise the original error.
+    """
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+    from ..runtime.jit import JITFunction
+    if target is None:
+        target = driver.active.get_current_target()
+    compile_jobs = []
+    for fn, signature, constexprs, options, *attrs in jobs:
+        while not isinstance(fn, JITFunction):
+            fn = fn.fn
+        compile_jobs.append((ASTSource(fn, signature, constexprs, *attrs), target, options))
+    if not compile_jobs:
+        return []
+
+    def compile_locally(future, job):
+        src, target, options = job
+        try:
+            future.set_result(compile(src, target=target, options=options))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def load(worker_future, future, job):
+        e = worker_future.exception()
+        kernel = _load_compiled(job[0], worker_future.result()) if e is None else None
+        if kernel is not None:
+            future.set_result(kernel)
+        else:
+            _get_local_compile_executor().submit(compile_locally, future, job)
+
+    executor = _get_compile_pool(max_workers)
+    futures = []
+    for job in compile_jobs:
+        future = Future()
+        futures.append(future)
+        try:
+            # sources are sent by reference to the JIT functions imported by the worker
+            buffer = io.BytesIO()
+            _CompileJobPickler(buffer).dump(job)
+        except Exception:
+            executor_job = None
+        else:
+            executor_job = buffer.getvalue()
+        try:
+            # a pool whose workers died is kept, so that workers that can't start aren't spawned again
+            worker_future = executor.submit(_async_compile_job, executor_job) if executor_job is not None else None
+        except BrokenProcessPool:
+            worker_future = None
+        if worker_future is None:
+            _get_local_compile_executor().submit(compile_locally, future, job)
+            continue
+        worker_future.add_done_callback(lambda f, future=future, job=job: load(f, future, job))
+    return futures
+
+
+_backend_hashes = {}
+_options_hashes = {}
+
+
+def _backend_hash(backend):
+    # backends are created for every compilation, but their hash only depends on the target
+    key = (type(backend), backend.target)
+    if key not in _backend_hashes:
+        _backend_hashes[key] = backend.hash()
+    return _backend_hashes[key]
+
+
+def _options_hash(options):
+    # equal options have the same hash
+    try:
+        if options not in _options_hashes:
+            _options_hashes[options] = options.hash()
+        return _options_hashes[options]
+    except TypeError:
+        # unhashable options
+        return options.hash()
+
+
 def make_backend(target):
     actives = [x.compiler for x in backends.values() if x.compiler.supports_target(target)]
     if len(actives) != 1:
@@ -341,11 +574,35 @@ class LazyDict:
         self.extras.append((func, args))
 
 
+def _read_cache_file(file, binary):
+    # cache managers return either paths or packed files, whose contents may be compressed
+    data = file.read() if isinstance(file, PackedFile) else Path(file).read_bytes()
+    stats.increment("cache_bytes_read", len(data), tier="disk")
+    data = decompress(data)
+    return data if binary else data.decode("utf-8")
+
+
 class AsmDict(dict):
+    """
+    The IR of each stage of a kernel, keyed by file extension. The IR of
+    `files` (a mapping from extensions to cache files) is only read from the
+    cache when first accessed.
+    """
+
+    def __init__(self, data, files=None):
+        super().__init__(data)
+        self._files = {ext: file for ext, file in (files or {}).items() if ext not in data}
 
     def __missing__(self, key):
 
-        if key == "sass":
+        if key in self._files:
+            try:
+                value = _read_cache_file(self._files[key], binary=False)
+            except FileNotFoundError as e:
+                raise RuntimeError(f"The {key} of this kernel was evicted from the cache since the kernel was loaded "
+                                   "(see TRITON_CACHE_MAX_SIZE and TRITON_CACHE_MAX_AGE)") from e
+            del self._files[key]
+        elif key == "sass":
             value = get_sass(self["cubin"])
         else:
             raise KeyError("Unknown key: '%s'" % key)
@@ -353,6 +610,52 @@ class AsmDict(dict):
         self[key] = value
         return value
 
+    def _load(self):
+        for key in list(self._files):
+            self[key]
+
+    def __contains__(self, key):
+        return super().__contains__(key) or key in self._files
+
+    def __len__(self):
+        return super().__len__() + len(self._files)
+
+    def __iter__(self):
+        self._load()
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def copy(self):
+        # the copy reads the IR that wasn't read yet on first access, too
+        return AsmDict(super().copy(), self._files)
+
+    def keys(self):
+        self._load()
+        return super().keys()
+
+    def values(self):
+        self._load()
+        return super().values()
+
+    def items(self):
+        self._load()
+        return super().items()
+
+
+# metadata of kernels with the same fields share their class
+_kernel_metadata_types = {}
+
+
+def _make_kernel_metadata(metadata):
+    fields = tuple(sorted(metadata.keys()))
+    KernelMetadata = _kernel_metadata_types.get(fields)
+    if KernelMetadata is None:
+        from collections import namedtuple
+        KernelMetadata = _kernel_metadata_types[fields] = namedtuple('KernelMetadata', fields)
+    return KernelMetadata(**metadata)
+
 
 class CompiledKernel:
 
@@ -362,28 +665,24 @@ class CompiledKernel:
     launch_exit_hook = None
 
     def __init__(self, src, metadata_group, hash):
-        from collections import namedtuple
-        metadata_path = next((Path(p) for c, p in metadata_group.items() if c.endswith(".json")))
-        metadata = json.loads(metadata_path.read_text())
+        metadata_file = next((p for c, p in metadata_group.items() if c.endswith(".json")))
+        metadata = json.loads(_read_cache_file(metadata_file, binary=False))
         metadata['cluster_dims'] = tuple(metadata['cluster_dims'])
         # JSON serialization dumps the target as a dict. Restore it to a GPUTarget.
         target = metadata['target']
         metadata['target'] = GPUTarget(target['backend'], target['arch'], target['warp_size'])
-        KernelMetadata = namedtuple('KernelMetadata', sorted(list(metadata.keys())))
-        self.metadata = KernelMetadata(**metadata)
+        self.metadata = _make_kernel_metadata(metadata)
         backend = make_backend(self.metadata.target)
         self.packed_metadata = backend.pack_metadata(self.metadata)
         self.src = src
         self.hash = hash
         self.name = self.metadata.name
-        # stores the text of each level of IR that was generated during compilation
-        asm_files = [Path(p) for c, p in metadata_group.items() if not c.endswith(".json")]
+        # stores the text of each level of IR that was generated during compilation;
+        # only the binary is needed to launch the kernel, the rest is read on first access
+        asm_files = {Path(c).suffix[1:]: p for c, p in metadata_group.items() if not c.endswith(".json")}
         binary_ext = backend.binary_ext
-        self.asm = AsmDict({
-            file.suffix[1:]: file.read_bytes() if file.suffix[1:] == binary_ext else file.read_text()
-            for file in asm_files
-        })
-        self.kernel = self.asm[binary_ext]
+        self.kernel = _read_cache_file(asm_files[binary_ext], binary=True)
+        self.asm = AsmDict({binary_ext: self.kernel}, asm_files)
         # binaries are lazily initialized
         # because it involves doing runtime things
         # (e.g., checking amount of shared memory on current device)
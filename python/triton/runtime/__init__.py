@@ -1,23 +1,32 @@
-from .autotuner import (Autotuner, Config, Heuristics, autotune, heuristics)
-from .cache import RedisRemoteCacheBackend, RemoteCacheBackend
+from .autotuner import (Autotuner, Config, Heuristics, ModelGuidedSearch, SearchStrategy, SuccessiveHalving, autotune,
+                        heuristics)
+from . import autotune_db, stats
+from .cache import (FileSystemRemoteCacheBackend, PooledRemoteCacheBackend, RedisRemoteCacheBackend, RemoteCacheBackend)
 from .driver import driver
 from .jit import JITFunction, KernelInterface, MockTensor, TensorWrapper, reinterpret
 from .errors import OutOfResources, InterpreterError
 
 __all__ = [
     "autotune",
+    "autotune_db",
     "Autotuner",
     "Config",
     "driver",
+    "FileSystemRemoteCacheBackend",
     "Heuristics",
     "heuristics",
     "InterpreterError",
     "JITFunction",
     "KernelInterface",
     "MockTensor",
+    "ModelGuidedSearch",
     "OutOfResources",
+    "PooledRemoteCacheBackend",
     "RedisRemoteCacheBackend",
     "reinterpret",
+    "SearchStrategy",
+    "stats",
+    "SuccessiveHalving",
     "RemoteCacheBackend",
     "TensorWrapper",
 ]
@@ -0,0 +1,179 @@
+"""
+A portable database of autotuning results: the best config of each kernel
+for each device architecture and value of its autotuning key. Unlike the
+results cached with `cache_results=True`, entries don't depend on the
+version of Triton or on the source of the kernel, so they can be exported
+from a tuning run, merged across machines and shipped with a package.
+
+A database is a directory with a JSON file per kernel, named after the
+module and qualified name of the kernel:
+
+    # record the results of a tuning run
+    TRITON_AUTOTUNE_DB_EXPORT=tuned/ python train.py
+    # merge the results of several machines
+    python -m triton.tools.autotune_db merge shipped/ tuned-a100/ tuned-h100/
+    # use them: the keys found in the database are never benchmarked
+    TRITON_AUTOTUNE_DB=shipped/ python serve.py
+
+`TRITON_AUTOTUNE_DB` may list several databases, separated by
+`os.pathsep`; the first one with an entry for a key is used.
+"""
+
+import contextlib
+import json
+import os
+import uuid
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def get_db_dirs() -> List[str]:
+    return [path for path in os.getenv("TRITON_AUTOTUNE_DB", "").split(os.pathsep) if path.strip()]
+
+
+def get_export_dir() -> Optional[str]:
+    return os.getenv("TRITON_AUTOTUNE_DB_EXPORT", "").strip() or None
+
+
+def get_kernel_name(fn) -> str:
+    return f"{fn.__module__}.{fn.__qualname__}"
+
+
+def get_arch(target) -> str:
+    return f"{target.backend}:{target.arch}"
+
+
+def _get_path(db_dir, kernel) -> str:
+    # local kernels have "<locals>" in their name
+    return os.path.join(db_dir, kernel.replace("<", "").replace(">", "") + ".json")
+
+
+def _entry_id(entry):
+    return entry["arch"], json.dumps(entry["key"])
+
+
+def _timing(entry) -> float:
+    timing = entry.get("timing")
+    if timing is None:
+        return float("inf")
+    return timing[0] if isinstance(timing, list) else timing
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """
+    Holds an exclusive lock on the database file at `path`, so that
+    processes recording into the same database don't lose each other's
+    entries.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    lock_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.lock")
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_entries(path) -> List[dict]:
+    """Returns the entries of the database file at `path`, if any."""
+    try:
+        with open(path) as f:
+            return json.load(f)["entries"]
+    except FileNotFoundError:
+        return []
+
+
+def write_entries(path, kernel, entries: List[dict]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    entries = sorted(entries, key=_entry_id)
+    temp_path = f"{path}.tmp.{os.getpid()}.{uuid.uuid4()}"
+    with open(temp_path, "w") as f:
+        json.dump({"kernel": kernel, "entries": entries}, f, indent=1)
+    os.replace(temp_path, path)
+
+
+def merge_entries(*entry_lists) -> List[dict]:
+    """
+    Merges lists of entries. When several entries have the same
+    architecture and key, the one with the smallest timing is kept.
+    """
+    merged = {}
+    for entries in entry_lists:
+        for entry in entries:
+            entry_id = _entry_id(entry)
+            if entry_id not in merged or _timing(entry) < _timing(merged[entry_id]):
+                merged[entry_id] = entry
+    return list(merged.values())
+
+
+def merge(dest_dir, src_dirs) -> int:
+    """
+    Merges the databases `src_dirs` into `dest_dir` (see `merge_entries`).
+    Returns the number of entries of `dest_dir`.
+    """
+    kernels = {}
+    for db_dir in [dest_dir, *src_dirs]:
+        if not os.path.isdir(db_dir):
+            continue
+        for filename in sorted(os.listdir(db_dir)):
+            if filename.endswith(".json"):
+                with open(os.path.join(db_dir, filename)) as f:
+                    data = json.load(f)
+                kernels.setdefault(data["kernel"], []).append(data["entries"])
+    num_entries = 0
+    for kernel, entry_lists in kernels.items():
+        path = _get_path(dest_dir, kernel)
+        with _locked(path):
+            entries = merge_entries(read_entries(path), *entry_lists)
+            write_entries(path, kernel, entries)
+        num_entries += len(entries)
+    return num_entries
+
+
+def record(db_dir, kernel, arch, key, config, timing=None):
+    """
+    Records `config` as the best config of `kernel` on `arch` for `key`,
+    replacing the previous entry, if any. Keys or configs that can't be
+    stored as JSON (e.g., configs with a `pre_hook`) are skipped.
+    """
+    if config.pre_hook is not None:
+        return
+    config = dict(config.__dict__)
+    del config["pre_hook"]
+    entry = {
+        "arch": arch,
+        "key": list(key),
+        "config": config,
+        "timing": list(timing) if isinstance(timing, (list, tuple)) else timing,
+    }
+    try:
+        json.dumps(entry)
+    except TypeError:
+        return
+    path = _get_path(db_dir, kernel)
+    with _locked(path):
+        entries = [e for e in read_entries(path) if _entry_id(e) != _entry_id(entry)]
+        write_entries(path, kernel, entries + [entry])
+
+
+def load(kernel, arch, db_dirs=None) -> Dict[tuple, object]:
+    """
+    Returns the best config of `kernel` on `arch` for each key found in
+    `db_dirs` (by default, those of `TRITON_AUTOTUNE_DB`).
+    """
+    from .autotuner import Config
+    configs = {}
+    for db_dir in get_db_dirs() if db_dirs is None else db_dirs:
+        for entry in read_entries(_get_path(db_dir, kernel)):
+            if entry["arch"] == arch:
+                configs.setdefault(tuple(entry["key"]), Config(**entry["config"]))
+    return configs
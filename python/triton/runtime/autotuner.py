@@ -1,23 +1,261 @@
 from __future__ import annotations
 
+import bisect
 import builtins
 import os
 import time
 import inspect
 import hashlib
 import json
+import math
+import random
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Tuple, List, Optional
 
+from . import autotune_db
 from .jit import KernelInterface
 from .errors import OutOfResources, PTXASError
 from .driver import driver
 
 
+class SearchStrategy:
+    """
+    Decides which configs the autotuner benchmarks, and for how long. The
+    default strategy benchmarks every config with the full budget of the
+    benchmarking function.
+
+    Strategies implement `search`, which is given the configs to choose from
+    and `bench(configs, rep=None)`, benchmarking a list of configs for about
+    `rep` milliseconds each (the default budget of the benchmarking function
+    if None) and returning their timings. The configs passed to a single
+    call of `bench` are compiled concurrently.
+    """
+
+    # whether `search` relies on `rep`, which the benchmarking function must then accept
+    uses_rep = False
+
+    def search(self, configs: List[Config], bench) -> Tuple[Config, Dict[Config, List[float]]]:
+        """
+        Returns the best of `configs`, along with the timings measured for
+        the configs that were benchmarked.
+        """
+        timings = bench(configs)
+        return builtins.min(timings, key=timings.get), timings
+
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Benchmarks every config for `min_rep` milliseconds, keeps the fastest
+    `1 / reduction_factor` of them and benchmarks those again, for
+    `reduction_factor` times longer, until a single config is left or the
+    configs are benchmarked for `max_rep` milliseconds.
+
+    Configs that are clearly slower than the others are discarded after a
+    few runs, which makes tuning large sets of configs much faster. The
+    timings of a discarded config are the ones measured in the last round
+    it took part in.
+
+    The benchmarking function must have a `rep` parameter, as
+    `triton.testing.do_bench` does; otherwise, the autotuner benchmarks
+    every config once with its full budget instead.
+    """
+
+    uses_rep = True
+
+    def __init__(self, min_rep=5, max_rep=100, reduction_factor=2):
+        if reduction_factor < 2:
+            raise ValueError(f"reduction_factor must be at least 2, got {reduction_factor}")
+        self.min_rep = min_rep
+        self.max_rep = max_rep
+        self.reduction_factor = reduction_factor
+
+    def search(self, configs, bench):
+        rep = builtins.min(self.min_rep, self.max_rep)
+        timings = bench(configs, rep)
+        survivors = list(timings)
+        while True:
+            num_survivors = -(-len(survivors) // self.reduction_factor)
+            survivors = sorted(survivors, key=timings.get)[:num_survivors]
+            if len(survivors) <= 1 or rep >= self.max_rep:
+                break
+            rep = builtins.min(rep * self.reduction_factor, self.max_rep)
+            timings.update(bench(survivors, rep))
+        return builtins.min(survivors, key=timings.get), timings
+
+
+def _config_features(configs):
+    # One point per config, with a coordinate per meta-parameter in [0, 1]. Positive numeric values are on a log
+    # scale, as meta-parameters are mostly powers of two; other values get a coordinate per distinct value, so
+    # that configs with different values are at a distance of 1.
+    all_kwargs = [config.all_kwargs() for config in configs]
+    columns = []
+    for name in sorted({name for kwargs in all_kwargs for name in kwargs}):
+        values = [kwargs.get(name) for kwargs in all_kwargs]
+        if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            if all(v > 0 for v in values):
+                values = [math.log2(v) for v in values]
+            lo, hi = builtins.min(values), builtins.max(values)
+            columns.append([(v - lo) / (hi - lo) if hi > lo else 0.0 for v in values])
+        else:
+            for distinct in {repr(v) for v in values}:
+                columns.append([math.sqrt(0.5) if repr(v) == distinct else 0.0 for v in values])
+    return [tuple(point) for point in zip(*columns)] if columns else [()] * len(configs)
+
+
+class ModelGuidedSearch(SearchStrategy):
+    """
+    Benchmarks at most `budget` configs of a large space of configs, e.g.
+    the Cartesian product of block sizes, numbers of warps and numbers of
+    stages.
+
+    The first `num_initial` configs benchmarked are spread over the space.
+    The next ones are chosen `batch_size` at a time by a surrogate model,
+    which predicts the timing of each config from the timings of its
+    `num_neighbors` nearest benchmarked configs, in a space where each
+    meta-parameter is scaled to [0, 1] (on a log scale for numeric ones).
+    The configs benchmarked next are those predicted to be fast or far from
+    any benchmarked config, and `exploration` trades one for the other.
+
+    All configs are benchmarked if there are at most `budget` of them.
+    """
+
+    def __init__(self, budget=32, num_initial=8, batch_size=4, num_neighbors=3, exploration=1.0, seed=0):
+        self.budget = budget
+        self.num_initial = num_initial
+        self.batch_size = batch_size
+        self.num_neighbors = num_neighbors
+        self.exploration = exploration
+        self.seed = seed
+
+    def search(self, configs, bench):
+        configs = list(dict.fromkeys(configs))
+        if len(configs) <= self.budget:
+            return super().search(configs, bench)
+        points = _config_features(configs)
+        # (distance, index) of the nearest benchmarked configs of each config
+        nearest = [[] for _ in configs]
+        # log of the median timing of the benchmarked configs, or its prediction for those being benchmarked
+        values = {}
+
+        def observe(j, value):
+            if j not in values:
+                for i, point in enumerate(points):
+                    bisect.insort(nearest[i], (math.dist(point, points[j]), j))
+                    del nearest[i][self.num_neighbors:]
+            values[j] = value
+
+        def observe_timings(batch):
+            timings.update(bench([configs[j] for j in batch]))
+            for j in batch:
+                timing = timings[configs[j]]
+                timing = timing[0] if isinstance(timing, (list, tuple)) else timing
+                observe(j, math.log(builtins.max(timing, 1e-9)))
+
+        timings = {}
+        observe_timings(self._spread(points, random.Random(self.seed).randrange(len(configs))))
+        while len(timings) < self.budget:
+            batch = self._propose(points, nearest, values, observe)
+            if not batch:
+                break
+            observe_timings(batch)
+        return builtins.min(timings, key=timings.get), timings
+
+    def _spread(self, points, first):
+        # farthest point sampling
+        selected = [first]
+        distances = [math.dist(point, points[first]) for point in points]
+        while len(selected) < builtins.min(self.num_initial, self.budget):
+            i = builtins.max(range(len(points)), key=distances.__getitem__)
+            if distances[i] == 0:
+                break
+            selected.append(i)
+            distances = [builtins.min(d, math.dist(point, points[i])) for d, point in zip(distances, points)]
+        return selected
+
+    def _propose(self, points, nearest, values, observe):
+        finite = [v for v in values.values() if v != float("inf")]
+        # configs that failed are modeled as much slower than the slowest one that ran
+        worst = builtins.max(finite, default=0.0) + 1.0
+        scale = statistics.pstdev(finite) if len(finite) > 1 else 1.0
+        batch = []
+        for _ in range(builtins.min(self.batch_size, self.budget - len(values))):
+            best, best_score = None, float("inf")
+            for i, neighbors in enumerate(nearest):
+                if i in values:
+                    continue
+                weights = [1 / (d * d + 1e-9) for d, _ in neighbors]
+                mean = sum(w * builtins.min(values[j], worst) for w, (_, j) in zip(weights, neighbors)) / sum(weights)
+                score = mean - self.exploration * scale * neighbors[0][0]
+                if score < best_score:
+                    best, best_score = (i, mean), score
+            if best is None:
+                break
+            # the rest of the batch is chosen as if the config was benchmarked as predicted
+            observe(*best)
+            batch.append(best[0])
+        return batch
+
+
+def _bench_params(do_bench):
+    # which of the `warmup` and `rep` parameters of `triton.testing.do_bench` the benchmarking function accepts
+    try:
+        params = inspect.signature(do_bench).parameters.values()
+    except (TypeError, ValueError):
+        return set()
+    if any(param.kind == inspect.Parameter.VAR_KEYWORD for param in params):
+        return {"warmup", "rep"}
+    return {param.name for param in params} & {"warmup", "rep"}
+
+
+def _bucket_pow2(value):
+    # the smallest power of two at least as large as positive integers
+    if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+        return 1 << (value - 1).bit_length()
+    return value
+
+
+def _key_distance(a, b):
+    # numeric key values are compared on a log scale, others must be equal
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (a, b)):
+        return abs(math.log2(1 + abs(a)) - math.log2(1 + abs(b)))
+    return 0.0 if a == b else float("inf")
+
+
+def _clone(arg):
+    return arg.clone() if hasattr(arg, "data_ptr") and hasattr(arg, "clone") else arg
+
+
+_background_tuners = {}
+_background_streams = {}
+
+
+def _get_background_tuner():
+    # a single thread per process, so that configs of different kernels aren't benchmarked at the same time
+    executor = _background_tuners.get(os.getpid())
+    if executor is None:
+        executor = _background_tuners[os.getpid()] = ThreadPoolExecutor(1, thread_name_prefix="triton-autotune")
+    return executor
+
+
+def _get_background_stream(device):
+    # background benchmarks run on their own stream, so that they aren't queued behind (or ahead of) the kernels
+    # launched on the current stream
+    stream_key = (os.getpid(), device)
+    stream = _background_streams.get(stream_key)
+    if stream is None:
+        device_interface = driver.active.get_device_interface()
+        stream = _background_streams[stream_key] = device_interface.Stream(device)
+    return stream
+
+
 class Autotuner(KernelInterface):
 
     def __init__(self, fn, arg_names, configs, key, reset_to_zero, restore_value, pre_hook=None, post_hook=None,
                  prune_configs_by: Optional[Dict] = None, warmup=None, rep=None, use_cuda_graph=False, do_bench=None,
-                 cache_results=False):
+                 cache_results=False, search_strategy: Optional[SearchStrategy] = None, key_bucketing=None,
+                 tune_in_background=False):
         """
         :param prune_configs_by: a dict of functions that are used to prune configs, fields:
             'perf_model': performance model used to predicate running time with different configs, returns running time
@@ -30,6 +268,27 @@ class Autotuner(KernelInterface):
             self.configs = configs
         self.keys = key
         self.cache: Dict[Tuple, Config] = {}
+        if key_bucketing is None or isinstance(key_bucketing, dict):
+            key_bucketing = key_bucketing or {}
+        else:
+            key_bucketing = {name: key_bucketing for name in key}
+        for name, policy in key_bucketing.items():
+            if isinstance(policy, str) and policy != "pow2":
+                raise ValueError(f"Unsupported bucketing policy {policy!r} for {name}, expected 'pow2' or a function")
+        self.key_buckets = {
+            name: _bucket_pow2 if policy == "pow2" else policy
+            for name, policy in key_bucketing.items()
+        }
+        self.tune_in_background = tune_in_background
+        # keys being tuned in the background -> future of the tuning
+        self.background_tunings = {}
+        # timings of the best config of each key tuned by this process
+        self.best_timings = {}
+        # architectures whose entries of the autotuning database are loaded
+        self._db_archs = set()
+        # configs are never benchmarked in the foreground and in the background at the same time
+        self._tuning_lock = threading.Lock()
+        self._local = threading.local()
         self.arg_names = arg_names
         self.cache_results = cache_results or os.getenv("TRITON_CACHE_AUTOTUNING", None) == "1"
 
@@ -78,6 +337,7 @@ class Autotuner(KernelInterface):
             self.perf_model = prune_configs_by.get("perf_model", self.perf_model)
             self.configs_top_k = prune_configs_by.get("top_k", self.configs_top_k)
             self.early_config_prune = prune_configs_by.get("early_config_prune", self.early_config_prune)
+        self.search_strategy = search_strategy or SearchStrategy()
 
         self.fn = fn
         self.base_fn = fn
@@ -95,30 +355,35 @@ class Autotuner(KernelInterface):
             warnings.warn(("warmup, rep, and use_cuda_graph parameters are deprecated. See "
                            "https://github.com/triton-lang/triton/pull/4496 for details."), DeprecationWarning,
                           stacklevel=1)
+            # `warmup` and `rep` are the defaults, which search strategies may shorten
+            default_warmup = warmup if warmup is not None else 25
+            default_rep = rep if rep is not None else 100
             if use_cuda_graph:
                 from ..testing import do_bench_cudagraph
-                self.do_bench = lambda kernel_call, quantiles: do_bench_cudagraph(
+                self.do_bench = lambda kernel_call, quantiles, rep=default_rep: do_bench_cudagraph(
                     kernel_call,
-                    rep=rep if rep is not None else 100,
+                    rep=rep,
                     quantiles=quantiles,
                 )
-                return
+            else:
+                import triton.testing
 
-            import triton.testing
-            self.do_bench = lambda kernel_call, quantiles: triton.testing.do_bench(
-                kernel_call,
-                warmup=warmup if warmup is not None else 25,
-                rep=rep if rep is not None else 100,
-                quantiles=quantiles,
-            )
-            return
+                def _do_bench(kernel_call, quantiles, warmup=default_warmup, rep=default_rep):
+                    return triton.testing.do_bench(kernel_call, warmup=warmup, rep=rep, quantiles=quantiles)
 
-        if do_bench is None:
+                self.do_bench = _do_bench
+        elif do_bench is None:
             self.do_bench = driver.active.get_benchmarker()
         else:
             self.do_bench = do_bench
 
-    def _bench(self, *args, config, **meta):
+        if self.search_strategy.uses_rep and "rep" not in _bench_params(self.do_bench):
+            import warnings
+            warnings.warn((f"{type(self.search_strategy).__name__} needs a benchmarking function with a `rep` "
+                           "parameter; every config is benchmarked once with the full budget instead."), stacklevel=2)
+            self.search_strategy = SearchStrategy()
+
+    def _bench(self, *args, config, bench_rep=None, **meta):
         from ..compiler.errors import CompileTimeAssertionFailure
 
         verbose = os.environ.get("TRITON_PRINT_AUTOTUNING", None) == "1"
@@ -153,13 +418,58 @@ class Autotuner(KernelInterface):
 
             self.post_hook(full_nargs, exception=None)
 
+        # shorter benchmarks keep the default ratio of warmup to repetition time
+        bench_kwargs = {}
+        if bench_rep is not None:
+            bench_params = _bench_params(self.do_bench)
+            if "rep" in bench_params:
+                bench_kwargs["rep"] = bench_rep
+            if "warmup" in bench_params:
+                bench_kwargs["warmup"] = builtins.max(bench_rep // 4, 1)
         try:
-            return self.do_bench(kernel_call, quantiles=(0.5, 0.2, 0.8))
+            return self.do_bench(kernel_call, quantiles=(0.5, 0.2, 0.8), **bench_kwargs)
         except (OutOfResources, CompileTimeAssertionFailure, PTXASError) as e:
             if verbose:
                 print(f"Autotuning failed with {e}")
             return [float("inf"), float("inf"), float("inf")]
 
+    def _precompile(self, configs, *args, **kwargs):
+        """
+        Compiles `configs` concurrently in a pool of processes and yields
+        each of them once its kernel is compiled and added to the kernels of
+        `fn`, so that benchmarking overlaps with the compilation of the
+        remaining configs. This is also safe in background tunings, while
+        other threads launch and compile kernels, as the workers are spawned
+        rather than forked (see `compile_async`).
+        """
+        from ..compiler import compile_async
+
+        if len(configs) < 2 or not hasattr(self.fn, "compile_job"):
+            yield from configs
+            return
+        meta = {k: v for k, v in kwargs.items() if k not in ("grid", "warmup")}
+        ready, jobs = [], {}
+        for config in configs:
+            try:
+                job = self.fn.compile_job(*args, **meta, **config.all_kwargs())
+            except Exception:
+                # benchmarking the config reports the error
+                job = None
+            if job is None:
+                ready.append(config)
+            else:
+                jobs[config] = job
+        futures = dict(zip(compile_async(list(jobs.values())), jobs))
+        # configs that are already compiled are benchmarked while the others compile
+        yield from ready
+        # compilation errors are raised again when the config is benchmarked
+        for future in as_completed(futures):
+            config = futures[future]
+            if future.exception() is None:
+                # benchmarking launches the compiled kernel rather than compiling it again
+                self.fn.add_compiled_kernel(future.result(), *args, **meta, **config.all_kwargs())
+            yield config
+
     def check_disk_cache(self, tuning_key, configs, bench_fn):
         # We can't serialize prehooks, so just give up and run the benchmarks.
         if not tuning_key or any(cfg.pre_hook for cfg in configs):
@@ -186,13 +496,13 @@ class Autotuner(KernelInterface):
         cache_key = hashlib.sha256("-".join(cache_key).encode("utf-8")).hexdigest()
         cache = get_cache_manager(cache_key)
         file_name = f"{fn.__name__[:150]}.autotune.json"
-        path = cache.get_file(file_name)
-        if path:
-            with open(path, "r") as cached_configs:
-                timings = json.load(cached_configs)["configs_timings"]
-                timings = {Config(**config): timing for config, timing in timings}
-                self.cache[tuning_key] = builtins.min(timings, key=timings.get)
-                self.configs_timings = timings
+        cached_configs = cache.read_file(file_name)
+        if cached_configs is not None:
+            cached_configs = json.loads(cached_configs)
+            timings = {Config(**config): timing for config, timing in cached_configs["configs_timings"]}
+            best_config = cached_configs.get("best_config")
+            self.cache[tuning_key] = Config(**best_config) if best_config else builtins.min(timings, key=timings.get)
+            self.configs_timings = timings
             return
 
         bench_fn()
@@ -202,38 +512,146 @@ class Autotuner(KernelInterface):
                 tuning_key,
                 "configs_timings":
                 [(config.__dict__, timings) for config, timings in self.configs_timings.items() if not config.pre_hook],
+                "best_config":
+                self.cache[tuning_key].__dict__,
             }), file_name, binary=False)
 
+    @property
+    def nargs(self):
+        # per thread, as configs may be tuned in the background while the kernel runs
+        return getattr(self._local, "nargs", None)
+
+    @nargs.setter
+    def nargs(self, nargs):
+        self._local.nargs = nargs
+
+    def _nearest_tuned_key(self, key):
+        nearest, nearest_distance = None, float("inf")
+        # keys tuned in the background may be added concurrently
+        for tuned_key in list(self.cache):
+            if len(tuned_key) != len(key):
+                continue
+            distance = sum(_key_distance(a, b) for a, b in zip(tuned_key, key))
+            if distance < nearest_distance:
+                nearest, nearest_distance = tuned_key, distance
+        return nearest
+
+    def _tune_in_background(self, key, args, kwargs):
+        if key in self.background_tunings:
+            return
+        # Every benchmark writes the outputs of the kernel, which the caller keeps using meanwhile, and the kernel
+        # may write any of its tensors, so the benchmarks run on copies of all of them. The copies are taken on the
+        # current stream, so they don't see what the caller launches afterwards.
+        args = [_clone(arg) for arg in args]
+        kwargs = {k: _clone(v) for k, v in kwargs.items()}
+        device = driver.active.get_current_device()
+        stream = _get_background_stream(device)
+        # the copies are ready once the work queued on the current stream is done
+        stream.wait_stream(driver.active.get_device_interface().current_stream(device))
+
+        def tune():
+            driver.active.set_current_device(device)
+            self.nargs = dict(zip(self.arg_names, args))
+            try:
+                with driver.active.get_device_interface().stream(stream):
+                    self._tune(key, *args, **kwargs)
+            finally:
+                # the copies may only be freed once the benchmarks are done with them
+                stream.synchronize()
+                self.nargs = None
+            if os.getenv("TRITON_PRINT_AUTOTUNING", None) == "1":
+                print(f"Triton autotuning for function {self.base_fn.__name__} finished in the background after "
+                      f"{self.bench_time:.2f}s; best config selected for {key}: {self.cache[key]};")
+
+        def done(future):
+            # failed keys keep running with the config of the closest tuned key until they are tuned again
+            self.background_tunings.pop(key, None)
+            if future.exception() is not None:
+                import warnings
+                warnings.warn(f"Autotuning {self.base_fn.__name__} for {key} in the background failed with "
+                              f"{future.exception()!r}; it will be tuned again on its next launch.")
+
+        future = self.background_tunings[key] = _get_background_tuner().submit(tune)
+        future.add_done_callback(done)
+
+    def _tune(self, key, *args, **kwargs):
+        with self._tuning_lock:
+            if key in self.cache:
+                return
+            pruned_configs = self.prune_configs(kwargs)
+
+            def benchmark():
+                bench_start = time.time()
+
+                def bench(configs, rep=None):
+                    return {
+                        config: self._bench(*args, config=config, bench_rep=rep, **kwargs)
+                        for config in self._precompile(configs, *args, **kwargs)
+                    }
+
+                best_config, timings = self.search_strategy.search(pruned_configs, bench)
+                timings = {config: timings[config] for config in pruned_configs if config in timings}
+                bench_end = time.time()
+                self.bench_time = bench_end - bench_start
+                self.configs_timings = timings
+                full_nargs = {**self.nargs, **kwargs, **best_config.all_kwargs()}
+                self.pre_hook(full_nargs, reset_only=True)
+                self.cache[key] = best_config
+
+            if self.cache_results:
+                self.check_disk_cache(key, pruned_configs, benchmark)
+            else:
+                benchmark()
+            self.best_timings[key] = self.configs_timings.get(self.cache[key])
+            export_dir = autotune_db.get_export_dir()
+            if export_dir is not None:
+                self.export_db(export_dir, [key])
+
+    def _load_db(self):
+        arch = autotune_db.get_arch(driver.active.get_current_target())
+        if arch in self._db_archs:
+            return
+        self._db_archs.add(arch)
+        for key, config in autotune_db.load(autotune_db.get_kernel_name(self.base_fn), arch).items():
+            self.cache.setdefault(key, config)
+
+    def export_db(self, db_dir, keys=None):
+        """
+        Records the best config of each key tuned by this process (or of
+        `keys`) in the autotuning database at `db_dir`, see
+        `triton.runtime.autotune_db`.
+        """
+        kernel = autotune_db.get_kernel_name(self.base_fn)
+        arch = autotune_db.get_arch(driver.active.get_current_target())
+        for key in self.best_timings if keys is None else keys:
+            autotune_db.record(db_dir, kernel, arch, key, self.cache[key], self.best_timings.get(key))
+
     def run(self, *args, **kwargs):
         self.nargs = dict(zip(self.arg_names, args))
         used_cached_result = True
         if len(self.configs) > 1:
             all_args = {**self.nargs, **kwargs}
             _args = {k: v for (k, v) in all_args.items() if k in self.arg_names}
-            key = [_args[key] for key in self.keys if key in _args]
+            key = [
+                self.key_buckets[name](_args[name]) if name in self.key_buckets else _args[name]
+                for name in self.keys
+                if name in _args
+            ]
             for _, arg in _args.items():
                 if hasattr(arg, "dtype"):
                     key.append(str(arg.dtype))
             key = tuple(key)
+            if key not in self.cache and autotune_db.get_db_dirs():
+                self._load_db()
             if key not in self.cache:
-                used_cached_result = False
-                pruned_configs = self.prune_configs(kwargs)
-
-                def benchmark():
-                    bench_start = time.time()
-                    timings = {config: self._bench(*args, config=config, **kwargs) for config in pruned_configs}
-                    bench_end = time.time()
-                    self.bench_time = bench_end - bench_start
-                    self.cache[key] = builtins.min(timings, key=timings.get)
-                    full_nargs = {**self.nargs, **kwargs, **self.cache[key].all_kwargs()}
-                    self.pre_hook(full_nargs, reset_only=True)
-                    self.configs_timings = timings
-
-                if self.cache_results:
-                    self.check_disk_cache(key, pruned_configs, benchmark)
+                nearest = self._nearest_tuned_key(key) if self.tune_in_background else None
+                if nearest is None:
+                    used_cached_result = False
+                    self._tune(key, *args, **kwargs)
                 else:
-                    benchmark()
-
+                    # the closest tuned key stands in until this one is tuned
+                    self._tune_in_background(key, args, kwargs)
+                    key = nearest
             config = self.cache[key]
         else:
             config = self.configs[0]
@@ -357,7 +775,8 @@ class Config:
 
 
 def autotune(configs, key, prune_configs_by=None, reset_to_zero=None, restore_value=None, pre_hook=None, post_hook=None,
-             warmup=None, rep=None, use_cuda_graph=False, do_bench=None, cache_results=False):
+             warmup=None, rep=None, use_cuda_graph=False, do_bench=None, cache_results=False, search_strategy=None,
+             key_bucketing=None, tune_in_background=False):
     """
     Decorator for auto-tuning a :code:`triton.jit`'d function.
 
@@ -383,6 +802,11 @@ def autotune(configs, key, prune_configs_by=None, reset_to_zero=None, restore_va
     :code:`"1"`, Triton will print a message to stdout after autotuning each
     kernel, including the time spent autotuning and the best configuration.
 
+    The keys found in the autotuning databases listed by
+    :code:`TRITON_AUTOTUNE_DB` use the config recorded there instead of being
+    tuned, and the configs tuned by a process are recorded in the database
+    at :code:`TRITON_AUTOTUNE_DB_EXPORT`; see :code:`triton.runtime.autotune_db`.
+
     :param configs: a list of :code:`triton.Config` objects
     :type configs: list[triton.Config]
     :param key: a list of argument names whose change in value will trigger the evaluation of all provided configs.
@@ -413,12 +837,29 @@ def autotune(configs, key, prune_configs_by=None, reset_to_zero=None, restore_va
     :type do_bench: lambda fn, quantiles
     :param cache_results: whether to cache autotune timings to disk.  Defaults to False.
     "type cache_results: bool
+    :param search_strategy: how the configs are benchmarked, e.g. :code:`triton.runtime.SuccessiveHalving()`
+        to discard the slowest configs after short benchmarks, which needs a `do_bench` with a `rep` parameter.
+        Defaults to benchmarking every config fully.
+    :type search_strategy: triton.runtime.SearchStrategy
+    :param key_bucketing: how the values of the `key` arguments are bucketed, so that configs are only tuned once
+        per bucket: :code:`"pow2"` to round positive integers up to a power of two, or a function mapping a value to
+        its bucket. A dict maps argument names to their policy; other policies apply to every `key` argument.
+    :type key_bucketing: str, Callable, or dict[str, str | Callable]
+    :param tune_in_background: whether configs are tuned in a background thread for new keys, while the kernel runs
+        with the best config of the closest tuned key (comparing numeric values on a log scale). The first key is
+        always tuned in the foreground. Background benchmarks run on a separate stream, with copies of the tensor
+        arguments taken at launch, so the caller can keep using its tensors. The futures of the tunings in progress
+        are in `background_tunings`; failed tunings are reported with a warning and retried on the next launch of
+        their key.
+    :type tune_in_background: bool
     """
 
     def decorator(fn):
         return Autotuner(fn, fn.arg_names, configs, key, reset_to_zero, restore_value, pre_hook=pre_hook,
                          post_hook=post_hook, prune_configs_by=prune_configs_by, warmup=warmup, rep=rep,
-                         use_cuda_graph=use_cuda_graph, do_bench=do_bench, cache_results=cache_results)
+                         use_cuda_graph=use_cuda_graph, do_bench=do_bench, cache_results=cache_results,
+                         search_strategy=search_strategy, key_bucketing=key_bucketing,
+                         tune_in_background=tune_in_background)
 
     return decorator
 
@@ -430,10 +871,19 @@ class Heuristics(KernelInterface):
         self.values = values
         self.arg_names = arg_names
 
-    def run(self, *args, **kwargs):
+    def _apply(self, args, kwargs):
         for v, heur in self.values.items():
             kwargs[v] = heur({**dict(zip(self.arg_names, args)), **kwargs})
-        return self.fn.run(*args, **kwargs)
+        return kwargs
+
+    def run(self, *args, **kwargs):
+        return self.fn.run(*args, **self._apply(args, kwargs))
+
+    def compile_job(self, *args, **kwargs):
+        return self.fn.compile_job(*args, **self._apply(args, kwargs))
+
+    def add_compiled_kernel(self, kernel, *args, **kwargs):
+        return self.fn.add_compiled_kernel(kernel, *args, **self._apply(args, kwargs))
 
 
 def heuristics(values):
@@ -1,10 +1,18 @@
 import importlib
 import json
+import mmap
 import os
+import shutil
+import sqlite3
+import threading
+import time
 import uuid
+import zlib
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+from . import stats
 import base64
 import hashlib
 
@@ -25,6 +33,290 @@ def default_dump_dir():
     return os.path.join(get_home_dir(), ".triton", "dump")
 
 
+def get_cache_dir():
+    return os.getenv("TRITON_CACHE_DIR", "").strip() or default_cache_dir()
+
+
+def _parse_size(size):
+    # e.g., "1073741824", "512M" or "20G"
+    units = {"K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+    size = size.strip().upper()
+    if size[-1:] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def get_cache_budget():
+    """
+    Returns the maximum total size (in bytes) and the maximum time since the
+    last access (in seconds) of the entries of the cache directory, as set by
+    `TRITON_CACHE_MAX_SIZE` and `TRITON_CACHE_MAX_AGE`. Either is None when
+    unset.
+    """
+    max_size = os.getenv("TRITON_CACHE_MAX_SIZE", "").strip()
+    max_age = os.getenv("TRITON_CACHE_MAX_AGE", "").strip()
+    return _parse_size(max_size) if max_size else None, float(max_age) if max_age else None
+
+
+def get_cache_compression() -> Optional[str]:
+    """
+    Returns the codec ("zstd" or "zlib") used to compress the files written
+    to the cache, as set by `TRITON_CACHE_COMPRESSION`, or None when the
+    files are stored uncompressed.
+    """
+    codec = os.getenv("TRITON_CACHE_COMPRESSION", "").strip().lower()
+    if codec in ("", "0", "none"):
+        return None
+    if codec not in ("zstd", "zlib"):
+        raise ValueError(f"Unsupported cache compression {codec!r}, expected 'zstd' or 'zlib'")
+    return codec
+
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# zlib streams are written with a gzip header, whose magic can't start a text or ELF file
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+
+
+def is_compressed(data: bytes) -> bool:
+    return data.startswith(_ZSTD_MAGIC) or data.startswith(_GZIP_MAGIC)
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor().compress(data)
+    # favor speed, as files are compressed on the compilation path
+    compressor = zlib.compressobj(1, wbits=31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: bytes) -> bytes:
+    """
+    Returns the decompressed `data` if it was compressed by `compress`, and
+    `data` itself otherwise, so that uncompressed caches can still be read.
+    """
+    if data.startswith(_ZSTD_MAGIC):
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data)
+    if data.startswith(_GZIP_MAGIC):
+        return zlib.decompress(data, wbits=31)
+    return data
+
+
+# Only the files that Triton reads back with `CacheManager.read_file` (or
+# `_read_cache_file`) are compressed: the IR and binaries of each stage, kernel
+# and autotuning metadata, and interpreter code objects. Other files, e.g. the
+# launcher modules of the drivers, are opened directly through their path.
+_COMPRESSIBLE_SUFFIXES = (".ttir", ".ttgir", ".llir", ".ptx", ".cubin", ".amdgcn", ".hsaco", ".json", ".marshal")
+
+
+def _maybe_compress(data, filename) -> bytes:
+    if not isinstance(data, bytes):
+        data = str(data).encode("utf-8")
+    codec = get_cache_compression()
+    # groups are left as is for the tools that read them, and data coming from another cache already is compressed
+    if (codec is None or filename.startswith("__grp__") or not filename.endswith(_COMPRESSIBLE_SUFFIXES)
+            or is_compressed(data)):
+        return data
+    compressed = compress(data, codec)
+    return compressed if len(compressed) < len(data) else data
+
+
+def get_cache_dedup() -> bool:
+    """
+    Returns whether identical files of different entries of the cache
+    directory are stored once, as set by `TRITON_CACHE_DEDUP=1`.
+    """
+    return os.getenv("TRITON_CACHE_DEDUP", "0") == "1"
+
+
+# Deduplicated files are hard links to a blob named after the hash of their
+# contents. Entries never modify their files in place, so sharing them is
+# safe, and the blob of a file outlives the entries that link to it until
+# the cache is pruned.
+_BLOBS_DIR = ".blobs"
+
+
+def _is_dedupable(filename) -> bool:
+    # groups and kernel metadata name their cache entry, so they are never shared
+    return not filename.startswith("__grp__") and not filename.endswith(".json")
+
+
+def _get_blob_path(cache_dir, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    return os.path.join(cache_dir, _BLOBS_DIR, digest[:2], digest)
+
+
+def _link_blob(blob_path, path) -> bool:
+    # whether `path` now is a link to an existing blob
+    try:
+        os.link(blob_path, path)
+        return True
+    except OSError:
+        return False
+
+
+def _publish_blob(path, blob_path):
+    try:
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.link(path, blob_path)
+    except OSError:
+        # published by another process, or the file system has no hard links
+        pass
+
+
+def _remove_orphaned_blobs(cache_dir):
+    blobs_dir = os.path.join(cache_dir, _BLOBS_DIR)
+    if not os.path.isdir(blobs_dir):
+        return
+    with os.scandir(blobs_dir) as shards:
+        for shard in shards:
+            try:
+                with os.scandir(shard.path) as blobs:
+                    for blob in blobs:
+                        # only linked from the blob directory
+                        if blob.stat(follow_symlinks=False).st_nlink == 1:
+                            os.unlink(blob.path)
+            except OSError:
+                continue
+
+
+class CacheEntry(NamedTuple):
+    path: str
+    # names of the kernels (or other artifacts) stored in the entry
+    names: List[str]
+    size: int
+    # updated whenever a file of the entry is looked up or written
+    last_access: float
+
+
+def get_cache_entries(cache_dir=None) -> List[CacheEntry]:
+    """
+    Lists the entries (one per cache key) of the cache directory.
+    """
+    entries = []
+    with os.scandir(cache_dir or get_cache_dir()) as it:
+        for entry in it:
+            # skips lock files and entries that are being evicted
+            if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+                continue
+            size, names = 0, set()
+            try:
+                last_access = entry.stat().st_mtime
+                with os.scandir(entry.path) as files:
+                    for f in files:
+                        if f.is_file(follow_symlinks=False):
+                            # deduplicated files are shared by the entries (and the blob) linking to them
+                            st = f.stat()
+                            size += st.st_size // max(st.st_nlink - 1, 1)
+                            names.add(f.name.removeprefix("__grp__").split(".")[0])
+            except FileNotFoundError:
+                continue
+            entries.append(CacheEntry(entry.path, sorted(names), size, last_access))
+    return entries
+
+
+# entries accessed more recently than this are never evicted, as they may be
+# in use by another process
+_EVICTION_GRACE_PERIOD = 600
+
+
+def prune_cache(cache_dir=None, max_size=None, max_age=None) -> List[CacheEntry]:
+    """
+    Evicts the least recently used entries of the cache directory until the
+    total size is at most `max_size` bytes, as well as every entry that wasn't
+    used in the last `max_age` seconds. Returns the evicted entries.
+
+    This is safe to call from concurrent processes.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    # entries left behind by processes that died while removing them
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.startswith(".evicted."):
+                shutil.rmtree(entry.path, ignore_errors=True)
+    now = time.time()
+    entries = sorted(get_cache_entries(cache_dir), key=lambda entry: entry.last_access)
+    size = sum(entry.size for entry in entries)
+    evicted = []
+    for entry in entries:
+        age = now - entry.last_access
+        if age < _EVICTION_GRACE_PERIOD:
+            break
+        if not (max_age is not None and age > max_age) and not (max_size is not None and size > max_size):
+            break
+        # entries are renamed first so that no process sees a partially removed entry
+        evicted_path = os.path.join(cache_dir, f".evicted.{uuid.uuid4()}")
+        try:
+            os.rename(entry.path, evicted_path)
+        except OSError:
+            # evicted by another process
+            continue
+        shutil.rmtree(evicted_path, ignore_errors=True)
+        size -= entry.size
+        evicted.append(entry)
+    if evicted:
+        _remove_orphaned_blobs(cache_dir)
+    return evicted
+
+
+def deduplicate_cache(cache_dir=None, dry_run=False) -> Tuple[int, int]:
+    """
+    Replaces the files of the cache directory that are identical to a file of
+    another entry by hard links to a single copy, e.g. for the entries
+    written without `TRITON_CACHE_DEDUP=1`. Returns the number of files
+    replaced and the number of bytes saved; nothing is replaced if `dry_run`.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    # hash of the contents -> (device, inode) of the copy that is kept
+    copies = {}
+    num_files, saved = 0, 0
+    for entry in get_cache_entries(cache_dir):
+        for path in Path(entry.path).iterdir():
+            if not _is_dedupable(path.name) or not path.is_file():
+                continue
+            try:
+                data = path.read_bytes()
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            blob_path = _get_blob_path(cache_dir, data)
+            copy = copies.get(blob_path)
+            if copy is None:
+                try:
+                    blob_stat = os.stat(blob_path)
+                    copy = (blob_stat.st_dev, blob_stat.st_ino)
+                except FileNotFoundError:
+                    copy = (st.st_dev, st.st_ino)
+                    if not dry_run:
+                        _publish_blob(str(path), blob_path)
+                copies[blob_path] = copy
+            if copy == (st.st_dev, st.st_ino):
+                continue
+            if not dry_run:
+                temp_path = path.with_name(f"tmp.pid_{os.getpid()}_{uuid.uuid4()}")
+                if not _link_blob(blob_path, temp_path):
+                    continue
+                os.replace(temp_path, path)
+            num_files += 1
+            saved += st.st_size
+    return num_files, saved
+
+
+# how often (in seconds) a process checks the cache directory against its budget
+_PRUNE_INTERVAL = 60
+_last_prune = 0.0
+
+
+def _maybe_prune_cache(cache_dir):
+    global _last_prune
+    max_size, max_age = get_cache_budget()
+    if (max_size is None and max_age is None) or time.time() - _last_prune < _PRUNE_INTERVAL:
+        return
+    _last_prune = time.time()
+    prune_cache(cache_dir, max_size, max_age)
+
+
 class CacheManager(ABC):
 
     def __init__(self, key):
@@ -32,18 +324,44 @@ class CacheManager(ABC):
 
     @abstractmethod
     def get_file(self, filename) -> Optional[str]:
+        """Returns the path of `filename`, if it is in the cache."""
         pass
 
     @abstractmethod
-    def put(self, data, filename, binary=True) -> str:
+    def put(self, data, filename, binary=True) -> Union[str, "PackedFile"]:
+        """
+        Stores `data` as `filename`. Returns its path or, for managers that
+        don't store files in the file system, a `PackedFile`; callers that
+        need a path use `get_file`.
+        """
         pass
 
     @abstractmethod
-    def get_group(self, filename: str) -> Optional[Dict[str, str]]:
+    def get_group(self, filename: str) -> Optional[Dict[str, Union[str, "PackedFile"]]]:
+        """
+        Returns the files of the group `filename`, as returned by `put`, if
+        it is in the cache.
+        """
         pass
 
     @abstractmethod
-    def put_group(self, filename: str, group: Dict[str, str]):
+    def put_group(self, filename: str, group: Dict[str, Union[str, "PackedFile"]]):
+        pass
+
+    def read_file(self, filename) -> Optional[bytes]:
+        path = self.get_file(filename)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            data = f.read()
+        stats.increment("cache_bytes_read", len(data), tier="disk")
+        return decompress(data)
+
+    def prefetch_group(self, filename: str, child_names: List[str]):
+        """
+        Hints that the group `filename`, expected to hold `child_names`, is
+        about to be looked up.
+        """
         pass
 
 
@@ -52,6 +370,8 @@ class FileCacheManager(CacheManager):
     def __init__(self, key, override=False, dump=False):
         self.key = key
         self.lock_path = None
+        # only the cache directory is subject to eviction
+        self.evictable = not (override or dump)
         if dump:
             self.cache_dir = os.getenv("TRITON_DUMP_DIR", "").strip() or default_dump_dir()
             self.cache_dir = os.path.join(self.cache_dir, self.key)
@@ -62,7 +382,7 @@ class FileCacheManager(CacheManager):
             self.cache_dir = os.path.join(self.cache_dir, self.key)
         else:
             # create cache directory if it doesn't exist
-            self.cache_dir = os.getenv("TRITON_CACHE_DIR", "").strip() or default_cache_dir()
+            self.cache_dir = get_cache_dir()
             if self.cache_dir:
                 self.cache_dir = os.path.join(self.cache_dir, self.key)
                 self.lock_path = os.path.join(self.cache_dir, "lock")
@@ -78,28 +398,42 @@ class FileCacheManager(CacheManager):
             raise RuntimeError("Could not create or locate cache dir")
         return os.path.exists(self._make_path(filename))
 
+    def _touch(self):
+        # record the access for LRU eviction
+        if self.evictable:
+            try:
+                os.utime(self.cache_dir)
+            except OSError:
+                pass
+
     def get_file(self, filename) -> Optional[str]:
         if self.has_file(filename):
+            self._touch()
             return self._make_path(filename)
         else:
             return None
 
     def get_group(self, filename: str) -> Optional[Dict[str, str]]:
-        grp_filename = f"__grp__{filename}"
-        if not self.has_file(grp_filename):
+        if not self.cache_dir:
+            raise RuntimeError("Could not create or locate cache dir")
+        grp_filepath = self._make_path(f"__grp__{filename}")
+        try:
+            with open(grp_filepath) as f:
+                grp_data = json.load(f)
+        except FileNotFoundError:
+            if self.evictable:
+                stats.increment("cache_misses", tier="disk")
             return None
-        grp_filepath = self._make_path(grp_filename)
-        with open(grp_filepath) as f:
-            grp_data = json.load(f)
         child_paths = grp_data.get("child_paths", None)
         # Invalid group data.
         if child_paths is None:
             return None
-        result = {}
-        for c, p in child_paths.items():
-            if os.path.exists(p):
-                result[c] = p
-        return result
+        if self.evictable:
+            stats.increment("cache_hits", tier="disk")
+        # Files are written before the group that refers to them and entries are evicted as a
+        # whole, so the children aren't checked for existence; readers handle missing files.
+        self._touch()
+        return child_paths
 
     # Note a group of pushed files as being part of a group
     def put_group(self, filename: str, group: Dict[str, str]) -> str:
@@ -112,6 +446,9 @@ class FileCacheManager(CacheManager):
     def put(self, data, filename, binary=True) -> str:
         if not self.cache_dir:
             raise RuntimeError("Could not create or locate cache dir")
+        if self.evictable:
+            data = _maybe_compress(data, filename)
+            stats.increment("cache_bytes_written", len(data), tier="disk")
         binary = isinstance(data, bytes)
         if not binary:
             data = str(data)
@@ -126,13 +463,23 @@ class FileCacheManager(CacheManager):
         os.makedirs(temp_dir, exist_ok=True)
         temp_path = os.path.join(temp_dir, filename)
 
-        mode = "wb" if binary else "w"
-        with open(temp_path, mode) as f:
-            f.write(data)
+        blob_path = None
+        if self.evictable and get_cache_dedup() and _is_dedupable(filename):
+            blob_path = _get_blob_path(os.path.dirname(self.cache_dir), data)
+        if blob_path is not None and _link_blob(blob_path, temp_path):
+            stats.increment("cache_bytes_deduplicated", len(data), tier="disk")
+        else:
+            mode = "wb" if binary else "w"
+            with open(temp_path, mode) as f:
+                f.write(data)
+            if blob_path is not None:
+                _publish_blob(temp_path, blob_path)
         # Replace is guaranteed to be atomic on POSIX systems if it succeeds
         # so filepath cannot see a partial write
         os.replace(temp_path, filepath)
         os.removedirs(temp_dir)
+        if self.evictable:
+            _maybe_prune_cache(os.path.dirname(self.cache_dir))
         return filepath
 
 
@@ -152,30 +499,143 @@ class RemoteCacheBackend:
     def put(self, filename: str, data: bytes):
         pass
 
+    def touch(self, filenames: List[str]):
+        """
+        Marks `filenames` as used, for the LRU accounting of the backend.
+        Backends without such accounting don't need to implement it.
+        """
+        pass
 
-class RedisRemoteCacheBackend(RemoteCacheBackend):
 
-    def __init__(self, key):
-        import redis
+class PooledRemoteCacheBackend(RemoteCacheBackend):
+    """
+    A backend whose connections are shared by all of its instances (one is
+    created per cache key) in a process. Subclasses implement `connect` and
+    use `self.connection`; connections are reused across instances with the
+    same `connection_args()`.
+    """
+
+    _connections: Dict[tuple, object] = {}
+    _connections_lock = threading.Lock()
+
+    def __init__(self, key: str):
         self._key = key
+
+    def connection_args(self) -> tuple:
+        return ()
+
+    @abstractmethod
+    def connect(self, *args):
+        pass
+
+    @property
+    def connection(self):
+        # connections can't be shared with forked processes
+        connection_key = (type(self), self.connection_args(), os.getpid())
+        connection = self._connections.get(connection_key)
+        if connection is None:
+            with self._connections_lock:
+                connection = self._connections.get(connection_key)
+                if connection is None:
+                    connection = self._connections[connection_key] = self.connect(*self.connection_args())
+        return connection
+
+
+class RedisRemoteCacheBackend(PooledRemoteCacheBackend):
+
+    def __init__(self, key):
+        super().__init__(key)
         self._key_fmt = os.environ.get("TRITON_REDIS_KEY_FORMAT", "triton:{key}:{filename}")
-        self._redis = redis.Redis(
-            host=os.environ.get("TRITON_REDIS_HOST", "localhost"),
-            port=int(os.environ.get("TRITON_REDIS_PORT", 6379)),
-        )
+
+    def connection_args(self):
+        return os.environ.get("TRITON_REDIS_HOST", "localhost"), int(os.environ.get("TRITON_REDIS_PORT", 6379))
+
+    def connect(self, host, port):
+        import redis
+        # the client keeps a thread-safe pool of connections
+        return redis.Redis(host=host, port=port)
 
     def _get_key(self, filename: str) -> str:
         return self._key_fmt.format(key=self._key, filename=filename)
 
     def get(self, filenames: List[str]) -> Dict[str, str]:
-        results = self._redis.mget([self._get_key(f) for f in filenames])
+        results = self.connection.mget([self._get_key(f) for f in filenames])
         return {filename: result for filename, result in zip(filenames, results) if result is not None}
 
     def put(self, filename: str, data: bytes) -> Dict[str, bytes]:
-        self._redis.set(self._get_key(filename), data)
+        self.connection.set(self._get_key(filename), data)
+
+    def touch(self, filenames: List[str]):
+        self.connection.touch(*[self._get_key(f) for f in filenames])
+
+
+class FileSystemRemoteCacheBackend(RemoteCacheBackend):
+    """
+    Stores files in a directory shared by every node, e.g. on NFS or Lustre,
+    set by `TRITON_SHARED_CACHE_DIR`:
+
+        TRITON_CACHE_MANAGER=triton.runtime.cache:RemoteCacheManager
+        TRITON_REMOTE_CACHE_BACKEND=triton.runtime.cache:FileSystemRemoteCacheBackend
+
+    Keys are spread over subdirectories named after their first two
+    characters. Files are published by renaming them into place, so readers
+    never see partial files and no locks are needed; groups are written after
+    their files. Files read from the shared directory are materialized in the
+    local cache, which `TRITON_REMOTE_CACHE_LOCAL_FIRST=1` then reads first.
+    """
+
+    def __init__(self, key: str):
+        shared_dir = os.environ.get("TRITON_SHARED_CACHE_DIR", "").strip()
+        if not shared_dir:
+            raise RuntimeError("TRITON_SHARED_CACHE_DIR must be set to use FileSystemRemoteCacheBackend")
+        self._dir = os.path.join(shared_dir, key[:2], key)
+
+    def get(self, filenames: List[str]) -> Dict[str, bytes]:
+        results = {}
+        for filename in filenames:
+            try:
+                with open(os.path.join(self._dir, filename), "rb") as f:
+                    results[filename] = f.read()
+            except FileNotFoundError:
+                pass
+        return results
+
+    def put(self, filename: str, data: bytes):
+        os.makedirs(self._dir, exist_ok=True)
+        # the temporary file must be on the same filesystem for the rename to be atomic
+        temp_path = os.path.join(self._dir, f".tmp.{filename}.{os.getpid()}.{uuid.uuid4()}")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, os.path.join(self._dir, filename))
+
+    def touch(self, filenames: List[str]):
+        for filename in filenames:
+            try:
+                os.utime(os.path.join(self._dir, filename))
+            except OSError:
+                pass
+
+
+_touch_executors = {}
+
+
+def _touch_in_background(backend, filenames):
+    # a single thread per process, so that touches never compete with lookups for connections
+    executor = _touch_executors.get(os.getpid())
+    if executor is None:
+        executor = _touch_executors[os.getpid()] = ThreadPoolExecutor(1, thread_name_prefix="triton-cache-touch")
+    executor.submit(backend.touch, filenames)
 
 
 class RemoteCacheManager(CacheManager):
+    """
+    Stores files in the backend pointed to by `TRITON_REMOTE_CACHE_BACKEND`,
+    and materializes them in the local file cache.
+
+    If `TRITON_REMOTE_CACHE_LOCAL_FIRST=1`, files already materialized
+    locally are used without waiting on the backend, which is told about
+    the access in the background instead.
+    """
 
     def __init__(self, key, override=False, dump=False):
         # Setup backend pointed too by `TRITON_REMOTE_CACHE_BACKEND`.
@@ -187,6 +647,11 @@ class RemoteCacheManager(CacheManager):
 
         self._override = override
         self._dump = dump
+        self._local_first = os.environ.get("TRITON_REMOTE_CACHE_LOCAL_FIRST", "0") == "1"
+        # files fetched by `prefetch_group` that haven't been looked up yet
+        self._prefetched = {}
+        # groups found locally by `prefetch_group` that haven't been looked up yet
+        self._prefetched_groups = {}
 
         # Use a `FileCacheManager` to materialize remote cache paths locally.
         self._file_cache_manager = FileCacheManager(key, override=override, dump=dump)
@@ -195,38 +660,84 @@ class RemoteCacheManager(CacheManager):
         # We use a backing `FileCacheManager` to provide the materialized data.
         return self._file_cache_manager.put(data, filename, binary=True)
 
+    def _get_files(self, filenames: List[str]) -> Dict[str, str]:
+        # Looks `filenames` up with a single request to the backend, skipping the prefetched ones.
+        result = {f: self._prefetched.pop(f) for f in filenames if f in self._prefetched}
+        missing = [f for f in filenames if f not in result]
+        if missing:
+            for filename, data in self._backend.get(missing).items():
+                stats.increment("cache_bytes_read", len(data), tier="remote")
+                result[filename] = self._materialize(filename, data)
+        return result
+
+    def _get_local_group(self, grp_filename: str) -> Optional[Dict[str, str]]:
+        grp_filepath = self._file_cache_manager.get_file(grp_filename)
+        if grp_filepath is None:
+            return None
+        with open(grp_filepath) as f:
+            child_names = json.load(f).get("child_paths", None)
+        if child_names is None:
+            return None
+        result = {c: self._file_cache_manager.get_file(c) for c in child_names}
+        if any(p is None for p in result.values()):
+            return None
+        _touch_in_background(self._backend, [grp_filename, *child_names])
+        stats.increment("cache_hits", tier="disk")
+        return result
+
     def get_file(self, filename: str) -> Optional[str]:
         # We don't handle the dump/override cases.
         if self._dump or self._override:
             return self._file_cache_manager.get_file(filename)
 
-        # We always check the remote cache backend -- even if our internal file-
-        # based cache has the item -- to make sure LRU accounting works as
-        # expected.
-        results = self._backend.get([filename])
-        if len(results) == 0:
-            return None
-        (_, data), = results.items()
-        return self._materialize(filename, data)
+        if self._local_first and (path := self._file_cache_manager.get_file(filename)) is not None:
+            _touch_in_background(self._backend, [filename])
+            return path
+
+        # Otherwise we always check the remote cache backend -- even if our
+        # internal file-based cache has the item -- to make sure LRU accounting
+        # works as expected.
+        return self._get_files([filename]).get(filename)
 
     def put(self, data, filename: str, binary=True) -> str:
         # We don't handle the dump/override cases.
         if self._dump or self._override:
             return self._file_cache_manager.put(data, filename, binary=binary)
 
-        if not isinstance(data, bytes):
-            data = str(data).encode("utf-8")
+        # Files are sent compressed, and materialized as such.
+        data = _maybe_compress(data, filename)
+        stats.increment("cache_bytes_written", len(data), tier="remote")
         self._backend.put(filename, data)
         return self._materialize(filename, data)
 
+    def prefetch_group(self, filename: str, child_names: List[str]):
+        """
+        Fetches the group `filename` together with the files it is expected
+        to hold in a single request to the backend, so that `get_group` only
+        needs to fetch the children that weren't guessed right.
+        """
+        if self._dump or self._override:
+            return
+        grp_filename = f"__grp__{filename}"
+        if self._local_first and (result := self._get_local_group(grp_filename)) is not None:
+            self._prefetched_groups[grp_filename] = result
+            return
+        self._prefetched.update(self._get_files([grp_filename, *child_names]))
+
     def get_group(self, filename: str) -> Optional[Dict[str, str]]:
         # We don't handle the dump/override cases.
         if self._dump or self._override:
             return self._file_cache_manager.get_group(filename)
 
         grp_filename = f"__grp__{filename}"
-        grp_filepath = self.get_file(grp_filename)
+        if (result := self._prefetched_groups.pop(grp_filename, None)) is not None:
+            return result
+        if self._local_first and (result := self._get_local_group(grp_filename)) is not None:
+            return result
+
+        grp_filepath = self._get_files([grp_filename]).get(grp_filename)
         if grp_filepath is None:
+            stats.increment("cache_misses", tier="remote")
             return None
         with open(grp_filepath) as f:
             grp_data = json.load(f)
@@ -236,9 +747,8 @@ class RemoteCacheManager(CacheManager):
 
         # Found group data.
         if child_paths is not None:
-            result = {}
-            for child_path, data in self._backend.get(child_paths).items():
-                result[child_path] = self._materialize(child_path, data)
+            stats.increment("cache_hits", tier="remote")
+            result = self._get_files(child_paths)
 
         return result
 
@@ -252,6 +762,181 @@ class RemoteCacheManager(CacheManager):
         return self.put(grp_contents, grp_filename)
 
 
+class _PackStore:
+    """
+    Cache files appended to a single pack file, with an sqlite index mapping
+    each (key, filename) to its location in the pack.
+    """
+
+    def __init__(self, cache_dir):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.pack_path = os.path.join(cache_dir, "cache.pack")
+        # create the pack file so that it can always be mapped
+        open(self.pack_path, "ab").close()
+        self._buffer = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "cache.index"), timeout=60, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS files "
+                         "(key TEXT, filename TEXT, offset INTEGER, size INTEGER, PRIMARY KEY (key, filename)) "
+                         "WITHOUT ROWID")
+
+    def _read(self, offset, size) -> Optional[bytes]:
+        end = offset + size
+        if self._buffer is None or len(self._buffer) < end:
+            # the pack only grows, so it is remapped whenever an entry lies past the current mapping
+            with open(self.pack_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < end:
+                    # written by a process that died before the data reached the disk
+                    return None
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._buffer[offset:end]
+
+    def get(self, key, filename=None) -> Dict[str, bytes]:
+        """Returns the files stored under `key` (only `filename` if given)."""
+        query = "SELECT filename, offset, size FROM files WHERE key = ?"
+        params = (key, )
+        if filename is not None:
+            query += " AND filename = ?"
+            params += (filename, )
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+            result = {filename: self._read(offset, size) for filename, offset, size in rows}
+        return {filename: data for filename, data in result.items() if data is not None}
+
+    def groups(self) -> List[Tuple[str, str]]:
+        """Returns the key and file name of every group in the pack."""
+        with self._lock:
+            return self._db.execute("SELECT key, filename FROM files WHERE substr(filename, 1, 7) = '__grp__' "
+                                    "ORDER BY key, filename").fetchall()
+
+    def put(self, key, filename, data: bytes):
+        with self._lock:
+            # the write lock of the index serializes appends across processes
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                with open(self.pack_path, "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (key, filename, offset, len(data)))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+
+_pack_stores: Dict[tuple, _PackStore] = {}
+
+
+def _get_pack_store(cache_dir) -> _PackStore:
+    # sqlite connections can't be shared with forked processes
+    store_key = (cache_dir, os.getpid())
+    if store_key not in _pack_stores:
+        _pack_stores[store_key] = _PackStore(cache_dir)
+    return _pack_stores[store_key]
+
+
+class PackedFile(NamedTuple):
+    """
+    A file of a group returned by `PackedCacheManager.get_group`. Its
+    contents are only read from the pack when `read` is called.
+    """
+    store: _PackStore
+    key: str
+    filename: str
+
+    def read(self) -> bytes:
+        """Returns the contents of the file as stored in the pack, i.e., possibly compressed."""
+        data = self.store.get(self.key, self.filename).get(self.filename)
+        if data is None:
+            raise FileNotFoundError(f"{self.filename} of {self.key} is not in the pack")
+        return data
+
+
+class PackedCacheManager(CacheManager):
+    """
+    Stores every entry of the cache directory in a single append-only pack
+    file indexed by an sqlite database, instead of one directory per key.
+    Enable it with `TRITON_CACHE_MANAGER=triton.runtime.cache:PackedCacheManager`.
+
+    `put` and `get_group` return `PackedFile`s instead of paths, so a cache
+    hit is an index query, and each file is only read from the memory-mapped
+    pack when it is used. `get_file` still returns a path, by materializing
+    the file in a single directory shared by every key.
+    Overridden and dumped files are plain files, as with `FileCacheManager`.
+
+    Entries are never removed from the pack; delete `cache.pack` and
+    `cache.index` from the cache directory to reclaim the space.
+    """
+
+    def __init__(self, key, override=False, dump=False):
+        self.key = key
+        self._override = override
+        self._dump = dump
+        if dump or override:
+            self._file_cache_manager = FileCacheManager(key, override=override, dump=dump)
+        else:
+            self._store = _get_pack_store(get_cache_dir())
+            # hidden, so that it isn't taken for an entry of a `FileCacheManager`
+            self._files_dir = os.path.join(get_cache_dir(), ".packed_files")
+
+    def read_file(self, filename) -> Optional[bytes]:
+        if self._dump or self._override:
+            return self._file_cache_manager.read_file(filename)
+        data = self._store.get(self.key, filename).get(filename)
+        if data is None:
+            return None
+        stats.increment("cache_bytes_read", len(data), tier="disk")
+        return decompress(data)
+
+    def get_file(self, filename) -> Optional[str]:
+        if self._dump or self._override:
+            return self._file_cache_manager.get_file(filename)
+        data = self._store.get(self.key, filename).get(filename)
+        if data is None:
+            return None
+        # materialized for callers that need a path, e.g., to import a launcher
+        os.makedirs(self._files_dir, exist_ok=True)
+        path = os.path.join(self._files_dir, f"{self.key}.{filename}")
+        temp_path = f"{path}.tmp.pid_{os.getpid()}_{uuid.uuid4()}"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path
+
+    def put(self, data, filename, binary=True) -> Union[str, PackedFile]:
+        if self._dump or self._override:
+            return self._file_cache_manager.put(data, filename, binary=binary)
+        data = _maybe_compress(data, filename)
+        stats.increment("cache_bytes_written", len(data), tier="disk")
+        self._store.put(self.key, filename, data)
+        return PackedFile(self._store, self.key, filename)
+
+    def get_group(self, filename: str) -> Optional[Dict[str, Union[str, PackedFile]]]:
+        if self._dump or self._override:
+            return self._file_cache_manager.get_group(filename)
+        grp_filename = f"__grp__{filename}"
+        grp_data = self._store.get(self.key, grp_filename).get(grp_filename)
+        if grp_data is None:
+            stats.increment("cache_misses", tier="disk")
+            return None
+        stats.increment("cache_hits", tier="disk")
+        child_names = json.loads(grp_data).get("child_paths", None)
+        # Invalid group data.
+        if child_names is None:
+            return None
+        # the files are only read when used, e.g., not the IR of kernels that are just launched
+        return {name: PackedFile(self._store, self.key, name) for name in child_names}
+
+    def put_group(self, filename: str, group: Dict[str, Union[str, PackedFile]]):
+        if self._dump or self._override:
+            return self._file_cache_manager.put_group(filename, group)
+        grp_contents = json.dumps({"child_paths": sorted(group.keys())})
+        return self.put(grp_contents, f"__grp__{filename}")
+
+
 __cache_cls = FileCacheManager
 __cache_cls_nme = "DEFAULT"
 
@@ -1,4 +1,13 @@
 import ast
+import contextlib
+import functools
+import hashlib
+import importlib.util
+import marshal
+import multiprocessing
+import os
+import pickle
+import sys
 import textwrap
 import inspect
 from typing import Tuple, List
@@ -54,18 +63,24 @@ class BlockPointerHandle:
         self.block_shape = block_shape
         self.order = order
 
-    def materialize_pointers(self, boundary_check):
+    def materialize_pointers(self, boundary_check, batched=False):
         dtype_tt = self.base.get_element_ty()
         n_bytes = dtype_tt.primitive_bitwidth // 8
-        ptrs = np.broadcast_to(self.base.data, self.block_shape)
-        masks = np.ones(self.block_shape, dtype=bool)
-        for dim in range(len(self.block_shape)):
-            bcast_dims = [1] * len(self.block_shape)
-            bcast_dims[dim] = self.block_shape[dim]
-            off = (self.offsets[dim].data + np.arange(self.block_shape[dim])).reshape(bcast_dims)
-            ptrs = ptrs + (n_bytes * off * self.strides[dim].data).astype(np.uint64)
+        # Scalars are laid out along a leading program axis, which is dropped again when not batched
+        ndim = len(self.block_shape)
+        per_program = lambda handle: handle.data.reshape((-1, ) + (1, ) * ndim)
+        ptrs = per_program(self.base)
+        masks = np.ones((1, ) * (ndim + 1), dtype=bool)
+        for dim in range(ndim):
+            bcast_dims = [1] * (ndim + 1)
+            bcast_dims[dim + 1] = self.block_shape[dim]
+            off = per_program(self.offsets[dim]) + np.arange(self.block_shape[dim]).reshape(bcast_dims)
+            ptrs = ptrs + (n_bytes * off * per_program(self.strides[dim])).astype(np.uint64)
             if dim in boundary_check:
-                masks = masks & (off < self.shape[dim].data) & (off >= 0)
+                masks = masks & (off < per_program(self.shape[dim])) & (off >= 0)
+        masks = np.broadcast_to(masks, ptrs.shape)
+        if not batched:
+            ptrs, masks = ptrs[0], masks[0]
         ptrs = TensorHandle(ptrs, self.base.dtype.scalar)
         return ptrs, masks
 
@@ -81,28 +96,34 @@ class TensorDescHandle:
         self.block_shape = block_shape
 
     def validate(self):
-        assert self.base.data.item() % 16 == 0, "base must be 16-byte aligned"
+        assert np.all(self.base.data % 16 == 0), "base must be 16-byte aligned"
         assert len(self.strides) == self.ndim
         assert len(self.block_shape) == self.ndim
 
         for stride in self.strides[:-1]:
-            assert stride.data.item() % 16 == 0, "stride must be 16-byte aligned"
-        assert self.strides[-1].data.item() == 1, "last dim must be contiguous"
+            assert np.all(stride.data % 16 == 0), "stride must be 16-byte aligned"
+        assert np.all(self.strides[-1].data == 1), "last dim must be contiguous"
 
-    def materialize_pointers(self, offsets: List[TensorHandle]):
+    def materialize_pointers(self, offsets: List[TensorHandle], batched=False):
         assert len(offsets) == self.ndim
         scalar_ty = self.base.dtype.element_ty
         itemsize = scalar_ty.primitive_bitwidth // 8
-        assert (offsets[-1].data * itemsize) % 16 == 0, "block offset start must be 16-byte aligned"
-
-        ptrs = np.broadcast_to(self.base.data, self.block_shape)
-        masks = np.ones(self.block_shape, dtype=bool)
-        for dim in range(len(self.block_shape)):
-            bcast_dims = [1] * len(self.block_shape)
-            bcast_dims[dim] = self.block_shape[dim]
-            off = (offsets[dim].data + np.arange(self.block_shape[dim])).reshape(bcast_dims)
-            ptrs = ptrs + (itemsize * off * self.strides[dim].data).astype(np.uint64)
-            masks = masks & (0 <= off) & (off < self.shape[dim].data)
+        assert np.all((offsets[-1].data * itemsize) % 16 == 0), "block offset start must be 16-byte aligned"
+
+        # Scalars are laid out along a leading program axis, which is dropped again when not batched
+        ndim = len(self.block_shape)
+        per_program = lambda handle: handle.data.reshape((-1, ) + (1, ) * ndim)
+        ptrs = per_program(self.base)
+        masks = np.ones((1, ) * (ndim + 1), dtype=bool)
+        for dim in range(ndim):
+            bcast_dims = [1] * (ndim + 1)
+            bcast_dims[dim + 1] = self.block_shape[dim]
+            off = per_program(offsets[dim]) + np.arange(self.block_shape[dim]).reshape(bcast_dims)
+            ptrs = ptrs + (itemsize * off * per_program(self.strides[dim])).astype(np.uint64)
+            masks = masks & (0 <= off) & (off < per_program(self.shape[dim]))
+        masks = np.broadcast_to(masks, ptrs.shape)
+        if not batched:
+            ptrs, masks = ptrs[0], masks[0]
         ptrs = TensorHandle(ptrs, self.base.dtype.scalar)
         return ptrs, masks
 
@@ -245,6 +266,36 @@ np_erf_fp64 = np.vectorize(_erf, otypes=[np.float64])
 np_umulhi_u64 = np.vectorize(_umulhi_64, otypes=[np.uint64])
 
 
+class _DivergentControlFlow(Exception):
+    """
+    Raised when the programs of a batch need to take different Python control-flow paths.
+    The grid is then re-executed one program at a time.
+    """
+    pass
+
+
+class _NotVectorizable(Exception):
+    """
+    Raised when a combine function cannot be applied to whole arrays at once, e.g., because it branches on its
+    operands. The reduction or scan then falls back to combining one element at a time.
+    """
+    pass
+
+
+def _uniform_value(data):
+    # In batched mode each scalar holds one value per program; Python control flow can only
+    # follow it if all programs agree
+    if len(data) > 1 and np.any(data != data[0]):
+        raise _DivergentControlFlow()
+    return data[0]
+
+
+def _broadcast_programs(*arrays):
+    # Uniform values have a single entry along the program axis; expand it to match the others
+    num_programs = max(len(a) for a in arrays)
+    return [np.broadcast_to(a, (num_programs, ) + a.shape[1:]) for a in arrays]
+
+
 class ExtraFunctions:
 
     @staticmethod
@@ -279,19 +330,60 @@ class InterpreterBuilder:
         self.codegen_fns = {}
         self.codegen_fns["convert_custom_types"] = ExtraFunctions._convert_custom_types
         self.codegen_fns["min_dot_size"] = lambda lhsType, rhsType: (1, 1, 1)
+        # In batched mode, several programs execute at once: grid indices are arrays and every
+        # TensorHandle carries a leading program axis (of size 1 for values shared by all programs)
+        self.batched = False
+        # When the grid is sharded across processes, atomics that the C++ runtime emulates with a
+        # process-local mutex (float16 fadd) must also hold this process-shared lock
+        self.atomic_lock = None
+        # Set while a reduce/scan combine function is evaluated on whole arrays instead of scalars
+        self.vectorized_combine = False
+        # Address ranges of the host copies of the kernel arguments, sorted by address, and whether the kernel has
+        # written to each of them, so that only modified arguments need to be copied back to the device
+        self.track_writes([], np.zeros(0, dtype=bool))
 
     def set_grid_idx(self, x, y, z):
-        if not x < self.grid_dim[0]:
+        if not np.all(x < self.grid_dim[0]):
             raise ValueError("x >= grid_dim[0]")
-        if not y < self.grid_dim[1]:
+        if not np.all(y < self.grid_dim[1]):
             raise ValueError("y >= grid_dim[1]")
-        if not z < self.grid_dim[2]:
+        if not np.all(z < self.grid_dim[2]):
             raise ValueError("z >= grid_dim[2]")
         self.grid_idx = (x, y, z)
 
     def set_grid_dim(self, nx, ny, nz):
         self.grid_dim = (nx, ny, nz)
 
+    def track_writes(self, storages, written):
+        self.storage_starts = np.array([storage.data_ptr() for storage in storages], dtype=np.uint64)
+        self.storage_ends = self.storage_starts + np.array([storage.nbytes() for storage in storages], dtype=np.uint64)
+        self.storage_written = written
+
+    def record_writes(self, ptrs, mask=None):
+        if len(self.storage_written) == 0:
+            return
+        ptrs = ptrs[mask] if mask is not None else ptrs.ravel()
+        idx = np.searchsorted(self.storage_starts, ptrs, side="right").astype(np.intp) - 1
+        in_range = idx >= 0
+        idx, ptrs = idx[in_range], ptrs[in_range]
+        self.storage_written[idx[ptrs < self.storage_ends[idx]]] = True
+
+    def get_batch_shape(self, data):
+        return data.shape[:1] if self.batched else ()
+
+    def broadcast_batch(self, *arrays):
+        # Atomics must be applied once per program, including to operands shared by all programs, and the
+        # runtime walks their buffers linearly, so broadcast views are materialized
+        arrays = np.broadcast_arrays(*arrays)
+        if self.batched:
+            batch_shape = (np.size(self.grid_idx[0]), )
+            arrays = [np.broadcast_to(array, batch_shape + array.shape[1:]) for array in arrays]
+        return [np.ascontiguousarray(array) for array in arrays]
+
+    def get_data_axis(self, axis):
+        # Maps an axis of the Triton tensor to the corresponding axis of its handle data
+        return axis + 1 if self.batched and axis >= 0 else axis
+
     # constants
 
     def get_half_ty(self):
@@ -397,7 +489,7 @@ class InterpreterBuilder:
     def create_get_program_id(self, axis):
         if self.grid_idx is None:
             raise ValueError("grid_idx is None")
-        return TensorHandle(np.array([self.grid_idx[axis]], dtype=np.int32), tl.int32)
+        return TensorHandle(np.array(self.grid_idx[axis], dtype=np.int32, ndmin=1), tl.int32)
 
     def create_get_num_programs(self, axis):
         return TensorHandle(np.array([self.grid_dim[axis]], dtype=np.int32), tl.int32)
@@ -417,11 +509,13 @@ class InterpreterBuilder:
         dtype_np = _get_np_dtype(dtype_tt)
         if other is None:
             other = TensorHandle(np.zeros_like(ptrs.data, dtype=dtype_np), dtype_tt)
-        ret = _interpreter.load(ptrs.data, mask.data, other.data, dtype_np)
+        ret = _interpreter.load(*np.broadcast_arrays(ptrs.data, mask.data, other.data), dtype_np)
         return TensorHandle(ret, dtype_tt)
 
     def create_masked_store(self, ptrs, value, mask, cache_modifier, eviction_policy):
-        return _interpreter.store(ptrs.data, value.data, mask.data)
+        ptrs_data, value_data, mask_data = np.broadcast_arrays(ptrs.data, value.data, mask.data)
+        self.record_writes(ptrs_data, mask_data)
+        return _interpreter.store(ptrs_data, value_data, mask_data)
 
     # casting ops
     def cast_impl(self, src, dst_type):
@@ -576,9 +670,12 @@ class InterpreterBuilder:
         return TensorHandle(1 / np.sqrt(arg.data), arg.dtype.scalar)
 
     # tensor operators
-    create_reshape = lambda self, arg, shape, allow_reorder: TensorHandle(arg.data.reshape(shape), arg.dtype.scalar)
+    def create_reshape(self, arg, shape, allow_reorder):
+        return TensorHandle(arg.data.reshape(self.get_batch_shape(arg.data) + tuple(shape)), arg.dtype.scalar)
 
     def create_trans(self, arg, perm):
+        if self.batched:
+            perm = (0, ) + tuple(p + 1 for p in perm)
         return TensorHandle(np.transpose(arg.data, perm), arg.dtype.scalar)
 
     def create_dot(self, a, b, d, input_precision, max_num_imprecise_acc):
@@ -591,13 +688,16 @@ class InterpreterBuilder:
         return TensorHandle(np.matmul(a_data, b_data, dtype=d.data.dtype) + d.data, d.dtype.scalar)
 
     def create_make_range(self, start, stop):
-        return TensorHandle(np.arange(start, stop, dtype=np.int32), tl.int32)
+        data = np.arange(start, stop, dtype=np.int32)
+        return TensorHandle(data[np.newaxis] if self.batched else data, tl.int32)
 
     def create_histogram(self, data, bins):
+        if self.batched:
+            return TensorHandle(np.stack([np.histogram(d, bins=bins, range=(0, bins))[0] for d in data.data]), tl.int32)
         return TensorHandle(np.histogram(data.data, bins=bins, range=(0, bins))[0], tl.int32)
 
     def create_gather(self, src, indices, axis):
-        return TensorHandle(np.take_along_axis(src.data, indices.data, axis=axis), src.dtype.scalar)
+        return TensorHandle(np.take_along_axis(src.data, indices.data, axis=self.get_data_axis(axis)), src.dtype.scalar)
 
     # pointer arithmetic
 
@@ -610,7 +710,7 @@ class InterpreterBuilder:
 
     def create_tensor_pointer_load(self, ptr, boundary_check, padding_option, cache_modifier, eviction_policy,
                                    is_volatile):
-        ptrs, masks = ptr.materialize_pointers(boundary_check)
+        ptrs, masks = ptr.materialize_pointers(boundary_check, self.batched)
         dtype_tt = ptrs.get_element_ty()
         dtype_np = _get_np_dtype(dtype_tt)
         if padding_option is None:
@@ -624,27 +724,34 @@ class InterpreterBuilder:
         return self.create_masked_load(ptrs, masks, other, cache_modifier, eviction_policy, is_volatile)
 
     def create_tensor_pointer_store(self, ptr, value, boundary_check, cache_modifier, eviction_policy):
-        ptrs, masks = ptr.materialize_pointers(boundary_check)
+        ptrs, masks = ptr.materialize_pointers(boundary_check, self.batched)
         return self.create_masked_store(ptrs, value, masks, cache_modifier, eviction_policy)
 
     def create_expand_dims(self, arg, axis):
-        return TensorHandle(np.expand_dims(arg.data, axis), arg.dtype.scalar)
+        return TensorHandle(np.expand_dims(arg.data, self.get_data_axis(axis)), arg.dtype.scalar)
 
     def create_broadcast(self, arg, shape):
-        return TensorHandle(np.broadcast_to(arg.data, shape), arg.dtype.scalar)
+        return TensorHandle(np.broadcast_to(arg.data, self.get_batch_shape(arg.data) + tuple(shape)), arg.dtype.scalar)
 
     def create_cat(self, lhs, rhs):
+        if self.batched:
+            return TensorHandle(np.concatenate(_broadcast_programs(lhs.data, rhs.data), axis=1), lhs.dtype.scalar)
         return TensorHandle(np.concatenate([lhs.data, rhs.data]), lhs.dtype.scalar)
 
     def create_join(self, lhs, rhs):
         # Triton only supports joining two original tensors into a new one along the last axis
-        return TensorHandle(np.stack([lhs.data, rhs.data], axis=-1), lhs.dtype.scalar)
+        return TensorHandle(np.stack(np.broadcast_arrays(lhs.data, rhs.data), axis=-1), lhs.dtype.scalar)
 
     def create_split(self, val):
         # Triton only supports splitting the original tensor into two along the last axis
         return (TensorHandle(val.data[..., 0], val.dtype.scalar), TensorHandle(val.data[..., 1], val.dtype.scalar))
 
     def create_splat(self, arg, shape):
+        if self.batched:
+            # Splat the (first) value of each program separately
+            data = arg.data.reshape(len(arg.data), -1)[:, 0].reshape((-1, ) + (1, ) * len(shape))
+            data = np.broadcast_to(data, (len(data), ) + tuple(shape))
+            return TensorHandle(data.astype(_get_np_dtype(arg.dtype)), arg.dtype.scalar)
         if isinstance(arg.dtype, tl.block_type):
             return TensorHandle(np.full(shape, arg.data[0], dtype=_get_np_dtype(arg.dtype)), arg.dtype.scalar)
         else:  # scalar
@@ -654,7 +761,9 @@ class InterpreterBuilder:
         if sem not in self.ir_sem_to_interpreter_sem:
             raise ValueError(f"unsupported semantic {sem}")
         sem = self.ir_sem_to_interpreter_sem[sem]
-        return TensorHandle(_interpreter.atomic_cas(ptr.data, cmp.data, val.data, sem), cmp.dtype.scalar)
+        ptr_data, cmp_data, val_data = self.broadcast_batch(ptr.data, cmp.data, val.data)
+        self.record_writes(ptr_data)
+        return TensorHandle(_interpreter.atomic_cas(ptr_data, cmp_data, val_data, sem), cmp.dtype.scalar)
 
     def create_atomic_rmw(self, rmwOp, ptr, val, mask, sem, scope):
         if rmwOp not in self.ir_rmw_op_to_interpreter_rmw_op:
@@ -663,7 +772,11 @@ class InterpreterBuilder:
             raise ValueError(f"unsupported semantic {sem}")
         rmwOp = self.ir_rmw_op_to_interpreter_rmw_op[rmwOp]
         sem = self.ir_sem_to_interpreter_sem[sem]
-        return TensorHandle(_interpreter.atomic_rmw(rmwOp, ptr.data, val.data, mask.data, sem), val.dtype.scalar)
+        ptr_data, val_data, mask_data = self.broadcast_batch(ptr.data, val.data, mask.data)
+        self.record_writes(ptr_data, mask_data)
+        lock = self.atomic_lock if self.atomic_lock is not None and val_data.dtype == np.float16 else None
+        with lock or contextlib.nullcontext():
+            return TensorHandle(_interpreter.atomic_rmw(rmwOp, ptr_data, val_data, mask_data, sem), val.dtype.scalar)
 
     def create_extern_elementwise(self, libName, libPath, symbol, argList, retType, isPure):
         raise NotImplementedError("extern_elementwise not supported in interpreter mode")
@@ -676,13 +789,16 @@ class InterpreterBuilder:
         # by `values` themselves in python interpreter, thus not really needed here;
         # it is only used for triton PrintOpToLLVM to correctly construct the format specifier.
         # Interpreter's device_print function has a different format than Triton's device_print
-        msg = f"({self.grid_idx[0]}, {self.grid_idx[1]}, {self.grid_idx[2]})"
-        if prefix:
-            msg += f" {prefix}"
         if hex:
             np.set_printoptions(formatter={'all': lambda x: f"0x{x:02x}"})
-        for value in values:
-            print(msg + f" {value.data}")
+        grid_idx = [np.array(idx, ndmin=1) for idx in self.grid_idx]
+        for i, (x, y, z) in enumerate(zip(*grid_idx)):
+            msg = f"({x}, {y}, {z})"
+            if prefix:
+                msg += f" {prefix}"
+            for value in values:
+                data = value.data[min(i, len(value.data) - 1)] if self.batched else value.data
+                print(msg + f" {data}")
         if hex:
             np.set_printoptions(formatter=None)
 
@@ -709,7 +825,7 @@ class InterpreterBuilder:
         new_offsets = [offset.clone() for offset in ptr.offsets]
         ret = BlockPointerHandle(ptr.base, ptr.shape, ptr.strides, new_offsets, ptr.block_shape, ptr.order)
         for i in range(len(offsets)):
-            ret.offsets[i].data += offsets[i].data
+            ret.offsets[i].data = ret.offsets[i].data + offsets[i].data
         return ret
 
     def create_make_tensor_descriptor(
@@ -726,20 +842,27 @@ class InterpreterBuilder:
     def create_descriptor_load(self, desc: TensorDescHandle, indices: List[TensorHandle], cache_modifier,
                                eviction_policy):
         assert isinstance(desc, TensorDescHandle)
-        ptrs, mask = desc.materialize_pointers(indices)
+        ptrs, mask = desc.materialize_pointers(indices, self.batched)
         return self.create_masked_load(ptrs, mask, other=None, cache_modifier=cache_modifier,
                                        eviction_policy=eviction_policy, is_volatile=False)
 
     def create_descriptor_store(self, desc: TensorDescHandle, value: TensorHandle, indices: List[TensorHandle]):
-        ptrs, mask = desc.materialize_pointers(indices)
+        ptrs, mask = desc.materialize_pointers(indices, self.batched)
         return self.create_masked_store(ptrs, value, mask, None, None)
 
     def create_descriptor_gather(self, desc: TensorDescHandle, x_offsets: TensorHandle, y_offset: TensorHandle, type):
         dtype = desc.base.dtype.element_ty
         np_dtype = _get_np_dtype(dtype)
-        result = np.zeros([x_offsets.data.shape[0], desc.block_shape[-1]], dtype=np_dtype)
         cache_modifier = None
         eviction_policy = None
+        if self.batched:
+            rows = []
+            for i in range(x_offsets.data.shape[1]):
+                indices = [TensorHandle(x_offsets.data[:, i], tl.int32), y_offset]
+                row = self.create_descriptor_load(desc, indices, cache_modifier, eviction_policy).data
+                rows.append(row.reshape(len(row), -1))
+            return TensorHandle(np.stack(_broadcast_programs(*rows), axis=1).astype(np_dtype), dtype)
+        result = np.zeros([x_offsets.data.shape[0], desc.block_shape[-1]], dtype=np_dtype)
         for i, x_offset in enumerate(x_offsets.data):
             indices = [TensorHandle(x_offset, tl.int32), y_offset]
             result[i, :] = self.create_descriptor_load(desc, indices, cache_modifier, eviction_policy).data
@@ -747,6 +870,12 @@ class InterpreterBuilder:
 
     def create_descriptor_scatter(self, desc: TensorDescHandle, value: TensorHandle, x_offsets: TensorHandle,
                                   y_offset: TensorHandle):
+        if self.batched:
+            for i in range(x_offsets.data.shape[1]):
+                slice = TensorHandle(value.data[:, i:i + 1], value.dtype)
+                indices = [TensorHandle(x_offsets.data[:, i], tl.int32), y_offset]
+                self.create_descriptor_store(desc, slice, indices)
+            return
         for i, x_offset in enumerate(x_offsets.data):
             slice = TensorHandle(value.data[i], value.dtype)
             indices = [TensorHandle(x_offset, tl.int32), y_offset]
@@ -780,17 +909,25 @@ def _patch_lang_tensor(tensor):
         data = self.handle.data
         # in triton, only scalars can be converted to booleans
         # here we need this hack because all scalars are tensors
-        return bool(data) if data.size == 1 else True
+        if interpreter_builder.vectorized_combine and (data[0] if interpreter_builder.batched else data).size > 1:
+            raise _NotVectorizable()
+        if interpreter_builder.batched:
+            return bool(_uniform_value(data)) if data[0].size == 1 else True
+        return bool(data.item()) if data.size == 1 else True
+
+    def _get_index(self):
+        data = self.handle.data
+        return int(_uniform_value(data) if interpreter_builder.batched else data.item())
 
     def _get_transpose(self):
-        handle = TensorHandle(np.transpose(self.handle.data), self.handle.dtype)
+        handle = TensorHandle(np.swapaxes(self.handle.data, -1, -2), self.handle.dtype)
         assert self.type.is_block()
         block_shape = list(self.type.shape)
         block_shape[-1], block_shape[-2] = block_shape[-2], block_shape[-1]
         res_ty = tl.core.block_type(self.dtype, block_shape)
         return tl.core.tensor(handle, res_ty)
 
-    tensor.__index__ = lambda self: int(self.handle.data)
+    tensor.__index__ = lambda self: _get_index(self)
     tensor.__bool__ = lambda self: _get_bool(self)
     tensor.__repr__ = lambda self: repr(self.handle.data)
     tensor.__str__ = lambda self: str(self.handle.data)
@@ -815,14 +952,38 @@ class ReduceScanOpInterface:
 
     def to_tensor(self, ret, dtype):
         np_dtype = _get_np_dtype(dtype)
-        if hasattr(ret, "shape") and ret.shape:
+        batch_rank = len(interpreter_builder.get_batch_shape(ret)) if hasattr(ret, "shape") else 0
+        if hasattr(ret, "shape") and len(ret.shape) > batch_rank:
             ret = ret.astype(np_dtype)
-            ret_type = tl.block_type(dtype, list(ret.shape))
+            ret_type = tl.block_type(dtype, list(ret.shape[batch_rank:]))
         else:
-            ret = np.array([ret], dtype=np_dtype)
+            ret = np.array(ret, dtype=np_dtype, ndmin=1)
             ret_type = dtype
         return tl.core.tensor(TensorHandle(ret, dtype.scalar), ret_type)
 
+    def get_data(self, input):
+        data = [arg.handle.data for arg in input]
+        return _broadcast_programs(*data) if interpreter_builder.batched else data
+
+    def combine(self, lhs, rhs, dtypes):
+        # Evaluates the combine function on whole arrays, which computes the same as combining them element by
+        # element unless the function branches on its operands
+        lhs = [self.to_tensor(data, dtype) for data, dtype in zip(lhs, dtypes)]
+        rhs = [self.to_tensor(data, dtype) for data, dtype in zip(rhs, dtypes)]
+        combine_fn = self.combine_fn
+        if not isinstance(combine_fn, InterpretedFunction):
+            combine_fn = InterpretedFunction(combine_fn.fn)
+        interpreter_builder.vectorized_combine = True
+        try:
+            ret = combine_fn(*lhs, *rhs)
+        finally:
+            interpreter_builder.vectorized_combine = False
+        ret = ret if isinstance(ret, tuple) else (ret, )
+        return [
+            np.broadcast_to(r.handle.data if isinstance(r, tl.core.tensor) else r,
+                            l.handle.data.shape).astype(l.handle.data.dtype) for r, l in zip(ret, lhs)
+        ]
+
     def apply(self, input):
         if not isinstance(input, tuple):
             input = (input, )
@@ -840,25 +1001,58 @@ class ReduceOps(ReduceScanOpInterface):
         self.keep_dims = keep_dims
 
     def unravel(self, input, axis):
+        if axis is not None:
+            return input, axis
         ret = []
         for data in input:
-            if axis is not None:
-                ret.append(data)
-            else:
-                axis = 0
-                ret.append(self.to_tensor(data.handle.data.flatten(), data.dtype))
-        return tuple(ret), axis
+            flat_shape = interpreter_builder.get_batch_shape(data.handle.data) + (-1, )
+            ret.append(self.to_tensor(data.handle.data.reshape(flat_shape), data.dtype))
+        return tuple(ret), 0
+
+    def reduce_data(self, data, reduce_op):
+        batch_shape = interpreter_builder.get_batch_shape(data)
+        if self.axis is None:
+            ret = reduce_op(data.reshape(batch_shape + (-1, )), axis=-1)
+            if self.keep_dims:
+                ret = ret.reshape(batch_shape + (1, ) * (data.ndim - len(batch_shape)))
+            return ret
+        return reduce_op(data, axis=interpreter_builder.get_data_axis(self.axis), keepdims=self.keep_dims)
+
+    def pack(self, output_data, input, axis, rank):
+        ret = []
+        for i, data in enumerate(output_data):
+            if self.keep_dims:
+                if self.axis is not None:
+                    data = np.expand_dims(data, axis)
+                else:
+                    data = data.reshape(data.shape + (1, ) * rank)
+            ret.append(self.to_tensor(data, input[i].dtype))
+        return ret[0] if len(ret) == 1 else tuple(ret)
+
+    def tree_reduce(self, input):
+        rank = len(input[0].shape)
+        input, axis = self.unravel(input, self.axis)
+        input_data = self.get_data(input)
+        axis = interpreter_builder.get_data_axis(axis) % input_data[0].ndim
+        dtypes = [arg.dtype for arg in input]
+        # Combine adjacent pairs until a single element is left, which takes log2(n) combine calls. Block
+        # dimensions are powers of two, so the operands of every step keep a valid block shape.
+        while input_data[0].shape[axis] > 1:
+            lhs = [data[(slice(None), ) * axis + (slice(0, None, 2), )] for data in input_data]
+            rhs = [data[(slice(None), ) * axis + (slice(1, None, 2), )] for data in input_data]
+            input_data = self.combine(lhs, rhs, dtypes)
+        return self.pack([np.squeeze(data, axis) for data in input_data], input, axis, rank)
 
     def generic_reduce(self, input):
-        original_axis = self.axis
+        rank = len(input[0].shape)
         input, axis = self.unravel(input, self.axis)
-        input_data = []
+        input_data = self.get_data(input)
         output_data = []
-        input_shape = input[0].handle.data.shape
+        input_shape = input_data[0].shape
+        axis = interpreter_builder.get_data_axis(axis) % len(input_shape)
         output_shape = input_shape[0:axis] + input_shape[axis + 1:]
-        for arg in input:
-            input_data.append(arg.handle.data)
-            output_data.append(np.zeros(output_shape, dtype=arg.handle.data.dtype))
+        for data in input_data:
+            output_data.append(np.zeros(output_shape, dtype=data.dtype))
         # Reduce on axis
         for i in range(input_data[0].size):
             # Recover input_index from i using input_shape
@@ -876,21 +1070,7 @@ class ReduceOps(ReduceScanOpInterface):
                 for j in range(len(output_data)):
                     output_data[j][output_index] = acc_tuple[j].handle.data.item() if isinstance(
                         acc_tuple[j], tl.core.tensor) else acc_tuple[j]
-        # Pack output
-        ret = []
-        for i, data in enumerate(output_data):
-            if self.keep_dims:
-                if original_axis is not None:
-                    data = np.expand_dims(data, axis)
-                else:
-                    for _ in range(len(input_shape)):
-                        data = np.expand_dims(data, 0)
-
-            elif original_axis is None:
-                # Take a scalar
-                data = data.item()
-            ret.append(self.to_tensor(data, input[i].dtype))
-        return ret[0] if len(ret) == 1 else tuple(ret)
+        return self.pack(output_data, input, axis, rank)
 
     def min_max(self, input, val_reduce_op, idx_reduce_op=None):
         # If input is a tuple, it must be (val, index), and we only take val
@@ -898,9 +1078,9 @@ class ReduceOps(ReduceScanOpInterface):
         val = None
         idx = None
         if val_reduce_op:
-            val = self.to_tensor(val_reduce_op(input.handle.data, axis=self.axis, keepdims=self.keep_dims), input.dtype)
+            val = self.to_tensor(self.reduce_data(input.handle.data, val_reduce_op), input.dtype)
         if idx_reduce_op:
-            idx = self.to_tensor(idx_reduce_op(input.handle.data, axis=self.axis, keepdims=self.keep_dims), tl.int32)
+            idx = self.to_tensor(self.reduce_data(input.handle.data, idx_reduce_op), tl.int32)
         if val is not None and idx is not None:
             return val, idx
         elif val is not None:
@@ -911,7 +1091,7 @@ class ReduceOps(ReduceScanOpInterface):
             raise ValueError("val_reduce_op and idx_reduce_op are both None")
 
     def sum(self, input):
-        return self.to_tensor(np.sum(input.handle.data, axis=self.axis, keepdims=self.keep_dims), input.dtype)
+        return self.to_tensor(self.reduce_data(input.handle.data, np.sum), input.dtype)
 
     def apply_impl(self, input):
         if self.combine_fn == tl.standard._argmin_combine_tie_break_left:
@@ -924,7 +1104,9 @@ class ReduceOps(ReduceScanOpInterface):
             return self.min_max(input[0], val_reduce_op=np.min, idx_reduce_op=None)
         elif self.combine_fn == tl.standard._sum_combine:
             return self.sum(input[0])
-        else:
+        try:
+            return self.tree_reduce(input)
+        except _NotVectorizable:
             # Fall back to the slow mode
             return self.generic_reduce(input)
 
@@ -936,29 +1118,48 @@ class ScanOps(ReduceScanOpInterface):
         self.reverse = reverse
 
     def cumsum(self, input):
-        return [self.to_tensor(np.cumsum(input.handle.data, axis=self.axis), dtype=input.dtype)]
+        axis = interpreter_builder.get_data_axis(self.axis)
+        return [self.to_tensor(np.cumsum(input.handle.data, axis=axis), dtype=input.dtype)]
 
     def cumprod(self, input):
-        return [self.to_tensor(np.cumprod(input.handle.data, axis=self.axis), dtype=input.dtype)]
+        axis = interpreter_builder.get_data_axis(self.axis)
+        return [self.to_tensor(np.cumprod(input.handle.data, axis=axis), dtype=input.dtype)]
+
+    def hillis_steele_scan(self, input):
+        output_data = self.get_data(input)
+        axis = interpreter_builder.get_data_axis(self.axis) % output_data[0].ndim
+        n = output_data[0].shape[axis]
+        dtypes = [arg.dtype for arg in input]
+        positions = np.arange(n).reshape((-1, ) + (1, ) * (output_data[0].ndim - axis - 1))
+        # After each step, every element holds the combination of the (up to) 2 * offset elements ending at it.
+        # Elements are shifted by rolling rather than slicing to keep block shapes powers of two, and the first
+        # `offset` elements, which have no predecessor at that distance, are left untouched.
+        offset = 1
+        while offset < n:
+            prev_data = [np.roll(data, offset, axis=axis) for data in output_data]
+            combined = self.combine(prev_data, output_data, dtypes)
+            output_data = [np.where(positions < offset, data, c) for data, c in zip(output_data, combined)]
+            offset *= 2
+        return [self.to_tensor(data, input[i].dtype) for i, data in enumerate(output_data)]
 
     def generic_scan(self, input):
-        input_data = []
+        input_data = self.get_data(input)
         output_data = []
-        shape = input[0].handle.data.shape
-        for arg in input:
-            input_data.append(arg.handle.data)
-            output_data.append(np.zeros(shape, dtype=arg.handle.data.dtype))
+        shape = input_data[0].shape
+        axis = interpreter_builder.get_data_axis(self.axis) % len(shape)
+        for data in input_data:
+            output_data.append(np.zeros(shape, dtype=data.dtype))
         # Scan on axis
         for i in range(input_data[0].size):
             # Recover index from i using shape
             index = np.unravel_index(i, shape)
             data = tuple(self.to_tensor(d[index], input[ii].dtype) for ii, d in enumerate(input_data))
-            if index[self.axis] == 0:
+            if index[axis] == 0:
                 # First element
                 for j in range(len(output_data)):
                     output_data[j][index] = data[j].handle.data.item()
             else:
-                prev_index = tuple(index[i] - 1 if i == self.axis else index[i] for i in range(len(index)))
+                prev_index = tuple(index[i] - 1 if i == axis else index[i] for i in range(len(index)))
                 acc_tuple = tuple(self.to_tensor(o[prev_index], input[oi].dtype) for oi, o in enumerate(output_data))
                 combine_fn_ret = self.combine_fn.fn(*acc_tuple, *data)
                 acc_tuple = (combine_fn_ret, ) if not isinstance(combine_fn_ret, tuple) else combine_fn_ret
@@ -973,9 +1174,10 @@ class ScanOps(ReduceScanOpInterface):
 
     def apply_impl(self, input):
         new_input = []
+        axis = interpreter_builder.get_data_axis(self.axis)
         if self.reverse:
             for arg in input:
-                new_input.append(self.to_tensor(np.flip(arg.handle.data, axis=self.axis), arg.dtype))
+                new_input.append(self.to_tensor(np.flip(arg.handle.data, axis=axis), arg.dtype))
         else:
             new_input = input
         if self.combine_fn == tl.standard._sum_combine:
@@ -983,11 +1185,14 @@ class ScanOps(ReduceScanOpInterface):
         elif self.combine_fn == tl.standard._prod_combine:
             ret = self.cumprod(new_input[0])
         else:
-            # Fall back to the slow mode
-            ret = self.generic_scan(new_input)
+            try:
+                ret = self.hillis_steele_scan(new_input)
+            except _NotVectorizable:
+                # Fall back to the slow mode
+                ret = self.generic_scan(new_input)
         if self.reverse:
             for arg in ret:
-                arg.handle.data = np.flip(arg.handle.data, axis=self.axis)
+                arg.handle.data = np.flip(arg.handle.data, axis=axis)
         return len(ret) == 1 and ret[0] or tuple(ret)
 
 
@@ -1085,17 +1290,24 @@ def _patch_lang_core(lang):
     _patch_reduce_scan()
 
 
+# Patching is idempotent, so every language module only needs to be patched once per process
+_patched_langs = set()
+
+
 def _patch_lang(fn):
     langs = [value for _, value in fn.__globals__.items() if inspect.ismodule(value) and value in [tl, tl.core]]
     assert len(langs) >= 1, "triton.language must be visible from within jit'd function"
     for lang in langs:
+        if lang in _patched_langs:
+            continue
         _patch_builtin(lang, interpreter_builder)
         _patch_builtin(lang.tensor, interpreter_builder)
         if lang == tl:
             _patch_builtin(lang.math, interpreter_builder)
         _patch_lang_tensor(lang.tensor)
         _patch_lang_core(lang)
-    _patch_builtin(tl.core.tensor_descriptor_base, interpreter_builder)
+        _patch_builtin(tl.core.tensor_descriptor_base, interpreter_builder)
+        _patched_langs.add(lang)
 
 
 def _tuple_create(arg, contents):
@@ -1135,6 +1347,39 @@ def _implicit_cvt(arg):
 
 interpreter_builder = InterpreterBuilder()
 
+# Kernels whose programs diverged in batched mode, which are always executed one program at a time
+_serial_fns = set()
+
+
+def _get_batch_size():
+    return int(os.getenv("TRITON_INTERPRET_BATCH_SIZE", "1"))
+
+
+def _get_num_workers():
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return 1
+    return int(os.getenv("TRITON_INTERPRET_NUM_WORKERS", "1"))
+
+
+# Work shared with forked worker processes, which inherit it instead of unpickling it
+_parallel_work = None
+
+
+def _run_shard(shard):
+    try:
+        _parallel_work(shard)
+    except Exception as e:
+        # Report all failures only once every worker is done, so that no worker keeps writing to shared memory
+        # while the parent restores it
+        try:
+            pickle.dumps(e)
+            return e
+        except Exception:
+            return RuntimeError(repr(e))
+    finally:
+        sys.stdout.flush()
+    return None
+
 
 def _unwrap_tensor(t):
     if isinstance(t, triton.runtime.jit.TensorWrapper):
@@ -1148,6 +1393,22 @@ def _rewrap_tensor(t, original_tensor):
     return t
 
 
+def _get_storages(args):
+    storages = {}
+
+    def _collect(arg):
+        if isinstance(arg, tuple):
+            for x in arg:
+                _collect(x)
+        elif hasattr(arg, "data_ptr"):
+            storage = _unwrap_tensor(arg).untyped_storage()
+            storages[storage.data_ptr()] = storage
+
+    for arg in args:
+        _collect(arg)
+    return list(storages.values())
+
+
 class GridExecutor:
 
     def __init__(self, fn, arg_names, grid):
@@ -1159,7 +1420,7 @@ class GridExecutor:
         __annotations__ = {name: _normalize_ty(ty) for name, ty in fn.__annotations__.items()}
         self.constexprs = [name for name in arg_names if __annotations__.get(name) == "constexpr"]
 
-    def _init_args_hst(self, args_dev, kwargs):
+    def _init_args_hst(self, args_dev, kwargs, shared=False):
         storages = {}
 
         def _to_cpu(arg):
@@ -1171,7 +1432,13 @@ class GridExecutor:
             unwrapped_arg = _unwrap_tensor(arg)
             if unwrapped_arg.untyped_storage().data_ptr() not in storages:
                 storage = unwrapped_arg.untyped_storage()
-                storages[storage.data_ptr()] = storage.cpu()
+                storage_hst = storage.cpu()
+                if shared:
+                    # Worker processes read and write the host copy through the same shared mapping
+                    if storage_hst.data_ptr() == storage.data_ptr():
+                        storage_hst = storage_hst.clone()
+                    storage_hst.share_memory_()
+                storages[storage.data_ptr()] = storage_hst
 
             storage = storages[unwrapped_arg.untyped_storage().data_ptr()]
             cpu_arg = unwrapped_arg.new_empty(0, device='cpu')
@@ -1187,7 +1454,7 @@ class GridExecutor:
             kwargs_hst[key] = _to_cpu(value)
         return args_hst, kwargs_hst
 
-    def _restore_args_dev(self, args_dev, args_hst, kwargs, kwargs_hst):
+    def _restore_args_dev(self, args_dev, args_hst, kwargs, kwargs_hst, written):
         storages = {}
 
         def _from_cpu(arg_dev, arg_hst):
@@ -1208,7 +1475,9 @@ class GridExecutor:
             _from_cpu(kwarg_dev, kwarg_hst)
 
         for (arg_dev, arg_hst) in storages.values():
-            arg_dev.copy_(arg_hst)
+            # Arguments that were only read, or that live on the host and were modified in place, need no copy
+            if arg_hst.data_ptr() in written and arg_hst.data_ptr() != arg_dev.data_ptr():
+                arg_dev.copy_(arg_hst)
 
     def __call__(self, *args_dev, **kwargs):
         if kwargs.pop("warmup", False):
@@ -1218,8 +1487,9 @@ class GridExecutor:
         # It's safe to inspect only positional or keyword arguments (i.e., argspec.args)
         argspec = inspect.getfullargspec(self.fn)
         kwargs = {k: v for k, v in kwargs.items() if k in argspec.args}
+        num_workers = _get_num_workers()
         # copy arguments to the host
-        args_hst, kwargs_hst = self._init_args_hst(args_dev, kwargs)
+        args_hst, kwargs_hst = self._init_args_hst(args_dev, kwargs, shared=num_workers > 1)
         # remaps core language functions to interpreted ones
         _patch_lang(self.fn)
         # we need to copy arguments to the host for the interpreter
@@ -1231,21 +1501,116 @@ class GridExecutor:
         assert len(grid) <= 3, "grid must have at most 3 dimensions"
         grid = grid + (1, ) * (3 - len(grid))
         interpreter_builder.set_grid_dim(*grid)
+        storages = sorted(_get_storages([*args_hst, *kwargs_hst.values()]), key=lambda storage: storage.data_ptr())
+        # Workers of a parallel launch report their writes through shared memory
+        written = np.frombuffer(multiprocessing.RawArray("b", len(storages)), dtype=np.bool_) if num_workers > 1 \
+            else np.zeros(len(storages), dtype=np.bool_)
+        interpreter_builder.track_writes(storages, written)
         try:
-            for x in range(grid[0]):
-                for y in range(grid[1]):
-                    for z in range(grid[2]):
-                        interpreter_builder.set_grid_idx(x, y, z)
-                        self.fn(**args)
+            batch_size = _get_batch_size()
+            num_programs = grid[0] * grid[1] * grid[2]
+            if num_workers > 1 and num_programs > 1:
+                self._run_parallel(args, grid, min(num_workers, num_programs), batch_size, storages)
+            elif batch_size > 1 and self.fn not in _serial_fns:
+                self._run_batched_or_serial(args, grid, batch_size, storages)
+            else:
+                self._run_serial(args, grid)
         except Exception as e:
             raise InterpreterError(repr(e)) from e
+        finally:
+            interpreter_builder.track_writes([], np.zeros(0, dtype=bool))
         # copy arguments back to propagate side-effects
-        self._restore_args_dev(args_dev, args_hst, kwargs, kwargs_hst)
+        written = {storage.data_ptr() for storage, is_written in zip(storages, written) if is_written}
+        self._restore_args_dev(args_dev, args_hst, kwargs, kwargs_hst, written)
+
+    def _run_serial(self, args, grid):
+        for x in range(grid[0]):
+            for y in range(grid[1]):
+                for z in range(grid[2]):
+                    interpreter_builder.set_grid_idx(x, y, z)
+                    self.fn(**args)
+
+    def _run_batched(self, args, grid, batch_size, pids=None):
+        if pids is None:
+            pids = np.arange(grid[0] * grid[1] * grid[2])
+        interpreter_builder.batched = True
+        try:
+            for start in range(0, len(pids), batch_size):
+                # Same program order as the serial loop: z varies fastest, then y, then x
+                interpreter_builder.set_grid_idx(*np.unravel_index(pids[start:start + batch_size], grid))
+                self.fn(**args)
+        finally:
+            interpreter_builder.batched = False
+
+    def _run_batched_or_serial(self, args, grid, batch_size, storages):
+        # Side effects of a partially executed batch must be undone before replaying the grid serially
+        snapshots = [storage.clone() for storage in storages]
+        try:
+            self._run_batched(args, grid, batch_size)
+        except _DivergentControlFlow:
+            for storage, snapshot in zip(storages, snapshots):
+                storage.copy_(snapshot)
+            _serial_fns.add(self.fn)
+            self._run_serial(args, grid)
+
+    def _run_programs(self, args, grid, num_workers, batch_size, shard):
+        # Programs are dealt round-robin so that each worker gets a similar mix of the grid
+        pids = np.arange(shard, grid[0] * grid[1] * grid[2], num_workers)
+        if batch_size > 1:
+            self._run_batched(args, grid, batch_size, pids)
+        else:
+            for x, y, z in zip(*np.unravel_index(pids, grid)):
+                interpreter_builder.set_grid_idx(int(x), int(y), int(z))
+                self.fn(**args)
+
+    def _run_parallel(self, args, grid, num_workers, batch_size, storages):
+        global _parallel_work
+        batched = batch_size > 1 and self.fn not in _serial_fns
+        # Side effects of partially executed batches must be undone before replaying the grid serially
+        snapshots = [storage.clone() for storage in storages] if batched else []
+        ctx = multiprocessing.get_context("fork")
+        interpreter_builder.atomic_lock = ctx.Lock()
+        _parallel_work = partial(self._run_programs, args, grid, num_workers, batch_size if batched else 1)
+        try:
+            sys.stdout.flush()
+            with ctx.Pool(num_workers) as pool:
+                errors = [e for e in pool.map(_run_shard, range(num_workers)) if e is not None]
+        finally:
+            _parallel_work = None
+            interpreter_builder.atomic_lock = None
+        if batched and any(isinstance(e, _DivergentControlFlow) for e in errors):
+            for storage, snapshot in zip(storages, snapshots):
+                storage.copy_(snapshot)
+            _serial_fns.add(self.fn)
+            return self._run_parallel(args, grid, num_workers, 1, storages)
+        if errors:
+            raise errors[0]
+
+
+def _apply_bool_op(method_name, lhs, rhs_fn):
+    # Like in compiled kernels, `and` and `or` are elementwise on tensors
+    if isinstance(lhs, tl.core.tensor):
+        return getattr(lhs, method_name)(rhs_fn())
+    return (lhs and rhs_fn()) if method_name == "logical_and" else (lhs or rhs_fn())
 
 
 class ASTTransformer(ast.NodeTransformer):
 
+    def visit_BoolOp(self, node):
+        # Modify `a or b` to _apply_bool_op("logical_or", a, lambda: b), keeping short-circuit evaluation for
+        # non-tensor operands
+        self.generic_visit(node)
+        method_name = "logical_and" if isinstance(node.op, ast.And) else "logical_or"
+        ret = node.values[0]
+        for value in node.values[1:]:
+            rhs_fn = ast.Lambda(args=ast.arguments(posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
+                                body=value)
+            ret = ast.Call(func=ast.Name(id='_apply_bool_op', ctx=ast.Load()),
+                           args=[ast.Constant(value=method_name), ret, rhs_fn], keywords=[])
+        return ret
+
     def visit_Assign(self, node):
+        node.value = self.visit(node.value)
         names = []
         for target in node.targets:
             names += [self.visit(target)]
@@ -1263,6 +1628,14 @@ class ASTTransformer(ast.NodeTransformer):
         return node
 
 
+@functools.lru_cache()
+def _rewriter_key():
+    # Rewritten code depends on the transformations in this file, and marshal's format on the Python version
+    with open(__file__, "rb") as f:
+        rewriter_hash = hashlib.sha256(f.read()).hexdigest()
+    return f"{triton.__version__}-{rewriter_hash}-{importlib.util.MAGIC_NUMBER.hex()}"
+
+
 class FunctionRewriter:
     ast_transformer = ASTTransformer()
 
@@ -1290,8 +1663,24 @@ class FunctionRewriter:
         self.filename, self.def_file_lineno = self._get_jit_fn_file_line()
         self.def_lineno = self._find_def(lines)
         src = self._prepare_source(lines)
-        transformed_ast = self._transform_ast(src)
-        return self._compile_and_exec(transformed_ast)
+        return self._exec(self._get_code(src))
+
+    def _get_code(self, src):
+        from .cache import get_cache_manager
+
+        # Code objects embed the file name and line numbers, so they are part of the key as well
+        key = [_rewriter_key(), self.filename, str(self.def_file_lineno), src]
+        cache = get_cache_manager(hashlib.sha256("-".join(key).encode("utf-8")).hexdigest())
+        file_name = f"{self.fn.__name__[:150]}.interpreter.marshal"
+        data = cache.read_file(file_name)
+        if data is not None:
+            try:
+                return marshal.loads(data)
+            except (EOFError, ValueError, TypeError):
+                pass
+        compiled_code = compile(self._transform_ast(src), filename=self.filename, mode='exec')
+        cache.put(marshal.dumps(compiled_code), file_name, binary=True)
+        return compiled_code
 
     def _get_jit_fn_file_line(self):
         from .jit import get_jit_fn_file_line, JITFunction
@@ -1321,8 +1710,7 @@ class FunctionRewriter:
         ast.increment_lineno(transformed_ast, inc_lineno)
         return transformed_ast
 
-    def _compile_and_exec(self, transformed_ast):
-        compiled_code = compile(transformed_ast, filename=self.filename, mode='exec')
+    def _exec(self, compiled_code):
         local_namespace = {**self.kwargs}
         fn_globals = self.fn.__globals__
         for key, value in globals().items():
@@ -1368,5 +1756,7 @@ class InterpretedFunction:
         fn = self.rewrite()
         try:
             return fn(*args, **kwargs)
+        except (_DivergentControlFlow, _NotVectorizable):
+            raise
         except Exception as e:
             raise InterpreterError(repr(e)) from e
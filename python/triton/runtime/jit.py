@@ -6,10 +6,12 @@ import itertools
 import os
 import re
 import textwrap
+import threading
 from collections import defaultdict
 from functools import cached_property
 from typing import Callable, Generic, Iterable, Optional, TypeVar, Union, overload, Dict, Any, Tuple
 from ..runtime.driver import driver
+from . import stats
 from types import ModuleType
 from .._utils import find_paths_if, get_iterable_path
 
@@ -381,20 +383,60 @@ def serialize_specialization_data(name, signature, constants, attrs, options, ke
     return serialized_obj
 
 
-def create_function_from_signature(sig, kparams, backend):
+def deserialize_specialization_data(specialization_data):
+    """
+    Inverse of `serialize_specialization_data`. Returns the name, signature,
+    constants, attributes, options (as a dict) and cache key of the kernel.
+    """
+    import json
+    import triton.language as tl
+    deserialized_obj = json.loads(specialization_data)
+    constant_keys = map(tuple, deserialized_obj['constant_keys'])
+    constant_vals = deserialized_obj['constant_vals']
+    constants = {
+        key: tl.dtype(value) if tl.dtype.is_dtype(value) else value
+        for key, value in zip(constant_keys, constant_vals)
+    }
+    attrs_keys = map(tuple, deserialized_obj['attrs_keys'])
+    attrs_vals = deserialized_obj['attrs_vals']
+    attrs = dict(zip(attrs_keys, attrs_vals))
+    signature = dict(deserialized_obj['signature'].items())
+    options = {
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in deserialized_obj['options'].items()
+    }
+    return deserialized_obj['name'], signature, constants, attrs, options, deserialized_obj['key']
+
+
+# Constexprs of these types are never memoized: equal floats may produce
+# different kernels (`0.0` and `-0.0`), NaN never compares equal to itself,
+# and tuples compare their items without their types (`(1,)` and `(True,)`).
+_unmemoized_types = frozenset({float, tuple})
+
+
+def create_function_from_signature(sig, kparams, backend, debug=None):
     """
     Equivalent to sig.bind followed by apply_defaults. This generates a
     native Python function (using exec) which can be memoized on a per-kernel
     basis to avoid having to run these expensive functions -- which constitute
     much of the kernel launch overhead -- every time we run the kernel.
+
+    The generated function also resolves the `debug` option and returns the
+    kernel cache key. Formatting the key as a string is slow, so the string
+    is memoized on a tuple of the specialization, the types of the
+    constexprs and the options.
     """
     assert len(sig.parameters) == len(kparams)
     # Create the function argument list and the dict entries for the return statement
     specialization = []
+    # constexprs that compare equal (e.g., `1`, `1.0` and `True`) may still
+    # produce different kernels, so their types are part of the tuple key
+    constexpr_types = []
     # signature
     for name, kp in zip(sig.parameters.keys(), kparams):
         if kp.is_constexpr:
             specialization.append(f'("constexpr", {name})')
+            constexpr_types.append(f"type({name})")
         else:
             is_const = 'True' if kp.is_const else 'False'
             specialize = 'False' if kp.do_not_specialize else 'True'
@@ -420,7 +462,20 @@ def create_function_from_signature(sig, kparams, backend):
 def dynamic_func({", ".join(list(map(arg, sig.parameters.items())) + ["**options"])}):
     params = {{{', '.join([f"'{name}': {name}" for name in sig.parameters.keys()])}}}
     specialization = [{','.join(specialization)}]
-    return params, specialization, options
+    options["debug"] = options.get("debug", _jit_debug) or _env_debug
+    _constexpr_types = ({"".join(t + ", " for t in constexpr_types)})
+    if _unmemoized_types.isdisjoint(_constexpr_types):
+        _key_tuple = (*specialization, *_constexpr_types, *options.items())
+        try:
+            _key = _keys[_key_tuple]
+        except KeyError:
+            _key = _keys[_key_tuple] = str(specialization) + str(options)
+        except TypeError:
+            # unhashable constexpr or option value
+            _key = str(specialization) + str(options)
+    else:
+        _key = str(specialization) + str(options)
+    return params, specialization, options, _key
 """
     # Prepare defaults to be inserted into function namespace
     func_namespace = {
@@ -431,6 +486,10 @@ def dynamic_func({", ".join(list(map(arg, sig.parameters.items())) + ["**options
 
     func_namespace["JITFunction"] = JITFunction
     func_namespace["specialize_impl"] = create_specialize_impl(backend.get_arg_specialization)
+    func_namespace["_jit_debug"] = debug
+    func_namespace["_env_debug"] = os.environ.get("TRITON_DEBUG", "0") == "1"
+    func_namespace["_keys"] = {}
+    func_namespace["_unmemoized_types"] = _unmemoized_types
 
     # Execute the function string in func_namespace to create the function
     exec(func_body, func_namespace)
@@ -558,12 +617,10 @@ class JITFunction(KernelInterface[T]):
         self.CompiledKernel = CompiledKernel
         self.compile = compile
         self.ASTSource = ASTSource
-        binder = create_function_from_signature(self.signature, self.params, backend)
+        binder = create_function_from_signature(self.signature, self.params, backend, self.debug)
         return {}, target, backend, binder
 
     def run(self, *args, grid, warmup, **kwargs):
-        kwargs["debug"] = kwargs.get("debug", self.debug) or os.environ.get("TRITON_DEBUG", "0") == "1"
-
         # parse options
         device = driver.active.get_current_device()
         stream = driver.active.get_current_stream(device)
@@ -573,46 +630,41 @@ class JITFunction(KernelInterface[T]):
             hook(*args, **kwargs)
 
         kernel_cache, target, backend, binder = self.device_caches[device]
-        bound_args, specialization, options = binder(*args, **kwargs)
-
-        # compute cache key
-        key = str(specialization) + str(options)
+        bound_args, specialization, options, key = binder(*args, **kwargs)
         kernel = kernel_cache.get(key, None)
+        if stats.enabled:
+            stats.increment("cache_hits" if kernel is not None else "cache_misses", tier="memory")
+
+        # Kernel is being compiled in the background; use its fallback.
+        if kernel is None and self.async_compile and not warmup:
+            kernel = self._get_pending_compile(device, key)
 
         # Kernel is not cached; we have to compile.
         if kernel is None:
-            # options
-            options = backend.parse_options(kwargs)
-            # signature
-            sigkeys = [x.name for x in self.params]
-            sigvals = [x[0] for x in specialization]
-            signature = {k: v for (k, v) in zip(sigkeys, sigvals)}
-            # check arguments
-            assert "device_type" not in kwargs, "device_type option is deprecated; current target will be used"
-            assert "device" not in kwargs, "device option is deprecated; current device will be used"
-            assert "stream" not in kwargs, "stream option is deprecated; current stream will be used"
-            for k in kwargs:
-                if k not in options.__dict__ and k not in sigkeys:
-                    raise KeyError("Keyword argument %s was specified but unrecognised" % k)
-            # constexprs
-            constexprs = find_paths_if(sigvals, lambda _, val: val == "constexpr")
-            constexprs = {path: get_iterable_path(list(bound_args.values()), path) for path in constexprs}
-            # attributes
-            attrvals = [x[1] for x in specialization]
-            attrs = find_paths_if(attrvals, lambda _, x: isinstance(x, str))
-            attrs = {k: backend.parse_attr(get_iterable_path(attrvals, k)) for k in attrs}
+            # `_specialize` adds to the options, which the fallback is called with as they were passed
+            signature, constexprs, attrs, options = self._specialize(backend, bound_args, specialization, options,
+                                                                     dict(kwargs))
             if self._call_hook(key, signature, device, constexprs, options, [attrs], warmup, before=True):
                 return None
             # compile the kernel
             src = self.ASTSource(self, signature, constexprs, attrs)
-            kernel = self.compile(src, target=target, options=options.__dict__)
-            kernel_cache[key] = kernel
-            self._call_hook(key, signature, device, constexprs, options, [attrs], warmup, before=False)
+            variant_key = (device, str(signature), str(constexprs), str(options))
+            if self.async_compile and not warmup:
+                kernel = self._compile_in_background(device, key, src, target, options, variant_key)
+            if kernel is None:
+                kernel = self.compile(src, target=target, options=options.__dict__)
+                self._add_kernel(device, key, kernel, src, options, variant_key, warmup)
+
+        if kernel is self.fallback:
+            # the user-supplied implementation stands in until the kernel is compiled
+            self.fallback(*args, grid=grid, **kwargs)
+            return None
 
-        # Check that used global values have not changed.
+        # Check that used global values have not changed. Globals are almost
+        # never rebound, so compare identities before falling back to `!=`.
         not_present = object()
         for (name, _), (val, globals_dict) in self.used_global_vals.items():
-            if (newVal := globals_dict.get(name, not_present)) != val:
+            if (newVal := globals_dict.get(name, not_present)) is not val and newVal != val:
                 raise RuntimeError(
                     f"Global variable {name} has changed since we compiled this kernel, from {val} to {newVal}")
 
@@ -626,17 +678,128 @@ class JITFunction(KernelInterface[T]):
             grid_1 = grid[1] if grid_size > 1 else 1
             grid_2 = grid[2] if grid_size > 2 else 1
             # launch kernel
-            launch_metadata = kernel.launch_metadata(grid, stream, *bound_args.values())
-            kernel.run(grid_0, grid_1, grid_2, stream, kernel.function, kernel.packed_metadata,
-                       launch_metadata, self.CompiledKernel.launch_enter_hook, self.CompiledKernel.launch_exit_hook,
-                       *bound_args.values())
+            launch_enter_hook = self.CompiledKernel.launch_enter_hook
+            launch_metadata = None
+            if launch_enter_hook is not None:
+                launch_metadata = kernel.launch_metadata(grid, stream, *bound_args.values())
+            kernel.run(grid_0, grid_1, grid_2, stream, kernel.function, kernel.packed_metadata, launch_metadata,
+                       launch_enter_hook, self.CompiledKernel.launch_exit_hook, *bound_args.values())
         return kernel
 
+    def _specialize(self, backend, bound_args, specialization, options, kwargs):
+        # options
+        kwargs["debug"] = options["debug"]
+        options = backend.parse_options(kwargs)
+        # signature
+        sigkeys = [x.name for x in self.params]
+        sigvals = [x[0] for x in specialization]
+        signature = {k: v for (k, v) in zip(sigkeys, sigvals)}
+        # check arguments
+        assert "device_type" not in kwargs, "device_type option is deprecated; current target will be used"
+        assert "device" not in kwargs, "device option is deprecated; current device will be used"
+        assert "stream" not in kwargs, "stream option is deprecated; current stream will be used"
+        for k in kwargs:
+            if k not in options.__dict__ and k not in sigkeys:
+                raise KeyError("Keyword argument %s was specified but unrecognised" % k)
+        # constexprs
+        constexprs = find_paths_if(sigvals, lambda _, val: val == "constexpr")
+        constexprs = {path: get_iterable_path(list(bound_args.values()), path) for path in constexprs}
+        # attributes
+        attrvals = [x[1] for x in specialization]
+        attrs = find_paths_if(attrvals, lambda _, x: isinstance(x, str))
+        attrs = {k: backend.parse_attr(get_iterable_path(attrvals, k)) for k in attrs}
+        return signature, constexprs, attrs, options
+
+    def compile_job(self, *args, **kwargs):
+        """
+        Returns the job compiling the kernel that `run` would launch with
+        `args` and `kwargs`, as taken by `triton.compiler.compile_async`, or
+        None if the kernel already is compiled for the current device.
+        """
+        device = driver.active.get_current_device()
+        kernel_cache, target, backend, binder = self.device_caches[device]
+        bound_args, specialization, options, key = binder(*args, **kwargs)
+        if key in kernel_cache:
+            return None
+        signature, constexprs, attrs, options = self._specialize(backend, bound_args, specialization, options, kwargs)
+        return self, signature, constexprs, options.__dict__, attrs
+
+    def add_compiled_kernel(self, kernel, *args, **kwargs):
+        """
+        Adds `kernel`, compiled from the job that `compile_job` returned for
+        `args` and `kwargs`, to the kernels of the current device, so that
+        `run` launches it without compiling it again.
+        """
+        device = driver.active.get_current_device()
+        kernel_cache, target, backend, binder = self.device_caches[device]
+        bound_args, specialization, options, key = binder(*args, **kwargs)
+        if key in kernel_cache:
+            return
+        signature, constexprs, attrs, options = self._specialize(backend, bound_args, specialization, options, kwargs)
+        if self._call_hook(key, signature, device, constexprs, options, [attrs], False, before=True):
+            return
+        variant_key = (device, str(signature), str(constexprs), str(options))
+        self._add_kernel(device, key, kernel, kernel.src, options, variant_key, False)
+
+    def _add_kernel(self, device, key, kernel, src, options, variant_key, warmup):
+        # kernels compiled in the background are added from another thread
+        with self._kernels_lock:
+            self.device_caches[device][0][key] = kernel
+            if self.async_compile:
+                self.variants[variant_key].append((src.attrs, kernel))
+            self._call_hook(key, src.signature, device, src.constants, options, [src.attrs], warmup, before=False)
+
+    def _find_variant(self, variant_key, attrs):
+        """
+        Returns the most specialized compiled kernel of `variant_key` that
+        only relies on attributes in `attrs`, if any.
+        """
+        best, best_num_attrs = None, -1
+        with self._kernels_lock:
+            variants = list(self.variants.get(variant_key, ()))
+        for kernel_attrs, kernel in variants:
+            if not all(attr in attrs.get(path, ()) for path, vals in kernel_attrs.items() for attr in vals):
+                continue
+            num_attrs = sum(len(vals) for vals in kernel_attrs.values())
+            if num_attrs > best_num_attrs:
+                best, best_num_attrs = kernel, num_attrs
+        return best
+
+    def _compile_in_background(self, device, key, src, target, options, variant_key):
+        fallback = self._find_variant(variant_key, src.attrs) or self.fallback
+        if fallback is None:
+            return None
+        from ..compiler import compile_async
+        [future] = compile_async([(self, src.signature, src.constants, options.__dict__, src.attrs)], target=target)
+        with self._kernels_lock:
+            self.pending_compiles[(device, key)] = (future, fallback)
+
+        def on_done(future):
+            if future.exception() is None:
+                with self._kernels_lock:
+                    self._add_kernel(device, key, future.result(), src, options, variant_key, False)
+                    self.pending_compiles.pop((device, key), None)
+
+        future.add_done_callback(on_done)
+        return fallback
+
+    def _get_pending_compile(self, device, key):
+        pending = self.pending_compiles.get((device, key))
+        if pending is None:
+            return None
+        future, fallback = pending
+        if not future.done():
+            return fallback
+        with self._kernels_lock:
+            self.pending_compiles.pop((device, key), None)
+        # raises if the compilation failed
+        return future.result()
+
     def repr(self, _):
         return self._fn_name if self._repr is None else self._repr(_)
 
     def __init__(self, fn, version=None, do_not_specialize=None, do_not_specialize_on_alignment=None, debug=None,
-                 noinline=None, repr=None, launch_metadata=None):
+                 noinline=None, repr=None, launch_metadata=None, async_compile=False, fallback=None):
         do_not_specialize = do_not_specialize if do_not_specialize else []
         do_not_specialize_on_alignment = do_not_specialize_on_alignment if do_not_specialize_on_alignment else []
 
@@ -682,6 +845,21 @@ class JITFunction(KernelInterface[T]):
         self.debug = debug
         self.noinline = noinline
 
+        # With `async_compile`, kernels missing from the cache are compiled in
+        # the background while a fallback runs in their place: the most
+        # specialized compiled variant that is valid for the arguments (e.g.,
+        # one compiled without divisibility hints), or else `fallback`, a
+        # Python function called as `fallback(*args, grid=grid, **kwargs)`
+        # with the arguments, grid and launch options of the launch.
+        self.async_compile = async_compile
+        self.fallback = fallback
+        # (device, signature, constexprs, options) -> [(attrs, kernel)]
+        self.variants = defaultdict(list)
+        # (device, key) -> (future, fallback)
+        self.pending_compiles = {}
+        # guards the kernels and variants published by background compilations
+        self._kernels_lock = threading.RLock()
+
         # TODO(jlebar): Remove uses of these fields outside this file, then
         # remove the fields here.
         self.arg_names = [p.name for p in self.params]
@@ -711,31 +889,14 @@ class JITFunction(KernelInterface[T]):
 
     def preload(self, specialization_data):
         from ..compiler import compile, ASTSource
-        import json
-        import triton.language as tl
         device = driver.active.get_current_device()
-        deserialized_obj = json.loads(specialization_data)
-        if deserialized_obj['name'] != self.fn.__name__:
-            raise RuntimeError(
-                f"Specialization data is for {deserialized_obj['name']} but trying to preload for {self.fn.__name__}")
-        constant_keys = map(tuple, deserialized_obj['constant_keys'])
-        constant_vals = deserialized_obj['constant_vals']
-        constants = {
-            key: tl.dtype(value) if tl.dtype.is_dtype(value) else value
-            for key, value in zip(constant_keys, constant_vals)
-        }
-        attrs_keys = map(tuple, deserialized_obj['attrs_keys'])
-        attrs_vals = deserialized_obj['attrs_vals']
-        attrs = dict(zip(attrs_keys, attrs_vals))
-        signature = dict(deserialized_obj['signature'].items())
+        name, signature, constants, attrs, options, key = deserialize_specialization_data(specialization_data)
+        if name != self.fn.__name__:
+            raise RuntimeError(f"Specialization data is for {name} but trying to preload for {self.fn.__name__}")
         src = ASTSource(self, signature, constants, attrs)
-        options = {
-            key: tuple(value) if isinstance(value, list) else value
-            for key, value in deserialized_obj['options'].items()
-        }
-        key = deserialized_obj['key']
         kernel = compile(src, None, options)
-        self.device_caches[device][0][key] = kernel
+        with self._kernels_lock:
+            self.device_caches[device][0][key] = kernel
         return kernel
 
     # we do not parse `src` in the constructor because
@@ -791,6 +952,8 @@ def jit(
     do_not_specialize_on_alignment: Optional[Iterable[int | str]] = None,
     debug: Optional[bool] = None,
     noinline: Optional[bool] = None,
+    async_compile: bool = False,
+    fallback: Optional[Callable] = None,
 ) -> Callable[[T], JITFunction[T]]:
     ...
 
@@ -805,6 +968,8 @@ def jit(
     do_not_specialize_on_alignment: Optional[Iterable[int | str]] = None,
     debug: Optional[bool] = None,
     noinline: Optional[bool] = None,
+    async_compile: bool = False,
+    fallback: Optional[Callable] = None,
 ) -> Union[JITFunction[T], Callable[[T], JITFunction[T]]]:
     """
     Decorator for JIT-compiling a function using the Triton compiler.
@@ -822,6 +987,14 @@ def jit(
 
     :param fn: the function to be jit-compiled
     :type fn: Callable
+    :param async_compile: if True, kernels that are not in the cache yet are compiled in the background. Until they
+        are ready, launches run an already compiled, less specialized variant of the kernel or, if there is none,
+        :code:`fallback`. Launches compile synchronously when neither is available.
+    :type async_compile: bool
+    :param fallback: a Python function called in place of the kernel while it is compiled in the background, with
+        the arguments of the launch, its grid and its launch options (e.g., :code:`num_warps`), as
+        :code:`fallback(*args, grid=grid, **kwargs)`.
+    :type fallback: Callable
     """
 
     def decorator(fn: T) -> JITFunction[T]:
@@ -841,6 +1014,8 @@ def jit(
                 noinline=noinline,
                 repr=repr,
                 launch_metadata=launch_metadata,
+                async_compile=async_compile,
+                fallback=fallback,
             )
 
     if fn is not None:
@@ -0,0 +1,133 @@
+"""
+Counters and histograms describing how kernels are found or compiled:
+hits and misses of each cache tier ("memory" for the kernels held by JIT
+functions, "disk" for the local cache directory, "remote" for a remote
+cache backend), compilations, the duration of each compilation stage, and
+the bytes read from, written to and deduplicated by each tier.
+
+Recording is disabled by default; enable it with `TRITON_STATS=1` or
+`enable()`. The recorded values are returned by `snapshot()` or, in the
+Prometheus text format, by `to_prometheus()`:
+
+    triton.runtime.stats.enable()
+    ...
+    print(triton.runtime.stats.to_prometheus())
+"""
+
+import bisect
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+enabled = os.environ.get("TRITON_STATS", "0") == "1"
+
+# upper bounds, in seconds, of the buckets of duration histograms
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+_HELP = {
+    "cache_hits": "Kernels found in a cache tier",
+    "cache_misses": "Kernels not found in a cache tier",
+    "cache_bytes_read": "Bytes read from a cache tier",
+    "cache_bytes_written": "Bytes written to a cache tier",
+    "cache_bytes_deduplicated": "Bytes not written to a cache tier as they were already stored",
+    "compilations": "Kernels compiled",
+    "compile_stage_seconds": "Duration of the stages of the compilation pipeline",
+}
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, tuple], float] = defaultdict(int)
+# (name, labels) -> [count per bucket, count, sum]
+_histograms: Dict[Tuple[str, tuple], list] = {}
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def increment(name, value=1, **labels):
+    """Adds `value` to the counter `name` with `labels`, if recording is enabled."""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name, tuple(sorted(labels.items()))] += value
+
+
+def observe(name, value, **labels):
+    """Records `value` in the duration histogram `name` with `labels`, if recording is enabled."""
+    if not enabled:
+        return
+    with _lock:
+        histogram = _histograms.setdefault((name, tuple(sorted(labels.items()))), [[0] * len(DURATION_BUCKETS), 0, 0.0])
+        bucket = bisect.bisect_left(DURATION_BUCKETS, value)
+        if bucket < len(DURATION_BUCKETS):
+            histogram[0][bucket] += 1
+        histogram[1] += 1
+        histogram[2] += value
+
+
+def _format_labels(labels):
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def snapshot():
+    """
+    Returns the recorded values as `{"counters": {name: {labels: value}},
+    "histograms": {name: {labels: {"count", "sum", "buckets"}}}}`, where
+    labels are formatted as "key=value,..." and `buckets` maps the upper
+    bound of each bucket to the number of values at most that large.
+    """
+    counters = defaultdict(dict)
+    histograms = defaultdict(dict)
+    with _lock:
+        for (name, labels), value in _counters.items():
+            counters[name][_format_labels(labels)] = value
+        for (name, labels), (bucket_counts, count, total) in _histograms.items():
+            cumulative, buckets = 0, {}
+            for bound, bucket_count in zip(DURATION_BUCKETS, bucket_counts):
+                cumulative += bucket_count
+                buckets[bound] = cumulative
+            histograms[name][_format_labels(labels)] = {"count": count, "sum": total, "buckets": buckets}
+    return {"counters": dict(counters), "histograms": dict(histograms)}
+
+
+def to_prometheus(prefix="triton_"):
+    """Returns the recorded values in the Prometheus text exposition format."""
+
+    def labels_text(labels, **extra):
+        labels = [f'{k}="{v}"' for k, v in (*labels, *extra.items())]
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(_histograms.items())
+    for i, ((name, labels), value) in enumerate(counters):
+        metric = f"{prefix}{name}_total"
+        if i == 0 or counters[i - 1][0][0] != name:
+            lines += [f"# HELP {metric} {_HELP.get(name, name)}", f"# TYPE {metric} counter"]
+        lines.append(f"{metric}{labels_text(labels)} {value}")
+    for i, ((name, labels), (bucket_counts, count, total)) in enumerate(histograms):
+        metric = f"{prefix}{name}"
+        if i == 0 or histograms[i - 1][0][0] != name:
+            lines += [f"# HELP {metric} {_HELP.get(name, name)}", f"# TYPE {metric} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(DURATION_BUCKETS, bucket_counts):
+            cumulative += bucket_count
+            lines.append(f"{metric}_bucket{labels_text(labels, le=bound)} {cumulative}")
+        lines.append(f"{metric}_bucket{labels_text(labels, le='+Inf')} {count}")
+        lines.append(f"{metric}_sum{labels_text(labels)} {total}")
+        lines.append(f"{metric}_count{labels_text(labels)} {count}")
+    return "\n".join(lines) + "\n"
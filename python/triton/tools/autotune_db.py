@@ -0,0 +1,37 @@
+"""
+Merges and inspects autotuning databases (see `triton.runtime.autotune_db`).
+
+    python -m triton.tools.autotune_db merge shipped/ tuned-a100/ tuned-h100/
+    python -m triton.tools.autotune_db show shipped/
+"""
+
+import json
+import os
+from argparse import ArgumentParser
+
+from triton.runtime.autotune_db import merge
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Merge and inspect autotuning databases")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser(
+        "merge", help="Merge databases into the first one, keeping the fastest config of each key")
+    merge_parser.add_argument("dest", type=str, help="Database to merge into, created if needed")
+    merge_parser.add_argument("sources", type=str, nargs="+", help="Databases to merge")
+    show_parser = subparsers.add_parser("show", help="List the entries of a database")
+    show_parser.add_argument("db", type=str, help="Database directory")
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        num_entries = merge(args.dest, args.sources)
+        print(f"{args.dest} has {num_entries} entries")
+    else:
+        for filename in sorted(os.listdir(args.db)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(args.db, filename)) as f:
+                data = json.load(f)
+            print(data["kernel"])
+            for entry in data["entries"]:
+                config = ", ".join(f"{k}={v}" for k, v in {**entry["config"].pop("kwargs"), **entry["config"]}.items())
+                print(f"  {entry['arch']:<12} {str(tuple(entry['key'])):<32} {config}")
@@ -0,0 +1,228 @@
+"""
+Kernel bundles: a single archive holding compiled kernels and the data
+needed to preload them, so that a fresh process (or machine) can skip
+compilation entirely.
+
+    # in the process that compiled the kernels
+    export_bundle("kernels.zip")
+    # at startup, after the modules defining the kernels have been imported
+    load_bundle("kernels.zip")
+
+A bundle is a zip file with an `index.json` entry listing the bundled
+kernels and, for each kernel, the files of its cache group stored under
+`<cache key>/<file name>`. Files are stored uncompressed, whatever the
+cache compression (and deduplication) of the exporting process, and are
+compressed again as configured when the bundle is loaded.
+"""
+
+import base64
+import binascii
+import gc
+import importlib
+import json
+import os
+import sys
+import zipfile
+from argparse import ArgumentParser
+from pathlib import Path
+
+import triton
+from triton.runtime.cache import PackedFile, _get_pack_store, decompress, get_cache_dir, get_cache_manager
+
+BUNDLE_VERSION = 1
+INDEX_NAME = "index.json"
+GROUP_PREFIX = "__grp__"
+# the cache managers whose cache directories `export_bundle` can read
+_CACHE_DIR_MANAGERS = {
+    "triton.runtime.cache:FileCacheManager",
+    "triton.runtime.cache:PackedCacheManager",
+    # files are materialized in the layout of `FileCacheManager`
+    "triton.runtime.cache:RemoteCacheManager",
+}
+
+
+def _unwrap(fn):
+    from triton.runtime.jit import JITFunction
+    while not isinstance(fn, JITFunction):
+        fn = fn.fn
+    return fn
+
+
+def _jit_functions():
+    from triton.runtime.jit import JITFunction
+    return [obj for obj in gc.get_objects() if isinstance(obj, JITFunction)]
+
+
+def _specialization_data(fn, key, kernel):
+    from triton.compiler import make_backend
+    from triton.runtime.jit import serialize_specialization_data
+    src = kernel.src
+    options = make_backend(kernel.metadata.target).parse_options(kernel.metadata._asdict())
+    return serialize_specialization_data(fn.fn.__name__, src.signature, src.constants, src.attrs, options, key)
+
+
+def _read_group(cache, group):
+    # the contents of the files of `group`, read through the cache manager
+    names = cache.get_group(group)
+    if not names:
+        return None
+    files = {}
+    for name in names:
+        data = cache.read_file(name)
+        if data is None:
+            return None
+        files[name] = data
+    return files
+
+
+def _kernel_entries(kernels):
+    for fn in kernels:
+        fn = _unwrap(fn)
+        qualname = fn.fn.__qualname__
+        # kernels defined in a local scope can't be looked up again by name
+        preloadable = "<locals>" not in qualname
+        for kernel_cache, *_ in list(fn.device_caches.values()):
+            for key, kernel in list(kernel_cache.items()):
+                group = f"{kernel.src.name[:150]}.json"
+                files = _read_group(get_cache_manager(kernel.hash), group)
+                if files is None:
+                    continue
+                entry = {"hash": kernel.hash, "group": group, "files": files}
+                if preloadable:
+                    entry["module"] = fn.fn.__module__
+                    entry["qualname"] = qualname
+                    entry["specialization_data"] = _specialization_data(fn, key, kernel)
+                yield entry
+
+
+def _cache_key(dirname):
+    # inverse of the base32 encoding applied by `get_cache_manager`
+    try:
+        return base64.b32decode(dirname + "=" * (-len(dirname) % 8)).hex()
+    except binascii.Error:
+        return None
+
+
+def _cache_dir_entries(cache_dir):
+    # entries of `FileCacheManager`: a directory per key (hard links to deduplicated files are read as any file)
+    for key_dir in sorted(Path(cache_dir).iterdir()):
+        key = _cache_key(key_dir.name)
+        if key is None or not key_dir.is_dir():
+            continue
+        for grp_path in sorted(key_dir.glob(f"{GROUP_PREFIX}*")):
+            child_paths = json.loads(grp_path.read_text()).get("child_paths")
+            if not child_paths or not all(os.path.exists(p) for p in child_paths.values()):
+                continue
+            files = {name: decompress(Path(p).read_bytes()) for name, p in child_paths.items()}
+            yield {"hash": key, "group": grp_path.name[len(GROUP_PREFIX):], "files": files}
+    # entries of `PackedCacheManager`: a single pack
+    if not os.path.exists(os.path.join(cache_dir, "cache.index")):
+        return
+    store = _get_pack_store(str(cache_dir))
+    for packed_key, grp_filename in store.groups():
+        key = _cache_key(packed_key)
+        child_names = json.loads(store.get(packed_key, grp_filename)[grp_filename]).get("child_paths")
+        if key is None or not child_names:
+            continue
+        try:
+            files = {name: decompress(PackedFile(store, packed_key, name).read()) for name in child_names}
+        except FileNotFoundError:
+            continue
+        yield {"hash": key, "group": grp_filename[len(GROUP_PREFIX):], "files": files}
+
+
+def export_bundle(path, kernels=None, cache_dir=None):
+    """
+    Packs compiled kernels into the bundle at `path` and returns how many
+    were bundled.
+
+    Every kernel compiled so far by the JIT functions in `kernels` (all live
+    JIT functions if None) is bundled together with its specialization data,
+    so that `load_bundle` can preload it. If `cache_dir` is given, the other
+    kernels found in that cache directory are bundled as well; these are
+    only restored to the cache on load. Cache directories can only be read
+    with the cache managers of Triton (see `TRITON_CACHE_MANAGER`).
+    """
+    cache_manager = os.environ.get("TRITON_CACHE_MANAGER", "triton.runtime.cache:FileCacheManager")
+    if cache_dir is not None and cache_manager not in _CACHE_DIR_MANAGERS:
+        raise RuntimeError(f"Can't bundle the cache directory of {cache_manager}; bundle its kernels with `kernels`")
+    entries = {}
+    for entry in _kernel_entries(_jit_functions() if kernels is None else kernels):
+        entries.setdefault((entry["hash"], entry["group"]), entry)
+    if cache_dir is not None:
+        for entry in _cache_dir_entries(cache_dir):
+            entries.setdefault((entry["hash"], entry["group"]), entry)
+
+    index = []
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for entry in entries.values():
+            files = entry.pop("files")
+            for name, data in files.items():
+                bundle.writestr(f"{entry['hash']}/{name}", data)
+            index.append({**entry, "files": sorted(files)})
+        bundle.writestr(INDEX_NAME,
+                        json.dumps({"version": BUNDLE_VERSION, "triton": triton.__version__, "kernels": index}))
+    return len(index)
+
+
+def read_index(path):
+    with zipfile.ZipFile(path) as bundle:
+        index = json.loads(bundle.read(INDEX_NAME))
+    if index["version"] != BUNDLE_VERSION:
+        raise RuntimeError(f"Unsupported kernel bundle version {index['version']} in {path}")
+    return index
+
+
+def _lookup(module, qualname):
+    obj = importlib.import_module(module)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return _unwrap(obj)
+
+
+def load_bundle(path, preload=True):
+    """
+    Restores the kernels of the bundle at `path` to the cache and, unless
+    `preload` is False, preloads those that were exported from a JIT function
+    so that their first launch doesn't need to look them up or compile them.
+    Returns the preloaded kernels.
+
+    The modules defining the kernels are imported if they aren't already.
+    """
+    index = read_index(path)
+    kernels = []
+    with zipfile.ZipFile(path) as bundle:
+        for entry in index["kernels"]:
+            cache = get_cache_manager(entry["hash"])
+            if not cache.get_group(entry["group"]):
+                group = {name: cache.put(bundle.read(f"{entry['hash']}/{name}"), name) for name in entry["files"]}
+                cache.put_group(entry["group"], group)
+            if preload and "specialization_data" in entry:
+                fn = _lookup(entry["module"], entry["qualname"])
+                kernels.append(fn.preload(entry["specialization_data"]))
+    return kernels
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Export or restore bundles of compiled Triton kernels")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Bundle every kernel of a cache directory")
+    export_parser.add_argument("bundle", type=Path, help="Path of the bundle to write")
+    export_parser.add_argument("--cache-dir", type=Path, default=None,
+                               help="Cache directory to bundle (default: TRITON_CACHE_DIR or ~/.triton/cache)")
+    load_parser = subparsers.add_parser("load", help="Restore the kernels of a bundle to the cache directory")
+    load_parser.add_argument("bundle", type=Path, help="Path of the bundle to read")
+    list_parser = subparsers.add_parser("list", help="List the kernels of a bundle")
+    list_parser.add_argument("bundle", type=Path, help="Path of the bundle to read")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        cache_dir = args.cache_dir or get_cache_dir()
+        print(f"Bundled {export_bundle(args.bundle, cache_dir=cache_dir)} kernels into {args.bundle}")
+    elif args.command == "load":
+        load_bundle(args.bundle, preload=False)
+        print(f"Restored {len(read_index(args.bundle)['kernels'])} kernels from {args.bundle}")
+    else:
+        for entry in read_index(args.bundle)["kernels"]:
+            name = f"{entry['module']}.{entry['qualname']}" if "module" in entry else entry["group"][:-len(".json")]
+            sys.stdout.write(f"{entry['hash']}  {name}\n")
@@ -0,0 +1,155 @@
+"""
+Reports the disk usage of the Triton cache directory, prunes it, measures
+how much compressing it would save and deduplicates its files.
+
+    python -m triton.tools.cache usage
+    python -m triton.tools.cache prune --max-size 10G --max-age 604800
+    python -m triton.tools.cache compression
+    python -m triton.tools.cache dedup --dry-run
+"""
+
+import json
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+from collections import defaultdict
+from pathlib import Path
+
+from triton.runtime.cache import (FileCacheManager, _parse_size, decompress, deduplicate_cache, get_cache_budget,
+                                  get_cache_dir, get_cache_entries, prune_cache)
+
+
+def _format_size(size):
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if size < 1024:
+            break
+        size /= 1024
+    return f"{size:.1f} {unit}"
+
+
+def _format_age(seconds):
+    for unit, length in [("d", 86400), ("h", 3600), ("m", 60)]:
+        if seconds >= length:
+            return f"{seconds / length:.1f}{unit}"
+    return f"{seconds:.0f}s"
+
+
+def usage_by_name(cache_dir=None):
+    """
+    Returns `{name: (number of entries, total size, last access)}` for the
+    kernels (and other artifacts) of the cache directory.
+    """
+    usage = defaultdict(lambda: [0, 0, 0.0])
+    for entry in get_cache_entries(cache_dir):
+        for name in entry.names or ["<empty>"]:
+            stats = usage[name]
+            stats[0] += 1
+            stats[1] += entry.size // max(len(entry.names), 1)
+            stats[2] = max(stats[2], entry.last_access)
+    return {name: tuple(stats) for name, stats in usage.items()}
+
+
+def _read_groups(cache_dir):
+    # {(key, group): {file name: contents}} for every group of the cache directory
+    groups = {}
+    for entry in get_cache_entries(cache_dir):
+        key = os.path.basename(entry.path)
+        for grp_path in Path(entry.path).glob("__grp__*"):
+            child_paths = json.loads(grp_path.read_text()).get("child_paths") or {}
+            try:
+                files = {name: decompress(Path(path).read_bytes()) for name, path in child_paths.items()}
+            except FileNotFoundError:
+                continue
+            groups[key, grp_path.name[len("__grp__"):]] = files
+    return groups
+
+
+def benchmark_compression(cache_dir=None, codecs=("none", "zlib", "zstd"), repeat=5):
+    """
+    Stores the kernels of the cache directory again with each of `codecs` and
+    returns `{codec: (bytes stored, seconds to store everything, seconds per
+    cache hit)}`, where a cache hit looks the group of a kernel up and reads
+    all of its files.
+    """
+    groups = _read_groups(cache_dir or get_cache_dir())
+    results = {}
+    environ = dict(os.environ)
+    try:
+        for codec in codecs:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                os.environ.update({"TRITON_CACHE_DIR": tmpdir, "TRITON_CACHE_COMPRESSION": codec})
+                os.environ.pop("TRITON_CACHE_MAX_SIZE", None)
+                os.environ.pop("TRITON_CACHE_MAX_AGE", None)
+                start = time.perf_counter()
+                for (key, group), files in groups.items():
+                    cache = FileCacheManager(key)
+                    cache.put_group(group, {name: cache.put(data, name) for name, data in files.items()})
+                put_time = time.perf_counter() - start
+                size = sum(entry.size for entry in get_cache_entries(tmpdir))
+                best = float("inf")
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    for key, group in groups:
+                        for path in FileCacheManager(key).get_group(group).values():
+                            decompress(Path(path).read_bytes())
+                    best = min(best, time.perf_counter() - start)
+                results[codec] = (size, put_time, best / max(len(groups), 1))
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+    return results
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Inspect and prune the Triton cache directory")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help="Cache directory (default: TRITON_CACHE_DIR or ~/.triton/cache)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    usage_parser = subparsers.add_parser("usage", help="Report the disk usage per kernel name")
+    usage_parser.add_argument("--top", type=int, default=None, help="Only report the largest kernels")
+    prune_parser = subparsers.add_parser(
+        "prune", help="Evict the least recently used entries (default budget: TRITON_CACHE_MAX_SIZE and "
+        "TRITON_CACHE_MAX_AGE)")
+    prune_parser.add_argument("--max-size", type=str, default=None, help="Maximum total size, e.g. 512M or 20G")
+    prune_parser.add_argument("--max-age", type=float, default=None,
+                              help="Maximum time since the last use of an entry, in seconds")
+    compression_parser = subparsers.add_parser(
+        "compression", help="Measure the size and cache hit latency of the cache with each compression codec")
+    compression_parser.add_argument("--codecs", type=str, nargs="*", default=["none", "zlib", "zstd"],
+                                    help="Codecs to compare")
+    compression_parser.add_argument("--repeat", type=int, default=5,
+                                    help="Number of measurements; the best one is reported")
+    dedup_parser = subparsers.add_parser("dedup",
+                                         help="Store the files shared by several entries once (see TRITON_CACHE_DEDUP)")
+    dedup_parser.add_argument("--dry-run", action="store_true", help="Only report the savings")
+    args = parser.parse_args()
+
+    cache_dir = args.cache_dir or get_cache_dir()
+    if args.command == "usage":
+        usage = sorted(usage_by_name(cache_dir).items(), key=lambda item: item[1][1], reverse=True)
+        now = time.time()
+        print(f"{'name':<48} {'entries':>8} {'size':>12} {'last used':>10}")
+        for name, (num_entries, size, last_access) in usage[:args.top]:
+            print(f"{name[:48]:<48} {num_entries:>8} {_format_size(size):>12} {_format_age(now - last_access):>10}")
+        total = sum(size for _, (_, size, _) in usage)
+        print(f"{len(usage)} kernels, {_format_size(total)} in {cache_dir}")
+    elif args.command == "compression":
+        results = benchmark_compression(cache_dir, args.codecs, args.repeat)
+        baseline = results[args.codecs[0]][0]
+        print(f"{'codec':<8} {'size':>12} {'ratio':>7} {'store':>10} {'hit':>12}")
+        for codec, (size, put_time, hit_time) in results.items():
+            print(f"{codec:<8} {_format_size(size):>12} {baseline / max(size, 1):>6.2f}x {put_time * 1e3:>8.1f}ms "
+                  f"{hit_time * 1e6:>10.1f}us")
+    elif args.command == "dedup":
+        num_files, saved = deduplicate_cache(cache_dir, args.dry_run)
+        action = "Would deduplicate" if args.dry_run else "Deduplicated"
+        print(f"{action} {num_files} files ({_format_size(saved)}) in {cache_dir}")
+    else:
+        max_size, max_age = get_cache_budget()
+        max_size = _parse_size(args.max_size) if args.max_size is not None else max_size
+        max_age = args.max_age if args.max_age is not None else max_age
+        if max_size is None and max_age is None:
+            parser.error("no budget given: pass --max-size/--max-age or set TRITON_CACHE_MAX_SIZE/TRITON_CACHE_MAX_AGE")
+        evicted = prune_cache(cache_dir, max_size, max_age)
+        print(f"Evicted {len(evicted)} entries ({_format_size(sum(entry.size for entry in evicted))}) from {cache_dir}")
@@ -0,0 +1,216 @@
+"""
+Measures the host-side overhead of launching Triton kernels.
+
+The active driver is replaced by a stub whose launcher does nothing, so the
+numbers only reflect the Python work done on every launch (argument binding,
+specialization, cache lookup, autotuner/heuristics dispatch, etc.). Kernels
+are still compiled for the requested target, so the compiler toolchain must
+be available, but no GPU is needed.
+
+    python -m triton.tools.launch_overhead --json results.json
+"""
+
+import importlib.util
+import json
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+import triton
+import triton.language as tl
+from triton.backends.compiler import GPUTarget
+from triton.backends.driver import DriverBase
+from triton.runtime.driver import driver
+from triton.runtime.jit import MockTensor
+
+
+class StubLauncher:
+
+    def __init__(self, src, metadata):
+        pass
+
+    def __call__(self, *args):
+        pass
+
+
+class StubUtils:
+
+    def get_device_properties(self, device):
+        return {"max_shared_mem": 2**31, "multiprocessor_count": 1}
+
+    def load_binary(self, name, kernel, shared, device):
+        # (module, function, n_regs, n_spills)
+        return object(), 0, 0, 0
+
+
+class StubDriver(DriverBase):
+    """Driver that compiles for `target` but never touches a device."""
+
+    launcher_cls = StubLauncher
+
+    def __init__(self, target=None):
+        self.target = target or GPUTarget("cuda", 80, 32)
+        self.utils = StubUtils()
+
+    @classmethod
+    def is_active(cls):
+        return False
+
+    def get_current_target(self):
+        return self.target
+
+    def get_active_torch_device(self):
+        raise NotImplementedError("the stub driver has no torch device")
+
+    def get_benchmarker(self):
+
+        def do_bench(kernel_call, quantiles=None):
+            kernel_call()
+            return [1.0, 1.0, 1.0] if quantiles else 1.0
+
+        return do_bench
+
+    def get_current_device(self):
+        return 0
+
+    def get_current_stream(self, device=None):
+        return 0
+
+
+def _kernels_src():
+    # Kernels must live in a file for `inspect.getsource` to find them.
+    ptrs = lambda n: ", ".join(f"p{i}" for i in range(n))
+    return f"""
+import triton
+import triton.language as tl
+
+
+@triton.jit
+def args_1({ptrs(1)}):
+    pass
+
+
+@triton.jit
+def args_10({ptrs(10)}):
+    pass
+
+
+@triton.jit
+def args_50({ptrs(50)}):
+    pass
+
+
+@triton.jit
+def tuple_args(ptrs, sizes):
+    pass
+
+
+@triton.jit
+def constexpr_args(X, N, BLOCK_M: tl.constexpr, BLOCK_N: tl.constexpr, ACTIVATION: tl.constexpr):
+    pass
+
+
+@triton.autotune(configs=[triton.Config({{"BLOCK": 64}}), triton.Config({{"BLOCK": 128}})], key=["N"])
+@triton.jit
+def autotuned(X, Y, N, BLOCK: tl.constexpr):
+    pass
+
+
+@triton.heuristics({{"BLOCK": lambda args: triton.next_power_of_2(args["N"])}})
+@triton.jit
+def heuristics(X, Y, N, BLOCK: tl.constexpr):
+    pass
+"""
+
+
+def _load_kernels(tmpdir):
+    path = Path(tmpdir) / "launch_overhead_kernels.py"
+    path.write_text(_kernels_src())
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _benchmarks(k):
+    x = MockTensor(tl.float32)
+    args_1, args_10, args_50 = [x], [x] * 10, [x] * 50
+    grid = (1, )
+    benchmarks = {
+        "args_1": lambda: k.args_1[grid](*args_1),
+        "args_10": lambda: k.args_10[grid](*args_10),
+        "args_50": lambda: k.args_50[grid](*args_50),
+        "tuple_args": lambda: k.tuple_args[grid]((x, x, x, x), (128, 256)),
+        "constexpr_args": lambda: k.constexpr_args[grid](x, 1024, BLOCK_M=64, BLOCK_N=32, ACTIVATION="relu"),
+        "autotune": lambda: k.autotuned[grid](x, x, 1024),
+        "heuristics": lambda: k.heuristics[grid](x, x, 1000),
+    }
+    # compile everything (and run the autotuner) before anything is timed
+    for fn in benchmarks.values():
+        fn()
+    compiled = k.args_10[grid](*args_10)
+    benchmarks["launch_metadata"] = lambda: compiled.launch_metadata(grid, 0, *args_10)
+    binder = k.args_50.device_caches[driver.active.get_current_device()][3]
+    benchmarks["binder_args_50"] = lambda: binder(*args_50)
+    return benchmarks
+
+
+def _time(fn, iters, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(iters):
+            fn()
+        best = min(best, time.perf_counter_ns() - start)
+    return best / iters
+
+
+def run_benchmarks(iters=10000, repeat=5, target=None, names=None):
+    """
+    Returns the best observed cost, in nanoseconds per call, of each
+    benchmark whose name is in `names` (all of them if `names` is None).
+    """
+    from triton.compiler import CompiledKernel
+    launch_enter_hook = CompiledKernel.launch_enter_hook
+    driver.set_active(StubDriver(target))
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            benchmarks = _benchmarks(_load_kernels(tmpdir))
+            results = {}
+            for name in benchmarks.keys() if names is None else names:
+                # launch metadata is only built when a launch hook is installed
+                if name == "launch_metadata":
+                    CompiledKernel.launch_enter_hook = lambda metadata: None
+                try:
+                    results[name] = _time(benchmarks[name], iters, repeat)
+                finally:
+                    CompiledKernel.launch_enter_hook = launch_enter_hook
+            return results
+    finally:
+        driver.reset_active()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measure the host-side overhead of Triton kernel launches")
+    parser.add_argument("--iters", type=int, default=10000, help="Number of launches per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measurements; the best one is reported")
+    parser.add_argument("--target", type=str, default="cuda:80:32", help="Compilation target as backend:arch:warp_size")
+    parser.add_argument("--benchmarks", type=str, nargs="*", default=None, help="Subset of benchmarks to run")
+    parser.add_argument("--json", type=str, default=None, help="Write the results to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    backend, arch, warp_size = args.target.split(":")
+    target = GPUTarget(backend, int(arch) if arch.isdigit() else arch, int(warp_size))
+    results = run_benchmarks(args.iters, args.repeat, target, args.benchmarks)
+
+    if args.json is None:
+        for name, ns in results.items():
+            print(f"{name:<20} {ns:>10.0f} ns/launch")
+    else:
+        out = json.dumps({"target": args.target, "triton": triton.__version__, "ns_per_launch": results}, indent=2)
+        if args.json == "-":
+            sys.stdout.write(out + "\n")
+        else:
+            Path(args.json).write_text(out)
@@ -0,0 +1,72 @@
+"""
+Measures the time a fresh process spends before it can look up its first
+kernel in the cache: importing Triton and computing `triton_key()`, whose
+value is persisted in the cache directory for later processes.
+
+    python -m triton.tools.startup_overhead --json results.json
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from pathlib import Path
+
+import triton
+
+_PROBE = """
+import json
+import time
+start = time.perf_counter()
+import triton
+from triton.compiler.compiler import triton_key
+imported = time.perf_counter()
+triton_key()
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "triton_key": done - imported}))
+"""
+
+
+def _run_probe(cache_dir):
+    env = dict(os.environ, TRITON_CACHE_DIR=cache_dir)
+    out = subprocess.check_output([sys.executable, "-c", _PROBE], env=env)
+    return json.loads(out)
+
+
+def run_benchmarks(repeat=5):
+    """
+    Returns the best observed times, in seconds, to import Triton and to
+    compute `triton_key()` in a new process, with an empty cache directory
+    ("cold") and with the key already persisted by an earlier process
+    ("warm").
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cold = [_run_probe(os.path.join(tmpdir, str(i))) for i in range(repeat)]
+        # every cold run above persisted its key, reuse the last one
+        warm = [_run_probe(os.path.join(tmpdir, str(repeat - 1))) for _ in range(repeat)]
+    for name, runs in [("cold", cold), ("warm", warm)]:
+        for stage in ["import", "triton_key"]:
+            results[f"{stage}_{name}"] = min(run[stage] for run in runs)
+    return results
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Measure the startup overhead of Triton in a new process")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of processes; the best one is reported")
+    parser.add_argument("--json", type=str, default=None, help="Write the results to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.repeat)
+
+    if args.json is None:
+        for name, seconds in results.items():
+            print(f"{name:<20} {seconds * 1e3:>10.1f} ms")
+    else:
+        out = json.dumps({"triton": triton.__version__, "seconds": results}, indent=2)
+        if args.json == "-":
+            sys.stdout.write(out + "\n")
+        else:
+            Path(args.json).write_text(out)
@@ -0,0 +1,152 @@
+"""
+Warm-up manifests: the list of kernel specializations a workload compiles,
+recorded at runtime so that they can all be compiled ahead of time, e.g.
+into the cache directory of a container image.
+
+    # record, by setting TRITON_WARMUP_MANIFEST=manifest.jsonl or with
+    ManifestRecorder("manifest.jsonl").install()
+    # replay
+    python -m triton.tools.warmup replay manifest.jsonl
+
+A manifest has one JSON object per line, with the module and qualified name
+of the JIT function, the compilation target and the specialization data of
+the kernel (as passed to `JITFunction.preload`).
+"""
+
+import json
+import os
+import sys
+import threading
+from argparse import ArgumentParser
+from collections import defaultdict
+from concurrent.futures import wait
+
+from triton.tools.bundle import _lookup
+
+
+def _entry_key(entry):
+    return entry["module"], entry["qualname"], json.dumps(entry["target"]), entry["specialization_data"]
+
+
+def read_manifest(path):
+    """Returns the entries of the manifest at `path`, without duplicates."""
+    entries = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                # a line may be incomplete if its writer was interrupted
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entries.setdefault(_entry_key(entry), entry)
+    return list(entries.values())
+
+
+class ManifestRecorder:
+    """
+    A `JITFunction.cache_hook` appending every specialization compiled (or
+    loaded from the cache) by the JIT to the manifest at `path`. Several
+    processes can record to the same manifest.
+
+    Kernels that can't be looked up by name again (those defined in
+    `__main__` or in a local scope) are not recorded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.previous_hook = None
+        self._lock = threading.Lock()
+        self._seen = {_entry_key(entry) for entry in read_manifest(path)}
+
+    def install(self):
+        from triton.runtime.jit import JITFunction
+        self.previous_hook = JITFunction.cache_hook
+        JITFunction.cache_hook = self
+        return self
+
+    def uninstall(self):
+        from triton.runtime.jit import JITFunction
+        JITFunction.cache_hook = self.previous_hook
+
+    def record(self, jit_function, specialization_data):
+        from triton.runtime.driver import driver
+        module, qualname = jit_function.fn.__module__, jit_function.fn.__qualname__
+        if module == "__main__" or "<locals>" in qualname:
+            return
+        target = driver.active.get_current_target()
+        entry = {
+            "module": module,
+            "qualname": qualname,
+            "target": {"backend": target.backend, "arch": target.arch, "warp_size": target.warp_size},
+            "specialization_data": specialization_data,
+        }
+        with self._lock:
+            if _entry_key(entry) in self._seen:
+                return
+            self._seen.add(_entry_key(entry))
+            # a single append of a whole line, so that concurrent writers don't interleave
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __call__(self, *args, **kwargs):
+        self.record(kwargs["fn"].jit_function, kwargs["compile"]["specialization_data"])
+        if self.previous_hook is not None:
+            return self.previous_hook(*args, **kwargs)
+        return False
+
+
+def replay_manifest(path, max_workers=None):
+    """
+    Compiles every kernel of the manifest at `path` into the cache, in a pool
+    of `max_workers` processes. Returns the number of kernels compiled and
+    the `(entry, exception)` pairs of those that failed to compile.
+
+    The modules defining the kernels are imported if they aren't already.
+    Kernels are compiled for the target they were recorded on, so no device
+    is needed.
+    """
+    from triton.backends.compiler import GPUTarget
+    from triton.compiler import compile_async
+    from triton.runtime.jit import deserialize_specialization_data
+    jobs = defaultdict(list)
+    for entry in read_manifest(path):
+        fn = _lookup(entry["module"], entry["qualname"])
+        _, signature, constants, attrs, options, _ = deserialize_specialization_data(entry["specialization_data"])
+        target = GPUTarget(**entry["target"])
+        jobs[target].append((entry, (fn, signature, constants, options, attrs)))
+
+    num_compiled, failures = 0, []
+    for target, target_jobs in jobs.items():
+        futures = compile_async([job for _, job in target_jobs], target=target, max_workers=max_workers)
+        wait(futures)
+        for (entry, _), future in zip(target_jobs, futures):
+            if future.exception() is not None:
+                failures.append((entry, future.exception()))
+            else:
+                num_compiled += 1
+    return num_compiled, failures
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Compile the kernels of a warm-up manifest ahead of time")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    replay_parser = subparsers.add_parser("replay", help="Compile every kernel of a manifest into the cache")
+    replay_parser.add_argument("manifest", type=str, help="Path of the manifest")
+    replay_parser.add_argument("--workers", type=int, default=None, help="Number of compiler processes")
+    list_parser = subparsers.add_parser("list", help="List the kernels of a manifest")
+    list_parser.add_argument("manifest", type=str, help="Path of the manifest")
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        num_compiled, failures = replay_manifest(args.manifest, args.workers)
+        for entry, e in failures:
+            sys.stderr.write(f"Failed to compile {entry['module']}.{entry['qualname']}: {e}\n")
+        print(f"Compiled {num_compiled} kernels from {args.manifest}")
+        sys.exit(1 if failures else 0)
+    else:
+        counts = defaultdict(int)
+        for entry in read_manifest(args.manifest):
+            counts[f"{entry['module']}.{entry['qualname']}"] += 1
+        for name, count in sorted(counts.items()):
+            print(f"{count:>6}  {name}")
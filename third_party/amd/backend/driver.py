@@ -135,7 +135,9 @@ def compile_module_from_src(src, name):
                 f.write(src)
             so = _build(name, src_path, tmpdir, [], include_dir, [])
             with open(so, "rb") as f:
-                cache_path = cache.put(f.read(), f"{name}.so", binary=True)
+                cache.put(f.read(), f"{name}.so", binary=True)
+            # not every cache manager stores files as such, see `CacheManager.put`
+            cache_path = cache.get_file(f"{name}.so")
     import importlib.util
     spec = importlib.util.spec_from_file_location(name, cache_path)
     mod = importlib.util.module_from_spec(spec)
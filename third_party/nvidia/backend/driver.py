@@ -66,7 +66,9 @@ def compile_module_from_src(src, name):
                 f.write(src)
             so = _build(name, src_path, tmpdir, library_dirs(), include_dir, libraries)
             with open(so, "rb") as f:
-                cache_path = cache.put(f.read(), f"{name}.{ext}", binary=True)
+                cache.put(f.read(), f"{name}.{ext}", binary=True)
+            # not every cache manager stores files as such, see `CacheManager.put`
+            cache_path = cache.get_file(f"{name}.{ext}")
     import importlib.util
     spec = importlib.util.spec_from_file_location(name, cache_path)
     mod = importlib.util.module_from_spec(spec)